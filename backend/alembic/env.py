@@ -22,6 +22,8 @@ from app.models.voting_option import VotingOption
 from app.models.media import Media
 from app.models.user import User
 from app.models.vote import Vote
+from app.models.revoked_token import RevokedToken
+from app.models.poll_stats import PollStats
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,34 @@
+"""Add vote_count to voting_option
+
+Revision ID: 3f1c2a7d9e40
+Revises: b2de10adafbd
+Create Date: 2025-02-03 19:12:44.201318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9e40'
+down_revision: Union[str, None] = 'b2de10adafbd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('voting_option',
+    sa.Column('vote_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    # Backfill the counters from the existing votes
+    op.execute(
+        "UPDATE voting_option SET vote_count = "
+        "(SELECT COUNT(*) FROM votes WHERE votes.option_id = voting_option.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('voting_option') as batch_op:
+        batch_op.drop_column('vote_count')
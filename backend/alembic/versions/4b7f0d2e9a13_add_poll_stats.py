@@ -0,0 +1,38 @@
+"""Add poll stats
+
+Revision ID: 4b7f0d2e9a13
+Revises: e7a91c4d2b68
+Create Date: 2025-02-21 14:37:45.208116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7f0d2e9a13'
+down_revision: Union[str, None] = 'e7a91c4d2b68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'poll_stats',
+        sa.Column('name', sa.String(length=16), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Seed the counters from the existing polls
+    op.execute("INSERT INTO poll_stats (name, count) SELECT 'all', COUNT(*) FROM polls")
+    op.execute("INSERT INTO poll_stats (name, count) SELECT 'active', COUNT(*) FROM polls WHERE is_active")
+    op.execute(
+        "INSERT INTO poll_stats (name, count) "
+        "SELECT 'closed', COUNT(*) FROM polls WHERE NOT is_active OR is_active IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('poll_stats')
@@ -0,0 +1,29 @@
+"""Add poll content version
+
+Revision ID: 5e2b8c4f7a06
+Revises: 9d3c6f1a8e25
+Create Date: 2025-02-25 14:06:47.219834
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8c4f7a06'
+down_revision: Union[str, None] = '9d3c6f1a8e25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bumped on every edit, keys the cached JSON payload of the poll
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.drop_column('content_version')
@@ -0,0 +1,37 @@
+"""Unique vote per user and poll
+
+Revision ID: 8a4e6b1c2f57
+Revises: 3f1c2a7d9e40
+Create Date: 2025-02-10 20:41:07.518842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6b1c2f57'
+down_revision: Union[str, None] = '3f1c2a7d9e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicates left behind by the old check-then-insert path, keeping the first vote
+    op.execute(
+        "DELETE FROM votes WHERE id NOT IN "
+        "(SELECT MIN(id) FROM votes GROUP BY poll_id, user_id)"
+    )
+    op.execute(
+        "UPDATE voting_option SET vote_count = "
+        "(SELECT COUNT(*) FROM votes WHERE votes.option_id = voting_option.id)"
+    )
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.create_unique_constraint('uq_votes_poll_id_user_id', ['poll_id', 'user_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.drop_constraint('uq_votes_poll_id_user_id', type_='unique')
@@ -0,0 +1,41 @@
+"""Add poll search index
+
+Revision ID: 9d3c6f1a8e25
+Revises: 4b7f0d2e9a13
+Create Date: 2025-02-24 09:52:31.674190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c6f1a8e25'
+down_revision: Union[str, None] = '4b7f0d2e9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite only; other databases run without search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # prefix='2 3' keeps extra indexes for short prefixes, the common case while typing
+    op.execute(
+        "CREATE VIRTUAL TABLE poll_search USING fts5("
+        "question, options, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    op.execute(
+        "INSERT INTO poll_search (rowid, question, options) "
+        "SELECT polls.id, polls.question, COALESCE(group_concat(voting_option.description, ' '), '') "
+        "FROM polls LEFT JOIN voting_option ON voting_option.poll_id = polls.id "
+        "GROUP BY polls.id"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE poll_search")
@@ -0,0 +1,32 @@
+"""Add poll version and updated_at
+
+Revision ID: a83d5f1e6c27
+Revises: 5e2b8c4f7a06
+Create Date: 2025-02-26 11:31:05.846120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d5f1e6c27'
+down_revision: Union[str, None] = '5e2b8c4f7a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Validators for conditional GETs, bumped on every vote, close and edit
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE polls SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
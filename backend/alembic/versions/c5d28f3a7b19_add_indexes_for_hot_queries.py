@@ -0,0 +1,35 @@
+"""Add indexes for hot queries
+
+Revision ID: c5d28f3a7b19
+Revises: 8a4e6b1c2f57
+Create Date: 2025-02-17 18:06:52.930417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d28f3a7b19'
+down_revision: Union[str, None] = '8a4e6b1c2f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # votes(poll_id, user_id) is already covered by uq_votes_poll_id_user_id
+    op.create_index('ix_votes_poll_id_option_id', 'votes', ['poll_id', 'option_id'])
+    op.create_index('ix_voting_option_poll_id', 'voting_option', ['poll_id'])
+    op.create_index('ix_polls_created_at', 'polls', ['created_at'])
+    op.create_index('ix_polls_is_active_created_at', 'polls', ['is_active', 'created_at'])
+    op.create_index('ix_media_poll_id', 'media', ['poll_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_poll_id', table_name='media')
+    op.drop_index('ix_polls_is_active_created_at', table_name='polls')
+    op.drop_index('ix_polls_created_at', table_name='polls')
+    op.drop_index('ix_voting_option_poll_id', table_name='voting_option')
+    op.drop_index('ix_votes_poll_id_option_id', table_name='votes')
@@ -0,0 +1,27 @@
+"""Index votes by user
+
+Revision ID: e7a91c4d2b68
+Revises: c5d28f3a7b19
+Create Date: 2025-02-19 10:12:08.514273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a91c4d2b68'
+down_revision: Union[str, None] = 'c5d28f3a7b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the per-user load of the vote membership index
+    op.create_index('ix_votes_user_id_poll_id', 'votes', ['user_id', 'poll_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_votes_user_id_poll_id', table_name='votes')
@@ -1,3 +1,4 @@
+import atexit
 import os
 from flask import Flask
 from flask_migrate import Migrate
@@ -20,11 +21,76 @@ def create_app(config_class=None):
     init_db()
     
     migrate.init_app(app, db)
+    if app.config.get('SQL_STATEMENT_COUNTER'):
+        from app.databases.database import init_statement_counter
+        init_statement_counter(app)
     jwt.init_app(app)
 
     # Initialize services
     from app.services.poll_service import PollService
-    app.poll_service = PollService()
+    from app.services.results_cache import ResultsCache
+    from app.services.live_tallies import LiveTallyHub
+    from app.services.vote_ingestion import create_vote_buffer
+    from app.services.vote_log import create_vote_log
+    from app.services.vote_membership import VoteMembershipIndex
+    from app.services.hot_counters import create_hot_counters
+    from app.services.feed_service import FeedService
+    from app.services.trending import TrendingRanker
+    from app.utils.serialization import PollPayloadCache
+    from app.services.user_cache import UserCache
+    from app.services.token_cache import TokenCache
+    from app.services.revocation_store import RevocationStore
+    from app.services.password_hasher import create_password_hasher
+    from app.services.rate_limiter import create_rate_limiter
+    from app.databases.database import engine
+    vote_log = create_vote_log(app.config)
+    if vote_log is not None:
+        # atexit runs handlers in reverse, so the buffer's final flush still reaches the log
+        atexit.register(vote_log.close)
+    hot_counters = create_hot_counters(app.config, engine)
+    if hot_counters is not None:
+        atexit.register(hot_counters.close)
+    vote_buffer = create_vote_buffer(app.config, engine)
+    if vote_buffer is not None:
+        # Flush whatever is still queued when the worker exits
+        atexit.register(vote_buffer.close)
+    app.poll_service = PollService(
+        vote_buffer=vote_buffer,
+        acknowledge_votes=app.config.get('VOTE_INGESTION_MODE') == 'acknowledged',
+        ack_timeout=app.config.get('VOTE_INGESTION_ACK_TIMEOUT_S', 5),
+        results_cache=ResultsCache(app.config.get('RESULTS_CACHE_MAX_ENTRIES', 1024)),
+        live_tallies=LiveTallyHub(
+            interval_ms=app.config.get('LIVE_TALLY_INTERVAL_MS', 1000),
+            heartbeat_s=app.config.get('LIVE_TALLY_HEARTBEAT_S', 15)
+        ),
+        vote_log=vote_log,
+        vote_membership=VoteMembershipIndex(app.config.get('VOTE_MEMBERSHIP_MAX_USERS', 10000)),
+        hot_counters=hot_counters,
+        feed=FeedService(
+            max_users=app.config.get('FEED_MAX_USERS', 10000),
+            batch_size=app.config.get('FEED_REFILL_BATCH_SIZE', 200),
+            max_candidates=app.config.get('FEED_MAX_CANDIDATES', 1000)
+        ),
+        trending=TrendingRanker(
+            top_k=app.config.get('TRENDING_TOP_K', 100),
+            window_minutes=app.config.get('TRENDING_WINDOW_MINUTES', 60),
+            half_life_minutes=app.config.get('TRENDING_HALF_LIFE_MINUTES', 10),
+            refresh_interval_s=app.config.get('TRENDING_REFRESH_INTERVAL_S', 5)
+        ),
+        payload_cache=PollPayloadCache(app.config.get('PAYLOAD_CACHE_MAX_ENTRIES', 4096))
+    )
+
+    app.rate_limiter = create_rate_limiter(app.config)
+    app.password_hasher = create_password_hasher(app.config)
+    atexit.register(app.password_hasher.close)
+
+    app.revocation_store = RevocationStore(app.config.get('REVOCATION_REFRESH_INTERVAL_S', 5))
+    app.token_cache = TokenCache(app.config.get('TOKEN_CACHE_MAX_ENTRIES', 50000))
+    app.token_cache.is_revoked = app.revocation_store.is_revoked_claims
+    app.user_cache = UserCache(
+        max_entries=app.config.get('USER_CACHE_MAX_ENTRIES', 10000),
+        ttl_s=app.config.get('USER_CACHE_TTL_S', 60)
+    )
 
     from app.routes.auth import auth_blueprint
     from app.routes.poll import poll_blueprint
@@ -35,4 +101,14 @@ def create_app(config_class=None):
         app.register_blueprint(poll_blueprint)
         app.register_blueprint(media_blueprint)
 
+    from app.commands import polls_cli, tokens_cli, votes_cli
+    app.cli.add_command(votes_cli)
+    app.cli.add_command(polls_cli)
+    app.cli.add_command(tokens_cli)
+
+    if app.config.get('POLL_STATS_RECONCILE_INTERVAL_S'):
+        from app.services.poll_stats_reconciler import PollStatsReconciler
+        app.poll_stats_reconciler = PollStatsReconciler(app.config['POLL_STATS_RECONCILE_INTERVAL_S'])
+        app.poll_stats_reconciler.start()
+
     return app
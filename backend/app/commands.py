@@ -0,0 +1,82 @@
+# Maintenance commands exposed through the flask CLI, e.g. `flask votes reconcile-counts`
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.databases.database import db, engine
+from app.models.poll import Poll
+from app.models.poll_search import PollSearch
+from app.models.poll_stats import PollStats
+from app.models.revoked_token import RevokedToken
+from app.services.vote_log import VoteLog, VoteLogIncomplete, replay_tallies, restore_votes
+
+votes_cli = AppGroup('votes', help='Vote maintenance commands.')
+polls_cli = AppGroup('polls', help='Poll maintenance commands.')
+tokens_cli = AppGroup('tokens', help='Token maintenance commands.')
+
+
+@votes_cli.command('reconcile-counts')
+@click.option('--poll-id', type=int, default=None, help='Only rebuild the counters of this poll.')
+def reconcile_counts(poll_id):
+    """Rebuild the per-option vote counters from the votes table."""
+    updated = Poll.reconcile_vote_counts(poll_id)
+    click.echo(f"Reconciled vote counts for {updated} voting options")
+
+
+def _open_vote_log():
+    directory = current_app.config.get('VOTE_LOG_DIR')
+    if not directory:
+        raise click.ClickException("VOTE_LOG_DIR is not configured")
+    # Read-only, so the command can run next to a worker that is appending
+    return VoteLog(directory, read_only=True)
+
+
+@votes_cli.command('replay-log')
+@click.option('--target', type=click.Choice(['tallies', 'votes']), default='tallies',
+              help='Rebuild only the per-option counters, or re-insert missing votes as well.')
+def replay_log(target):
+    """Rebuild vote state from the append-only vote log."""
+    vote_log = _open_vote_log()
+    if target == 'tallies':
+        try:
+            with engine.begin() as conn:
+                updated = replay_tallies(vote_log, conn)
+        except VoteLogIncomplete as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Replayed vote counts for {updated} voting options")
+    else:
+        with engine.begin() as conn:
+            restored = restore_votes(vote_log, conn)
+        Poll.reconcile_vote_counts()
+        click.echo(f"Restored {restored} votes from the vote log")
+
+
+@votes_cli.command('compact-log')
+def compact_log():
+    """Fold sealed vote log segments into one, grouping closed polls."""
+    vote_log = _open_vote_log()
+    closed_poll_ids = {poll_id for poll_id, in db.query(Poll.id).filter(Poll.is_active.is_(False))}
+    records = vote_log.compact(closed_poll_ids)
+    click.echo(f"Compacted vote log into {records} records")
+
+
+@polls_cli.command('reconcile-stats')
+def reconcile_stats():
+    """Rebuild the all/active/closed poll counters from the polls table."""
+    counts = PollStats.reconcile()
+    click.echo(f"Reconciled poll stats: {counts['all']} polls, {counts['active']} active, {counts['closed']} closed")
+
+
+@polls_cli.command('rebuild-search')
+def rebuild_search():
+    """Rebuild the full-text search index from the polls and their options."""
+    indexed = PollSearch.rebuild()
+    click.echo(f"Indexed {indexed} polls for search")
+
+
+@tokens_cli.command('purge-revoked')
+def purge_revoked():
+    """Delete revocation records of tokens that have expired anyway."""
+    deleted = RevokedToken.purge_expired()
+    click.echo(f"Purged {deleted} expired revocations")
@@ -20,10 +20,97 @@ class Config:
     FACEBOOK_CLIENT_ID = "YOUR_FACEBOOK_CLIENT_ID"  # Replace with your Facebook Client ID
     FACEBOOK_CLIENT_SECRET = "YOUR_FACEBOOK_CLIENT_SECRET"  # Replace with your Facebook Client Secret
     FACEBOOK_REDIRECT_URI = "http://localhost:8000/auth/facebook_callback"
+    # Vote ingestion: 'sync' commits each vote inside its request, 'buffered' queues
+    # validated votes for group commit and answers 202, 'acknowledged' queues them and
+    # answers 201 once the batch holding the vote has been committed
+    VOTE_INGESTION_MODE = 'sync'
+    VOTE_INGESTION_FLUSH_INTERVAL_MS = 5
+    VOTE_INGESTION_BATCH_SIZE = 500
+    VOTE_INGESTION_MAX_QUEUE = 10000
+    VOTE_INGESTION_ACK_TIMEOUT_S = 5
+    # Upper bound on the number of votes accepted by POST /polls/votes:batch
+    VOTE_BATCH_MAX_ITEMS = 500
+    # Number of closed poll results kept in the in-process results cache
+    RESULTS_CACHE_MAX_ENTRIES = 1024
+    # Live tally stream: at most one broadcast per poll per interval, keep-alive after this much silence
+    LIVE_TALLY_INTERVAL_MS = 1000
+    LIVE_TALLY_HEARTBEAT_S = 15
+    # Append-only vote log: directory of the segment files (None disables the log),
+    # size at which a segment is sealed and how often the active one is fsynced; each worker
+    # process appends to its own writer-N subdirectory
+    VOTE_LOG_DIR = None
+    VOTE_LOG_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+    VOTE_LOG_FSYNC_INTERVAL_MS = 50
+    # Number of users whose voted poll ids are kept in the in-process membership index
+    VOTE_MEMBERSHIP_MAX_USERS = 10000
+    # Hot polls: above this many votes per second (0 disables) a poll's counter increments
+    # go to striped in-memory counters, flushed every interval; a poll cools down after
+    # HOT_POLL_COOLDOWN_S seconds below the threshold. Unflushed increments are only visible
+    # in the worker that took them, so enable it for single-worker deployments only
+    HOT_POLL_VOTES_PER_SECOND = 0
+    HOT_POLL_COOLDOWN_S = 10
+    HOT_POLL_FLUSH_INTERVAL_MS = 250
+    HOT_POLL_STRIPES = 16
+    # Report the number of SQL statements per request in an X-SQL-Statements header
+    SQL_STATEMENT_COUNTER = False
+    # Seconds between two rebuilds of the poll_stats counters from the polls table, 0 disables
+    POLL_STATS_RECONCILE_INTERVAL_S = 300
+    # Unvoted-poll feed: users whose queue is kept, polls scanned per refill, queue length cap
+    FEED_MAX_USERS = 10000
+    FEED_REFILL_BATCH_SIZE = 200
+    FEED_MAX_CANDIDATES = 1000
+    FEED_DEFAULT_LIMIT = 10
+    FEED_MAX_LIMIT = 50
+    # Trending polls: ranking size, vote window, decay half-life and ranking refresh interval
+    TRENDING_TOP_K = 100
+    TRENDING_WINDOW_MINUTES = 60
+    TRENDING_HALF_LIFE_MINUTES = 10
+    TRENDING_REFRESH_INTERVAL_S = 5
+    # Page size bounds of GET /polls/search
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 100
+    # Password hashing: worker processes (0 hashes on the request thread), most hashes queued
+    # or running before logins get 503, and the werkzeug method with its cost parameters;
+    # stored hashes made with another method are upgraded at the next login
+    PASSWORD_HASH_POOL_SIZE = 2
+    PASSWORD_HASH_MAX_PENDING = 32
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_TIMEOUT_S = 10
+    # How often each worker loads the token revocations recorded by the others
+    REVOCATION_REFRESH_INTERVAL_S = 5
+    # Verified JWTs remembered by digest until they expire
+    TOKEN_CACHE_MAX_ENTRIES = 50000
+    # Users kept for routes that need the full User row, and how long a copy may be served
+    USER_CACHE_MAX_ENTRIES = 10000
+    USER_CACHE_TTL_S = 60
+    # Most polls GET /polls?ids= returns in one request
+    POLLS_MAX_IDS = 100
+    # Number of encoded poll payloads kept for building list and detail responses
+    PAYLOAD_CACHE_MAX_ENTRIES = 4096
+    # Rate limiting: 'memory' keeps the buckets per worker, 'sqlite' shares them between the
+    # workers of a host through RATE_LIMIT_SQLITE_PATH, None disables it; rates per scope,
+    # keyed by user id or, for logins and anonymous requests, by client IP. Vote batches are
+    # charged per vote under their own scope, whose limit must be at least VOTE_BATCH_MAX_ITEMS
+    RATE_LIMIT_BACKEND = 'memory'
+    RATE_LIMIT_SQLITE_PATH = 'instance/rate_limits.db'
+    RATE_LIMIT_MAX_KEYS = 100000
+    RATE_LIMITS = {
+        'login': '10/minute',
+        'vote': '120/minute',
+        'batch_vote': '1000/hour',
+        'create_poll': '20/hour'
+    }
 
 class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///instance/test.db'
     TESTING = True
+    # Report the number of SQL statements per request in an X-SQL-Statements header
+    SQL_STATEMENT_COUNTER = True
+    # Hash inline and cheaply
+    PASSWORD_HASH_POOL_SIZE = 0
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    POLL_STATS_RECONCILE_INTERVAL_S = 0
+    RATE_LIMIT_BACKEND = None
 
 # Create settings instance
 settings = Config()
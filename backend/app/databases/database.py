@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from flask import g, has_app_context
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from app.config import settings
@@ -28,9 +29,11 @@ def init_db():
     # Import all models to ensure they're registered with Base
     from app.models.user import User
     from app.models.poll import Poll
+    from app.models.poll_stats import PollStats
     from app.models.vote import Vote
     from app.models.voting_option import VotingOption
     from app.models.media import Media
+    from app.models.revoked_token import RevokedToken
     
     Base.metadata.create_all(bind=engine)
 
@@ -40,3 +43,22 @@ def get_db():
         yield db
     finally:
         db.remove()
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.sql_statement_count = g.get('sql_statement_count', 0) + 1
+
+def init_statement_counter(app):
+    """Count the SQL statements each request issues and report them in an X-SQL-Statements header"""
+    if not event.contains(engine, 'before_cursor_execute', _count_statement):
+        event.listen(engine, 'before_cursor_execute', _count_statement)
+
+    @app.before_request
+    def reset_statement_count():
+        # The app context, and with it g, can outlive a single request, e.g. in tests
+        g.sql_statement_count = 0
+
+    @app.after_request
+    def add_statement_count(response):
+        response.headers['X-SQL-Statements'] = str(g.get('sql_statement_count', 0))
+        return response
@@ -5,7 +5,9 @@ Base = declarative_base()
 
 # Import all models to ensure they are registered with SQLAlchemy
 from .poll import Poll
+from .poll_stats import PollStats
 from .voting_option import VotingOption
 from .media import Media
 from .user import User
 from .vote import Vote
+from .revoked_token import RevokedToken
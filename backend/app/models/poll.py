@@ -10,27 +10,50 @@ Attributes:
 - is_active: A boolean indicating whether the poll is currently active and open for voting.
 - created_at: A timestamp indicating when the poll was created.
 - user_id: The ID of the user who created the poll, linking it to the User model.
+- content_version: A counter bumped whenever the question or options are edited, keying cached payloads.
+- version: A counter bumped on every vote, close or edit, from which ETags are derived.
+- updated_at: A timestamp of the last vote, close or edit, served as Last-Modified.
 Methods:
 - create_poll: A method to handle the logic for creating a new poll in the system.
+- close: A method to close an active poll and keep the poll_stats counters in step.
 - get_poll_by_id: A method to retrieve a poll's information based on its unique ID.
+- loader_options: A method to build the query options loading only what a set of serialized fields needs.
+- get_validators: A method to read only the version and updated_at of a poll, for conditional requests.
+- touch: A method to bump the version and updated_at of polls that received votes.
+- insert_vote: A method to record a vote with a single guarded INSERT, relying on the votes uniqueness constraint.
+- get_vote_counts: A method to read the per-option vote counters of a poll.
+- reconcile_vote_counts: A method to rebuild the per-option vote counters from the votes table.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, ForeignKey, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import relationship, backref, joinedload, load_only, selectinload
 from app.models import Base
 from app.databases.database import db
+from app.models.poll_search import PollSearch
+from app.models.poll_stats import PollStats
 from app.models.vote import Vote
 from app.models.voting_option import VotingOption
 
 class Poll(Base):
     __tablename__ = 'polls'
+    # Keys of to_dict(), selectable with `fields=`
+    FIELDS = ('id', 'question', 'created_at', 'is_active', 'options')
+    __table_args__ = (
+        # Listing order, unfiltered and filtered by status
+        Index('ix_polls_created_at', 'created_at'),
+        Index('ix_polls_is_active_created_at', 'is_active', 'created_at'),
+    )
     id = Column(Integer, primary_key=True)
     question = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    
+    content_version = Column(Integer, nullable=False, default=1, server_default='1')
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
     # Establish relationship to VotingOption
     voting_options = relationship('VotingOption', back_populates='poll', cascade="all, delete-orphan")
     user = relationship('User', backref=backref('polls', lazy=True))
@@ -39,13 +62,21 @@ class Poll(Base):
         self.question = question
         self.user_id = user_id
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "question": self.question,
-            "created_at": self.created_at.isoformat(),
-            "is_active": self.is_active,
-            "options": [
+    def to_dict(self, fields=None):
+        """Serialize the poll, restricted to `fields` (see FIELDS) when given"""
+        if fields is None:
+            fields = self.FIELDS
+        data = {}
+        if 'id' in fields:
+            data["id"] = self.id
+        if 'question' in fields:
+            data["question"] = self.question
+        if 'created_at' in fields:
+            data["created_at"] = self.created_at.isoformat()
+        if 'is_active' in fields:
+            data["is_active"] = self.is_active
+        if 'options' in fields:
+            data["options"] = [
                 {
                     "id": opt.id,
                     "media_type": opt.media_type,
@@ -54,7 +85,32 @@ class Poll(Base):
                 }
                 for opt in self.voting_options
             ]
-        }
+        return data
+
+    @classmethod
+    def loader_options(cls, fields=None, options_loader=selectinload):
+        """
+        Query options loading what to_dict(fields) reads, and no more.
+
+        Args:
+            fields (tuple): Serialized fields, or None for all of them.
+            options_loader: Eager loading strategy of the voting options when they are requested.
+
+        Returns:
+            list: Options for Query.options() or Session.get().
+        """
+        if fields is None:
+            return [options_loader(cls.voting_options)]
+        # id, created_at, version and updated_at are always needed for cursors and validators
+        columns = [cls.id, cls.created_at, cls.version, cls.updated_at]
+        if 'question' in fields:
+            columns.append(cls.question)
+        if 'is_active' in fields:
+            columns.append(cls.is_active)
+        loader = [load_only(*columns)]
+        if 'options' in fields:
+            loader.append(options_loader(cls.voting_options))
+        return loader
 
     @classmethod
     def create_poll(cls, question, voting_options, user_id):        
@@ -72,13 +128,59 @@ class Poll(Base):
             )
             db.add(option)
 
+        PollSearch.index_poll(new_poll.id, question, [option.get('description') for option in voting_options])
+        PollStats.increment(all=1, active=1)
         db.commit()
         return new_poll
 
     @classmethod
-    def get_poll_by_id(cls, poll_id):
+    def close(cls, poll_id):
+        """
+        Mark a poll closed and move it between the active/closed counters, without committing.
+
+        Returns:
+            bool: True if the poll was active and is now closed.
+        """
+        closed = db.query(cls).filter(cls.id == poll_id, cls.is_active.is_(True)).update(
+            {cls.is_active: False, cls.version: cls.version + 1, cls.updated_at: datetime.utcnow()},
+            synchronize_session='fetch'
+        )
+        if closed:
+            PollStats.increment(active=-1, closed=1)
+        return bool(closed)
+
+    @classmethod
+    def get_poll_by_id(cls, poll_id, with_options=False, fields=None):
+        if fields is not None:
+            # Load only the columns, and the options only if, that the fields need
+            return db.query(cls).options(*cls.loader_options(fields, joinedload)).filter(cls.id == poll_id).first()
+        if with_options:
+            # Load the options in the same query, for callers that serialize them
+            return db.get(cls, poll_id, options=[joinedload(cls.voting_options)])
         return db.query(cls).get(poll_id)
 
+    @classmethod
+    def get_validators(cls, poll_id):
+        """
+        Read the version and updated_at of a poll with a primary key lookup.
+
+        Returns:
+            tuple: (version, updated_at), or None if the poll does not exist.
+        """
+        row = db.query(cls.version, cls.updated_at).filter(cls.id == poll_id).first()
+        return tuple(row) if row is not None else None
+
+    @classmethod
+    def touch(cls, conn, poll_ids):
+        """Bump the version and updated_at of polls whose votes changed, without committing"""
+        if not poll_ids:
+            return
+        conn.execute(
+            update(cls)
+            .where(cls.id.in_(sorted(poll_ids)))
+            .values(version=cls.version + 1, updated_at=datetime.utcnow())
+        )
+
     def update_poll(self, question=None, voting_options=None):
         if question:
             self.question = question
@@ -88,6 +190,11 @@ class Poll(Base):
                 option.media_type = option_data['media_type']
                 option.media_url = option_data['media_url']
                 option.description = option_data.get('description')
+        if question or voting_options:
+            self.content_version = (self.content_version or 1) + 1
+            self.version = (self.version or 1) + 1
+            self.updated_at = datetime.utcnow()
+            PollSearch.index_poll(self.id, self.question, [option.description for option in self.voting_options])
         db.commit()
 
     def get_votes_for_option(self, option_id):
@@ -109,12 +216,100 @@ class Poll(Base):
         """Record a vote for a user on a specific option"""
         if not self.is_active:
             raise ValueError("Poll is not active")
-        if not self.is_valid_option(option_id):
-            raise ValueError("Invalid voting option")
-        if self.has_user_voted(user_id):
+        if self.insert_vote(self.id, user_id, option_id) is None:
+            db.rollback()
+            if not self.is_valid_option(option_id):
+                raise ValueError("Invalid voting option")
             raise ValueError("User has already voted")
-        # Create and record the vote
-    
-        vote = Vote(poll_id=self.id, user_id=user_id, option_id=option_id)
-        db.add(vote)
         db.commit()
+
+    @classmethod
+    def can_accept_vote(cls, poll_id, user_id, option_id):
+        """Check in a single query that the poll is active, owns the option and has no vote from the user yet"""
+        already_voted = select(Vote.id).where(
+            Vote.poll_id == poll_id, Vote.user_id == user_id
+        ).exists()
+        return db.query(VotingOption.id).join(cls, cls.id == VotingOption.poll_id).filter(
+            VotingOption.id == option_id,
+            VotingOption.poll_id == poll_id,
+            cls.is_active.is_(True),
+            ~already_voted
+        ).first() is not None
+
+    @classmethod
+    def insert_vote(cls, poll_id, user_id, option_id, update_counter=True):
+        """
+        Insert a vote and bump the option's counter without committing.
+
+        The poll/option/active checks are folded into an INSERT ... SELECT and
+        duplicates are rejected by the (poll_id, user_id) unique constraint, so
+        the common case costs one INSERT, one counter UPDATE and one poll version UPDATE.
+
+        Args:
+            update_counter (bool): Bump the option's vote_count and the poll's version;
+                False when the caller accounts for the vote in the hot poll counters instead.
+
+        Returns:
+            int: The ID of the new vote, or None if the poll is missing or closed,
+            the option does not belong to the poll, or the user already voted.
+        """
+        guard = select(
+            literal(poll_id), literal(user_id), VotingOption.id
+        ).join(cls, cls.id == VotingOption.poll_id).where(
+            VotingOption.id == option_id,
+            VotingOption.poll_id == poll_id,
+            cls.is_active.is_(True)
+        )
+        columns = ['poll_id', 'user_id', 'option_id']
+        stmt = Vote.insert_ignoring_duplicates(db.get_bind().dialect.name)
+        if stmt is not None:
+            vote_id = db.execute(
+                stmt.from_select(columns, guard).returning(Vote.id)
+            ).scalar()
+        else:
+            try:
+                with db.begin_nested():
+                    vote_id = db.execute(
+                        insert(Vote).from_select(columns, guard).returning(Vote.id)
+                    ).scalar()
+            except IntegrityError:
+                vote_id = None
+
+        if vote_id is not None and update_counter:
+            db.query(VotingOption).filter_by(id=option_id).update(
+                {VotingOption.vote_count: VotingOption.vote_count + 1},
+                synchronize_session=False
+            )
+            cls.touch(db, [poll_id])
+        return vote_id
+
+    def get_vote_counts(self):
+        """Return (option_id, description, vote_count) rows for this poll's options"""
+        return db.query(
+            VotingOption.id, VotingOption.description, VotingOption.vote_count
+        ).filter_by(poll_id=self.id).order_by(VotingOption.id).all()
+
+    @classmethod
+    def reconcile_vote_counts(cls, poll_id=None):
+        """
+        Rebuild the per-option vote counters from the votes table.
+
+        Args:
+            poll_id (int): Restrict the rebuild to a single poll, or None for all polls.
+
+        Returns:
+            int: The number of voting options whose counter was rewritten.
+        """
+        actual = select(func.count(Vote.id)).where(
+            Vote.poll_id == VotingOption.poll_id,
+            Vote.option_id == VotingOption.id
+        ).scalar_subquery()
+        query = db.query(VotingOption)
+        if poll_id is not None:
+            query = query.filter_by(poll_id=poll_id)
+        updated = query.update(
+            {VotingOption.vote_count: actual},
+            synchronize_session=False
+        )
+        db.commit()
+        return updated
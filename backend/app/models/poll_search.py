@@ -0,0 +1,123 @@
+"""
+PollSearch
+
+Full-text index over poll questions and voting option descriptions, stored in the SQLite FTS5
+virtual table `poll_search` (created by migration, rowid = poll id). It is not a declarative model:
+FTS5 tables are read and written with plain SQL.
+
+Methods:
+- index_poll: A method to (re)index one poll, called by Poll.create_poll and Poll.update_poll.
+- search: A method to find polls by BM25 relevance with prefix matching and keyset pagination.
+- rebuild: A method to repopulate the whole index from the polls and voting_option tables.
+
+Every word of the query must match, either as a whole word or as the prefix of one. Questions
+weigh twice as much as option descriptions in the ranking. On databases other than SQLite the
+index is not maintained and search is unavailable.
+"""
+import re
+
+from sqlalchemy import text
+from app.databases.database import db
+
+# Weights of the question and options columns in bm25()
+QUESTION_WEIGHT = 2.0
+OPTIONS_WEIGHT = 1.0
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchUnavailable(Exception):
+    """Raised when the database has no FTS5 poll index"""
+    pass
+
+
+class PollSearch:
+
+    @staticmethod
+    def is_available():
+        return db.get_bind().dialect.name == 'sqlite'
+
+    @staticmethod
+    def build_match(query):
+        """
+        Turn free text into an FTS5 query: every word, quoted, as a prefix term.
+
+        Returns:
+            str: The MATCH expression, or None if the query holds no searchable word.
+        """
+        tokens = TOKEN.findall(query)
+        if not tokens:
+            return None
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    @classmethod
+    def index_poll(cls, poll_id, question, descriptions):
+        """Replace the indexed text of a poll without committing"""
+        if not cls.is_available():
+            return
+        db.execute(text("DELETE FROM poll_search WHERE rowid = :poll_id"), {'poll_id': poll_id})
+        db.execute(
+            text("INSERT INTO poll_search (rowid, question, options) VALUES (:poll_id, :question, :options)"),
+            {
+                'poll_id': poll_id,
+                'question': question,
+                'options': ' '.join(description for description in descriptions if description)
+            }
+        )
+
+    @classmethod
+    def search(cls, query, limit, after=None):
+        """
+        Find polls matching a query, most relevant first.
+
+        Args:
+            query (str): Free text typed by the user.
+            limit (int): Maximum number of results.
+            after (tuple): (score, poll_id) of the last result of the previous page.
+
+        Returns:
+            list: (poll_id, score) pairs; lower scores are more relevant, as with bm25().
+
+        Raises:
+            SearchUnavailable: If the database has no FTS5 index.
+        """
+        if not cls.is_available():
+            raise SearchUnavailable("Search is only available on SQLite")
+        match = cls.build_match(query)
+        if match is None:
+            return []
+
+        params = {'match': match, 'limit': limit}
+        keyset = ''
+        if after is not None:
+            keyset = 'WHERE score > :score OR (score = :score AND id > :poll_id)'
+            params.update(score=after[0], poll_id=after[1])
+        rows = db.execute(text(
+            "SELECT id, score FROM ("
+            f"  SELECT rowid AS id, bm25(poll_search, {QUESTION_WEIGHT}, {OPTIONS_WEIGHT}) AS score"
+            "  FROM poll_search WHERE poll_search MATCH :match"
+            f") {keyset} ORDER BY score, id LIMIT :limit"
+        ), params)
+        return [(poll_id, score) for poll_id, score in rows]
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Repopulate the index from the polls and their options, and commit.
+
+        Returns:
+            int: Number of polls indexed.
+        """
+        if not cls.is_available():
+            raise SearchUnavailable("Search is only available on SQLite")
+        db.execute(text("DELETE FROM poll_search"))
+        db.execute(text(
+            "INSERT INTO poll_search (rowid, question, options) "
+            "SELECT polls.id, polls.question, COALESCE(group_concat(voting_option.description, ' '), '') "
+            "FROM polls LEFT JOIN voting_option ON voting_option.poll_id = polls.id "
+            "GROUP BY polls.id"
+        ))
+        # Merge the index b-trees written by the bulk insert
+        db.execute(text("INSERT INTO poll_search (poll_search) VALUES ('optimize')"))
+        db.commit()
+        return db.execute(text("SELECT count(*) FROM poll_search")).scalar()
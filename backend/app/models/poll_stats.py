@@ -0,0 +1,74 @@
+"""
+PollStats Model
+
+This model keeps running totals of polls per listing filter, so paginated listings can report
+exact totals without a COUNT over the polls table.
+
+Attributes:
+- name: The filter the counter belongs to, one of 'all', 'active' or 'closed'.
+- count: The number of polls matching that filter.
+
+Methods:
+- increment: A method to adjust counters inside the caller's transaction, used by Poll.create_poll and PollService.close_poll.
+- get_counts: A method to read all counters, rebuilding them first if any row is missing.
+- reconcile: A method to rebuild the counters from the polls table.
+
+The counters are updated in the same transaction as the poll change they reflect. A missing row
+(e.g. a freshly emptied table) is detected on read and repaired by reconcile, which also runs
+periodically to correct any drift.
+"""
+from sqlalchemy import Column, Integer, String, case, func, select
+from app.models import Base
+from app.databases.database import db
+
+FILTERS = ('all', 'active', 'closed')
+
+class PollStats(Base):
+    __tablename__ = 'poll_stats'
+    name = Column(String(16), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default='0')
+
+    @classmethod
+    def increment(cls, **deltas):
+        """Add deltas to the named counters (e.g. all=1, active=1) without committing"""
+        for name, delta in deltas.items():
+            db.query(cls).filter_by(name=name).update(
+                {cls.count: cls.count + delta}, synchronize_session=False
+            )
+
+    @classmethod
+    def get_counts(cls):
+        """Return {'all': n, 'active': n, 'closed': n}"""
+        counts = dict(db.query(cls.name, cls.count).all())
+        if any(name not in counts for name in FILTERS):
+            return cls.reconcile()
+        return counts
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Recount the polls per filter, store the counters and commit.
+
+        All counters are written by one UPDATE whose values are subqueries over polls, so a poll
+        created or closed while the reconcile runs cannot fall between the count and the write.
+        """
+        from app.models.poll import Poll
+
+        missing = set(FILTERS) - {name for name, in db.query(cls.name).all()}
+        for name in missing:
+            db.add(cls(name=name, count=0))
+        db.flush()
+
+        def count_polls(*criteria):
+            return select(func.count(Poll.id)).where(*criteria).scalar_subquery()
+
+        db.query(cls).filter(cls.name.in_(FILTERS)).update({
+            cls.count: case(
+                (cls.name == 'active', count_polls(Poll.is_active.is_(True))),
+                (cls.name == 'closed', count_polls(Poll.is_active.isnot(True))),
+                else_=count_polls()
+            )
+        }, synchronize_session=False)
+        counts = dict(db.query(cls.name, cls.count).filter(cls.name.in_(FILTERS)).all())
+        db.commit()
+        return counts
@@ -0,0 +1,68 @@
+"""
+RevokedToken Model
+
+This model records the JWT ids (jti) that may no longer be used: refresh tokens already exchanged
+for a new pair, and any token revoked explicitly. Rows are only needed until the token would have
+expired anyway, so the table stays small.
+
+Attributes:
+- jti: The unique id of the token, serving as the primary key.
+- expires_at: When the token expires; the row can be purged afterwards.
+- revoked_at: When the token was revoked, used to load new revocations incrementally.
+
+Methods:
+- insert: A method to record a revocation with a single INSERT, reporting whether the jti was new.
+- revoked_since: A method to read the revocations recorded after a point in time.
+- purge_expired: A method to delete the rows of tokens that have expired.
+
+Because jti is the primary key, inserting it is an atomic test-and-set: of two concurrent requests
+exchanging the same refresh token, exactly one INSERT succeeds.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, String
+from sqlalchemy.exc import IntegrityError
+from app.models import Base
+from app.databases.database import db
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = (
+        # Incremental loads and purges
+        Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def insert(cls, jti, expires_at):
+        """
+        Record a revoked jti and commit.
+
+        Returns:
+            bool: True if the jti was not revoked before.
+        """
+        try:
+            db.add(cls(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    @classmethod
+    def revoked_since(cls, since=None):
+        """Return (jti, expires_at, revoked_at) rows of unexpired tokens revoked after `since`"""
+        query = db.query(cls.jti, cls.expires_at, cls.revoked_at).filter(cls.expires_at > datetime.utcnow())
+        if since is not None:
+            query = query.filter(cls.revoked_at >= since)
+        return query.all()
+
+    @classmethod
+    def purge_expired(cls):
+        """Delete the rows of expired tokens, commit, and return how many were deleted"""
+        deleted = db.query(cls).filter(cls.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        db.commit()
+        return deleted
@@ -14,10 +14,12 @@ Attributes:
 Methods:
 - create_user: A method to handle the logic for creating a new user in the system.
 - get_user_by_id: A method to retrieve a user's information based on their unique ID.
+- hash_password / verify_password: Methods to hash and check passwords, through the app's password hasher when there is one.
 
 The User model ensures that each user has a unique username and email, and it securely stores passwords using hashing techniques. This model is designed to integrate with the authentication system, supporting user registration, login, and profile management.
 """
 
+from flask import current_app, has_app_context
 from sqlalchemy import Column, Integer, String
 from app.models import Base
 from app.databases.database import db
@@ -35,19 +37,40 @@ class User(Base):
 
     def __init__(self, username=None, email=None, password=None, oauth_provider=None, oauth_id=None):
         if password:
-            self.password_hash = generate_password_hash(password)
+            self.password_hash = self.hash_password(password)
         self.username = username
         self.email = email
         self.oauth_provider = oauth_provider
         self.oauth_id = oauth_id
 
+    @staticmethod
+    def password_hasher():
+        """The app's PasswordHasher, or None outside an app context"""
+        return getattr(current_app, 'password_hasher', None) if has_app_context() else None
+
+    @classmethod
+    def hash_password(cls, password):
+        """Hash a password, in the app's password hashing pool when there is one."""
+        hasher = cls.password_hasher()
+        if hasher is not None:
+            return hasher.hash(password)
+        return generate_password_hash(password)
+
+    @classmethod
+    def verify_password(cls, password_hash, password):
+        """Check a password against a hash, in the app's password hashing pool when there is one."""
+        hasher = cls.password_hasher()
+        if hasher is not None:
+            return hasher.verify(password_hash, password)
+        return bool(password_hash) and check_password_hash(password_hash, password)
+
     def set_password(self, password):
         """Set the password for a user with a hashed version."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = self.hash_password(password)
 
     def check_password(self, password):
         """Check if the provided password matches the stored hash."""
-        return check_password_hash(self.password_hash, password)
+        return self.verify_password(self.password_hash, password)
 
     @classmethod
     def create_user(self, username=None, email=None, password=None, oauth_provider=None, oauth_id=None):
@@ -12,15 +12,124 @@ Attributes:
 Methods:
 - record_vote: A method to handle the logic for recording a new vote in the system.
 - get_votes_by_poll: A method to retrieve all votes associated with a specific poll ID.
+- insert_ignoring_duplicates: Builds an INSERT that skips rows which would violate the one-vote-per-user constraint.
+- insert_many: Writes a batch of votes in one statement and reports which ones were actually inserted,
+  optionally skipping votes on polls that have been closed.
 
+The (poll_id, user_id) pair is unique, so the database itself guarantees a user votes at most once per poll.
 The Vote model ensures that each vote is associated with a specific user and poll, and it records the user's selected option. This model is designed to integrate with the voting system, supporting the accurate tracking and analysis of voting data.
 """
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Index, Integer, ForeignKey, UniqueConstraint, insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from app.models import Base
 
+# Rows per guarded INSERT ... SELECT, below SQLite's limit of 500 terms in a compound SELECT
+GUARDED_CHUNK_SIZE = 250
+
 class Vote(Base):
     __tablename__ = 'votes'
+    __table_args__ = (
+        UniqueConstraint('poll_id', 'user_id', name='uq_votes_poll_id_user_id'),
+        Index('ix_votes_poll_id_option_id', 'poll_id', 'option_id'),
+        Index('ix_votes_user_id_poll_id', 'user_id', 'poll_id'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     poll_id = Column(Integer, ForeignKey('polls.id'), nullable=False)
     option_id = Column(Integer, ForeignKey('voting_option.id'), nullable=False)
+
+    @classmethod
+    def insert_ignoring_duplicates(cls, dialect_name):
+        """
+        Build an INSERT into votes that silently skips rows conflicting on (poll_id, user_id).
+
+        Args:
+            dialect_name (str): Name of the SQLAlchemy dialect the statement will run on.
+
+        Returns:
+            Insert: The statement, or None if the dialect has no ON CONFLICT support
+            and the caller has to handle the IntegrityError itself.
+        """
+        dialects = {'sqlite': sqlite, 'postgresql': postgresql}
+        if dialect_name not in dialects:
+            return None
+        return dialects[dialect_name].insert(cls).on_conflict_do_nothing(
+            index_elements=['poll_id', 'user_id']
+        )
+
+    @classmethod
+    def insert_many(cls, conn, rows, active_only=False):
+        """
+        Insert a batch of votes with one executemany, skipping duplicates.
+
+        Args:
+            conn (Connection): Connection whose transaction the votes are written in.
+            rows (list): Dicts with poll_id, user_id and option_id keys.
+            active_only (bool): Skip votes on polls that are closed by the time the batch is written,
+                with the active check folded into an INSERT ... SELECT joined on polls.is_active.
+
+        Returns:
+            list: (poll_id, user_id, option_id) tuples of the votes actually inserted.
+        """
+        if not rows:
+            return []
+        if active_only:
+            inserted = []
+            for start in range(0, len(rows), GUARDED_CHUNK_SIZE):
+                inserted.extend(cls._insert_into_active_polls(conn, rows[start:start + GUARDED_CHUNK_SIZE]))
+            return inserted
+
+        stmt = cls.insert_ignoring_duplicates(conn.dialect.name)
+        if stmt is not None:
+            returning = stmt.returning(cls.poll_id, cls.user_id, cls.option_id)
+            return [tuple(row) for row in conn.execute(returning, rows)]
+
+        # No ON CONFLICT support: fall back to one savepoint per vote
+        inserted = []
+        for row in rows:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(cls), row)
+                inserted.append((row['poll_id'], row['user_id'], row['option_id']))
+            except IntegrityError:
+                pass
+        return inserted
+
+    @classmethod
+    def _insert_into_active_polls(cls, conn, rows):
+        from app.models.poll import Poll
+
+        def guard(rows):
+            batch = union_all(*[
+                select(
+                    literal(row['poll_id']).label('poll_id'),
+                    literal(row['user_id']).label('user_id'),
+                    literal(row['option_id']).label('option_id')
+                )
+                for row in rows
+            ]).subquery('batch')
+            return select(batch.c.poll_id, batch.c.user_id, batch.c.option_id).join(
+                Poll, Poll.id == batch.c.poll_id
+            ).where(Poll.is_active.is_(True))
+
+        columns = ['poll_id', 'user_id', 'option_id']
+        stmt = cls.insert_ignoring_duplicates(conn.dialect.name)
+        if stmt is not None:
+            returning = stmt.from_select(columns, guard(rows)).returning(cls.poll_id, cls.user_id, cls.option_id)
+            return [tuple(row) for row in conn.execute(returning)]
+
+        inserted = []
+        for row in rows:
+            try:
+                with conn.begin_nested():
+                    inserted.extend(
+                        tuple(r) for r in conn.execute(
+                            insert(cls).from_select(columns, guard([row])).returning(
+                                cls.poll_id, cls.user_id, cls.option_id
+                            )
+                        )
+                    )
+            except IntegrityError:
+                pass
+        return inserted
@@ -1,14 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, bindparam, update
 from sqlalchemy.orm import relationship
 from app.models import Base
 
 class VotingOption(Base):
     __tablename__ = 'voting_option'
     id = Column(Integer, primary_key=True)
-    poll_id = Column(Integer, ForeignKey('polls.id'), nullable=False)
+    poll_id = Column(Integer, ForeignKey('polls.id'), nullable=False, index=True)
     media_type = Column(String(50), nullable=False)
     media_url = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    # Denormalized tally maintained alongside each inserted Vote row
+    vote_count = Column(Integer, nullable=False, default=0, server_default='0')
 
     poll = relationship('Poll', back_populates='voting_options')
 
@@ -17,3 +19,15 @@ class VotingOption(Base):
         self.media_url = media_url
         self.description = description
         self.poll_id = poll_id
+
+    @classmethod
+    def increment_vote_counts(cls, conn, deltas):
+        """Add per-option vote deltas ({option_id: delta}) to the counters with one executemany"""
+        if not deltas:
+            return
+        conn.execute(
+            update(cls)
+            .where(cls.id == bindparam('b_option_id'))
+            .values(vote_count=cls.vote_count + bindparam('b_delta')),
+            [{'b_option_id': option_id, 'b_delta': delta} for option_id, delta in deltas.items()]
+        )
@@ -8,24 +8,49 @@ from app.services.auth_service import (
     handle_twitter_callback,
     redirect_to_facebook_auth,
     handle_facebook_callback,
-    create_user
+    create_user,
+    rotate_refresh_token
 )
+from app.utils.security import handle_auth_errors
+from app.services.password_hasher import HashingPoolSaturated
+from app.utils.rate_limit import client_ip, rate_limit
 
 auth_blueprint = Blueprint('auth', __name__)
 
+def hashing_unavailable():
+    """503 answered when the password hasher is saturated; clients retry shortly"""
+    response = jsonify({'error': 'Too many login attempts in progress, try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_blueprint.route('/login', methods=['POST'])
+@rate_limit('login', key=client_ip)
 def login():
     data = request.json
     username = data.get('username')
     password = data.get('password')
-    user = authenticate_user(username, password)
+    try:
+        user = authenticate_user(username, password)
+    except HashingPoolSaturated:
+        return hashing_unavailable()
     if user:
         tokens = generate_tokens(user)
         return jsonify(tokens)
     
     return jsonify({'error': 'Invalid credentials'}), 401
 
+@auth_blueprint.route('/auth/refresh', methods=['POST'])
+@handle_auth_errors
+def refresh():
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return jsonify({'error': 'refresh_token is required'}), 400
+
+    return jsonify(rotate_refresh_token(refresh_token))
+
 @auth_blueprint.route('/register', methods=['POST'])
+@rate_limit('login', key=client_ip)
 def register():
     data = request.json
     username = data.get('username')
@@ -41,6 +66,8 @@ def register():
         return jsonify(tokens)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except HashingPoolSaturated:
+        return hashing_unavailable()
 
 @auth_blueprint.route('/google/auth')
 def google_auth():
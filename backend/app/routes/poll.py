@@ -1,12 +1,29 @@
-from flask import request, Blueprint
+from flask import current_app, request, Blueprint
 from app.routes.poll_impl.create_poll import create_poll_impl
 from app.routes.poll_impl.get_polls import get_polls_impl
 from app.routes.poll_impl.get_poll import get_poll_impl
 from app.routes.poll_impl.poll_vote import poll_vote_impl
+from app.routes.poll_impl.batch_vote import batch_vote_impl
 from app.routes.poll_impl.get_poll_results import get_poll_results_impl
+from app.routes.poll_impl.stream_poll_results import stream_poll_results_impl
+from app.routes.poll_impl.get_feed import get_feed_impl
+from app.routes.poll_impl.get_trending_polls import get_trending_polls_impl
+from app.routes.poll_impl.search_polls import search_polls_impl
+from app.utils.rate_limit import rate_limit
 
 poll_blueprint = Blueprint('poll', __name__)
 
+def batch_vote_cost():
+    """
+    Charge a vote batch once per vote it carries. Oversized batches are charged
+    VOTE_BATCH_MAX_ITEMS, so the route answers them 400 rather than the limiter 429.
+    """
+    data = request.get_json(silent=True)
+    votes = data.get('votes') if isinstance(data, dict) else None
+    if not isinstance(votes, list) or not votes:
+        return 1
+    return min(len(votes), current_app.config.get('VOTE_BATCH_MAX_ITEMS', 500))
+
 # Provides a paginated list of polls.
 # Supports filtering by active or closed polls.
 # Returns a list of polls with basic details and pagination information.
@@ -15,10 +32,25 @@ poll_blueprint = Blueprint('poll', __name__)
 def get_polls():
     return get_polls_impl(request)
 
+# Returns the active polls with the most recent voting activity.
+# Served from a ranking refreshed every TRENDING_REFRESH_INTERVAL_S, not from an aggregate over votes.
+# Get trending polls
+@poll_blueprint.route('/polls/trending', methods=['GET'])
+def get_trending_polls():
+    return get_trending_polls_impl(request)
+
+# Full-text search over poll questions and option descriptions.
+# Results are ranked by BM25 relevance; every word also matches as a prefix.
+# Search polls
+@poll_blueprint.route('/polls/search', methods=['GET'])
+def search_polls():
+    return search_polls_impl(request)
+
 # Handles the creation of a new poll.
 # Validates and saves media if provided.
 # Ensures that each poll has exactly two options.
 @poll_blueprint.route('/polls', methods=['POST'])
+@rate_limit('create_poll')
 def create_poll():
     return create_poll_impl(request)
 
@@ -27,16 +59,27 @@ def create_poll():
 # Retrieve specific poll
 @poll_blueprint.route('/polls/<int:poll_id>', methods=['GET'])
 def get_poll(poll_id):
-    return get_poll_impl(poll_id)
+    return get_poll_impl(poll_id, request)
 
 # Allows users to vote on a poll.
 # Ensures that the user has not already voted and that the poll is not closed.
 # Records the vote in the database.
 # Vote on a poll
 @poll_blueprint.route('/polls/<int:poll_id>/vote', methods=['POST'])
+@rate_limit('vote')
 def vote(poll_id):
     return poll_vote_impl(poll_id, request)
 
+# Records many votes of the current user in one request.
+# Meant for clients replaying votes collected while offline.
+# Returns a per-vote status in request order.
+# Each vote in the batch counts against the user's batch vote rate.
+# Vote on many polls
+@poll_blueprint.route('/polls/votes:batch', methods=['POST'])
+@rate_limit('batch_vote', cost=batch_vote_cost)
+def batch_vote():
+    return batch_vote_impl(request)
+
 
 # Retrieves the results of a closed poll.
 # Calculates the percentage of votes for each option.
@@ -44,7 +87,22 @@ def vote(poll_id):
 # Get closed poll results
 @poll_blueprint.route('/polls/<int:poll_id>/results', methods=['GET'])
 def get_poll_results(poll_id):
-    return get_poll_results_impl(poll_id)
+    return get_poll_results_impl(poll_id, request)
+
+# Streams live vote tallies of a poll over Server-Sent Events.
+# Tallies are pushed at most once per LIVE_TALLY_INTERVAL_MS and only when they change.
+# Quiet streams receive keep-alive comments so dead connections are dropped.
+# Watch poll results live
+@poll_blueprint.route('/polls/<int:poll_id>/results/stream', methods=['GET'])
+def stream_poll_results(poll_id):
+    return stream_poll_results_impl(poll_id)
+
+# Returns the next active polls the current user has not voted on, newest first.
+# Backed by a per-user candidate queue; pass next_cursor back to read further.
+# Get the current user's feed
+@poll_blueprint.route('/feed', methods=['GET'])
+def get_feed():
+    return get_feed_impl(request)
 
 # # Allows the creator of a poll to close it, preventing further voting.
 # # Ensures that only the creator can close the poll.
@@ -0,0 +1,34 @@
+from flask import current_app, jsonify
+import werkzeug
+
+from app.utils.security import get_request_user, handle_auth_errors
+
+@handle_auth_errors
+def batch_vote_impl(request):
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Request must be JSON"}), 400
+
+        votes = data.get('votes')
+        if not isinstance(votes, list) or not votes:
+            return jsonify({"error": "votes must be a non-empty list"}), 400
+
+        max_items = current_app.config.get('VOTE_BATCH_MAX_ITEMS', 500)
+        if len(votes) > max_items:
+            return jsonify({"error": f"A batch can contain at most {max_items} votes"}), 400
+
+        user = get_request_user()
+
+        results = current_app.poll_service.record_votes_batch(user.id, votes)
+
+        return jsonify({
+            "results": results,
+            "recorded": sum(1 for result in results if result["status"] == 201)
+        }), 200
+
+    except werkzeug.exceptions.HTTPException as e:
+        return jsonify({"error": e.description}), e.code
+    except Exception as e:
+        current_app.logger.error(f"Error recording vote batch: {str(e)}")
+        return jsonify({"error": "Failed to record votes"}), 500
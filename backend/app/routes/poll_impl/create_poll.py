@@ -1,7 +1,7 @@
 from sqlite3 import IntegrityError
 from flask import current_app, jsonify, request
 
-from app.utils.security import get_current_user, handle_auth_errors
+from app.utils.security import get_request_user, handle_auth_errors
 from app import db
 
 @handle_auth_errors
@@ -29,7 +29,7 @@ def create_poll_impl(request):
                 if 'media_url' not in option and 'file' not in request.files:
                     return jsonify({"error": "Options must contain either media_url or file"}), 400
 
-        user = get_current_user()
+        user = get_request_user()
 
         # Create poll using service layer
         poll = current_app.poll_service.create_new_poll(
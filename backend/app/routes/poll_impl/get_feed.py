@@ -0,0 +1,35 @@
+from flask import current_app, jsonify
+import werkzeug
+
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.security import get_request_user, handle_auth_errors
+from app.utils.serialization import json_response, splice_object
+
+@handle_auth_errors
+def get_feed_impl(request):
+    # Outside the try block so auth errors reach handle_auth_errors
+    user = get_request_user()
+    try:
+        default_limit = current_app.config.get('FEED_DEFAULT_LIMIT', 10)
+        max_limit = current_app.config.get('FEED_MAX_LIMIT', 50)
+        limit = request.args.get('limit', default_limit, type=int)
+        if limit < 1 or limit > max_limit:
+            return jsonify({"error": f"limit must be between 1 and {max_limit}"}), 400
+
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        polls, next_after = current_app.poll_service.get_feed(user.id, limit, after, encoded=True)
+
+        return json_response(splice_object("polls", polls, {
+            "next_cursor": encode_cursor(*next_after) if next_after else None
+        }))
+
+    except werkzeug.exceptions.HTTPException as e:
+        return jsonify({"error": e.description}), e.code
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving feed: {str(e)}")
+        return jsonify({"error": "Failed to retrieve feed"}), 500
@@ -1,22 +1,38 @@
 from flask import current_app, jsonify
 
-def get_poll_impl(poll_id):
+from app.utils.conditional import add_validators, is_conditional, is_not_modified, not_modified, poll_etag
+from app.models.poll import Poll
+from app.utils.serialization import json_response
+from app.utils.validation import parse_fields
+
+def get_poll_impl(poll_id, request):
     try:
         if not poll_id or poll_id < 1:
             return jsonify({"error": "Invalid poll ID"}), 400
-            
-        poll_details = current_app.poll_service.get_poll_details(poll_id)
-        if not poll_details:
+
+        try:
+            fields = parse_fields(request.args.get('fields'), Poll.FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        poll_service = current_app.poll_service
+        if is_conditional(request):
+            # Revalidation reads only the validators, by primary key
+            validators = poll_service.get_poll_validators(poll_id)
+            if validators is None:
+                return jsonify({"error": "Poll not found"}), 404
+            version, updated_at = validators
+            etag = poll_etag('poll', poll_id, version, fields)
+            if is_not_modified(request, etag, updated_at):
+                return not_modified(etag, updated_at)
+
+        loaded = poll_service.get_poll_payload(poll_id, fields)
+        if loaded is None:
             return jsonify({"error": "Poll not found"}), 404
-            
-        return jsonify({
-            "id": poll_details["id"],
-            "question": poll_details["question"],
-            "options": poll_details["options"],
-            "created_at": poll_details["created_at"],
-            "is_active": poll_details["is_active"]
-        }), 200
+
+        payload, (version, updated_at) = loaded
+        return add_validators(json_response(payload), poll_etag('poll', poll_id, version, fields), updated_at)
         
     except Exception as e:
         current_app.logger.error(f"Error retrieving poll: {str(e)}")
-        return jsonify({"error": "Failed to retrieve poll"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to retrieve poll"}), 500
@@ -1,38 +1,28 @@
 from flask import current_app, jsonify
+import werkzeug
 
-from app.models.poll import Poll
+from app.utils.conditional import add_validators, is_not_modified, not_modified, poll_etag
 
 
-def get_poll_results_impl(poll_id):
+def get_poll_results_impl(poll_id, request):
     try:
         if not poll_id or poll_id < 1:
             return jsonify({"error": "Invalid poll ID"}), 400
-            
-        poll = Poll.get_poll_by_id(poll_id)
-        if poll.is_active:
-            return jsonify({"error": "Poll results are not available yet"}), 403
 
-        options = [
-            {
-                "id": option.id,
-                "text": option.description,
-                "vote_count": len(poll.get_votes_for_option(option.id))
-            }
-            for option in poll.voting_options
-        ]
+        # Validators are read before the results, so the ETag is never newer than the body
+        validators = current_app.poll_service.get_poll_validators(poll_id)
+        if validators is None:
+            return jsonify({"error": "Poll not found"}), 404
+        version, updated_at = validators
+        etag = poll_etag('results', poll_id, version)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
 
-        total_votes = sum([option['vote_count'] for option in options])
-        results = [
-            {**option, "percentage": (option["vote_count"] / total_votes) * 100 if total_votes > 0 else 0}
-            for option in options
-        ]
+        results = current_app.poll_service.get_poll_results(poll_id)
 
-        return jsonify({
-            "id": poll.id,
-            "question": poll.question,
-            "results": results,
-            "total_votes": total_votes
-        }), 200
+        return add_validators(jsonify(results), etag, updated_at), 200
+    except werkzeug.exceptions.HTTPException as e:
+        return jsonify({"error": e.description}), e.code
     except Exception as e:
         current_app.logger.error(f"Error retrieving poll: {str(e)}")
-        return jsonify({"error": "Failed to retrieve poll"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to retrieve poll"}), 500
@@ -1,7 +1,12 @@
 from flask import current_app, jsonify
 
 from app.models.poll import Poll
+from app.models.poll_stats import PollStats
 from app.databases.database import db
+from app.utils.conditional import add_validators, digest_etag, is_not_modified, not_modified
+from app.utils.pagination import apply_keyset, encode_cursor
+from app.utils.serialization import json_response, splice_object
+from app.utils.validation import parse_fields
 
 
 def get_polls_impl(request):
@@ -9,26 +14,115 @@ def get_polls_impl(request):
     per_page = current_app.config.get('PAGINATION_PER_PAGE', 10)
     filter_type = request.args.get('filter', 'all')
     order = request.args.get('order', 'desc')
+    # Cursor mode is selected by passing `cursor`, empty for the first page
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+
+    try:
+        fields = parse_fields(request.args.get('fields'), Poll.FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ids = request.args.get('ids')
+    if ids is not None:
+        return get_polls_by_ids(request, ids, fields)
+
+    if filter_type not in ('active', 'closed'):
+        filter_type = 'all'
 
     query = db.query(Poll)
-    if order == 'asc':
-        query = query.order_by(Poll.created_at.asc())
-    else:
-        query = query.order_by(Poll.created_at.desc())
     if filter_type == 'active':
         query = query.filter_by(is_active=True)
     elif filter_type == 'closed':
         query = query.filter_by(is_active=False)
 
-    total_count = query.count()
-    total_pages = (total_count + per_page - 1) // per_page
-    offset = (page - 1) * per_page
+    try:
+        paged = apply_keyset(query, Poll.created_at, Poll.id, order, cursor or None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if cursor is None:
+        # Page mode for older clients: offset paging, always reports total_pages
+        paged = paged.offset((page - 1) * per_page)
+        include_total = True
+    # One extra row tells whether there is a next page
+    paged = paged.limit(per_page + 1)
+
+    def page_etag(keys, total_count):
+        # Covers every input of the body: the request, the page's polls and versions, and the total
+        return digest_etag(filter_type, order, page, cursor, per_page, include_total, fields, keys, total_count)
+
+    if request.if_none_match:
+        # Revalidation reads only the keys of the page, not the polls and their options
+        keys = [tuple(row) for row in paged.with_entities(Poll.id, Poll.version).all()]
+        total_count = PollStats.get_counts()[filter_type] if include_total else None
+        etag = page_etag(keys, total_count)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+
+    # Options of the whole page come from one IN query instead of one query per poll,
+    # and are not loaded at all when `fields` leaves them out
+    polls = paged.options(*Poll.loader_options(fields)).all()
+    keys = [(poll.id, poll.version) for poll in polls]
+    has_more = len(polls) > per_page
+    polls = polls[:per_page]
+    response = {"current_page": page} if cursor is None else {}
+
+    last = polls[-1] if polls else None
+    response["next_cursor"] = encode_cursor(last.created_at, last.id) if has_more else None
+
+    total_count = None
+    if include_total:
+        # Maintained counters instead of a COUNT over polls
+        total_count = PollStats.get_counts()[filter_type]
+        response["total_count"] = total_count
+        response["total_pages"] = (total_count + per_page - 1) // per_page
+
+    # Cached per-poll bytes are spliced into the body instead of re-encoding every poll
+    payloads = [current_app.poll_service.encode_poll(poll, fields) for poll in polls]
+    # Lists have no single modification time, so they are validated by ETag only
+    return add_validators(json_response(splice_object("polls", payloads, response)), page_etag(keys, total_count))
+
+
+def parse_ids(value, max_ids):
+    """Parse a comma separated list of poll ids, dropping repeats but keeping the first-seen order"""
+    try:
+        poll_ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma separated list of integers")
+    poll_ids = list(dict.fromkeys(poll_ids))
+    if not poll_ids:
+        raise ValueError("ids must name at least one poll")
+    if len(poll_ids) > max_ids:
+        raise ValueError(f"At most {max_ids} ids can be requested at once")
+    return poll_ids
+
+
+def get_polls_by_ids(request, ids, fields):
+    """Multi-get: the polls named by `ids`, in request order, plus the ids that do not exist"""
+    try:
+        poll_ids = parse_ids(ids, current_app.config.get('POLLS_MAX_IDS', 100))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = db.query(Poll).filter(Poll.id.in_(poll_ids))
+
+    def ids_etag(keys):
+        # The requested order and the found (id, version) pairs determine the whole body
+        return digest_etag('ids', fields, poll_ids, sorted(keys))
 
-    polls = query.limit(per_page).offset(offset).all()
-    polls = [poll.to_dict() for poll in polls]
+    if request.if_none_match:
+        keys = [tuple(row) for row in query.with_entities(Poll.id, Poll.version).all()]
+        etag = ids_etag(keys)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
 
-    return jsonify({
-        "polls": polls,
-        "total_pages": total_pages,
-        "current_page": page
-    }), 200
+    # One IN query for the polls and, unless `fields` leaves them out, one for their options
+    by_id = {poll.id: poll for poll in query.options(*Poll.loader_options(fields)).all()}
+    payloads = [
+        current_app.poll_service.encode_poll(by_id[poll_id], fields)
+        for poll_id in poll_ids if poll_id in by_id
+    ]
+    missing = [poll_id for poll_id in poll_ids if poll_id not in by_id]
+    etag = ids_etag([(poll.id, poll.version) for poll in by_id.values()])
+    return add_validators(json_response(splice_object("polls", payloads, {"missing": missing})), etag)
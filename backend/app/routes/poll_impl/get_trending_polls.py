@@ -0,0 +1,19 @@
+from flask import current_app, jsonify
+
+from app.utils.serialization import json_response, splice_object
+
+
+def get_trending_polls_impl(request):
+    try:
+        max_limit = current_app.config.get('TRENDING_TOP_K', 100)
+        limit = request.args.get('limit', 10, type=int)
+        if limit < 1 or limit > max_limit:
+            return jsonify({"error": f"limit must be between 1 and {max_limit}"}), 400
+
+        polls = current_app.poll_service.get_trending_polls(limit, encoded=True)
+
+        return json_response(splice_object("polls", polls))
+
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving trending polls: {str(e)}")
+        return jsonify({"error": "Failed to retrieve trending polls"}), 500
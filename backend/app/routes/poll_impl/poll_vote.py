@@ -2,7 +2,8 @@ from sqlite3 import IntegrityError
 from flask import current_app, jsonify
 import werkzeug
 
-from app.utils.security import get_current_user, handle_auth_errors
+from app.services.vote_ingestion import QUEUED
+from app.utils.security import get_request_user, handle_auth_errors
 from app import db
 
 @handle_auth_errors
@@ -15,7 +16,7 @@ def poll_vote_impl(poll_id, request):
         if 'option_id' not in data:
             return jsonify({"error": "Missing option_id"}), 400
         
-        user = get_current_user()
+        user = get_request_user()
 
         # Vote using service layer
         vote_result = current_app.poll_service.record_vote(
@@ -24,11 +25,13 @@ def poll_vote_impl(poll_id, request):
             user_id=user.id
         )
 
+        # Buffered ingestion answers before the vote is committed
+        status_code = 202 if vote_result == QUEUED else 201
         return jsonify({
             "result": vote_result,
             "poll_id": poll_id,
             "option_id": data['option_id']
-        }), 201
+        }), status_code
     
     except werkzeug.exceptions.HTTPException as e:
         return jsonify({"error": e.description}), e.code
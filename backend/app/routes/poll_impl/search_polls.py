@@ -0,0 +1,36 @@
+from flask import current_app, jsonify
+import werkzeug
+
+from app.utils.pagination import decode_score_cursor, encode_score_cursor
+from app.utils.serialization import json_response, splice_object
+
+
+def search_polls_impl(request):
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Missing search query"}), 400
+
+        default_limit = current_app.config.get('SEARCH_DEFAULT_LIMIT', 20)
+        max_limit = current_app.config.get('SEARCH_MAX_LIMIT', 100)
+        limit = request.args.get('limit', default_limit, type=int)
+        if limit < 1 or limit > max_limit:
+            return jsonify({"error": f"limit must be between 1 and {max_limit}"}), 400
+
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_score_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        polls, next_after = current_app.poll_service.search_polls(query, limit, after, encoded=True)
+
+        return json_response(splice_object("polls", polls, {
+            "next_cursor": encode_score_cursor(*next_after) if next_after else None
+        }))
+
+    except werkzeug.exceptions.HTTPException as e:
+        return jsonify({"error": e.description}), e.code
+    except Exception as e:
+        current_app.logger.error(f"Error searching polls: {str(e)}")
+        return jsonify({"error": "Failed to search polls"}), 500
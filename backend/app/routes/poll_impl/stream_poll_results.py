@@ -0,0 +1,25 @@
+from flask import current_app, jsonify, Response
+
+from app.models.poll import Poll
+
+
+def stream_poll_results_impl(poll_id):
+    try:
+        if not poll_id or poll_id < 1:
+            return jsonify({"error": "Invalid poll ID"}), 400
+
+        if not Poll.get_poll_by_id(poll_id):
+            return jsonify({"error": "Poll not found"}), 404
+
+        return Response(
+            current_app.poll_service.live_tallies.stream(poll_id),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                # Stop reverse proxies from buffering the stream
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error streaming poll results: {str(e)}")
+        return jsonify({"error": "Failed to stream poll results"}), 500
@@ -2,7 +2,8 @@ from app.config import settings
 from flask import redirect, url_for
 from authlib.integrations.flask_client import OAuth
 from app.models.user import User
-from werkzeug.security import check_password_hash
+from app.databases.database import db
+from app.services.password_hasher import HashingPoolSaturated
 
 oauth = OAuth()
 
@@ -27,25 +28,47 @@ google = oauth.register(
 )
 
 def authenticate_user(username, password):
+    """
+    Check a username and password, upgrading the stored hash when the hashing cost changed.
+
+    Raises:
+        HashingPoolSaturated: If the password hasher is saturated before the password was verified
+    """
     user = User.get_user_by_username(username)
-    if user and check_password_hash(user.password_hash, password):
+    if user and user.check_password(password):
+        hasher = User.password_hasher()
+        if hasher is not None and hasher.needs_rehash(user.password_hash):
+            try:
+                # The only moment the plain password is known again
+                user.set_password(password)
+                db.commit()
+            except HashingPoolSaturated:
+                # The password was right; upgrade the hash at a later login rather than fail this one
+                pass
         return user
     return None
 
 import datetime
+import uuid
 import jwt
+from flask import current_app
+from app.utils.security import JWTDecodingError, decode_token
 
 def generate_tokens(user):
     # Generate access token with 15 minute expiration
     access_token = jwt.encode({
         'user_id': user.id,
         'username': user.username,
+        'type': 'access',
+        'jti': uuid.uuid4().hex,
         'exp': datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
     }, settings.JWT_SECRET_KEY, algorithm='HS256')
 
-    # Generate refresh token with 7 day expiration
+    # Generate refresh token with 7 day expiration; each one can be exchanged once
     refresh_token = jwt.encode({
         'user_id': user.id,
+        'type': 'refresh',
+        'jti': uuid.uuid4().hex,
         'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
     }, settings.JWT_SECRET_KEY, algorithm='HS256')
 
@@ -55,6 +78,26 @@ def generate_tokens(user):
         'token_type': 'bearer'
     }
 
+def rotate_refresh_token(refresh_token):
+    """
+    Exchange a refresh token for a new access and refresh token pair, without the password.
+
+    The old refresh token is consumed atomically, so replaying it (or racing it) fails.
+
+    Raises:
+        JWTTokenExpired: If the refresh token is expired
+        JWTDecodingError: If it is invalid, not a refresh token, already used, or its user is gone
+    """
+    claims = decode_token(refresh_token)
+    if claims.get('type') != 'refresh':
+        raise JWTDecodingError("Not a refresh token")
+    if not current_app.revocation_store.consume(claims):
+        raise JWTDecodingError("Refresh token has already been used")
+    user = current_app.user_cache.get_user(claims['user_id'])
+    if user is None:
+        raise JWTDecodingError("User no longer exists")
+    return generate_tokens(user)
+
 def redirect_to_google_auth():
     return google.authorize_redirect(redirect_uri=settings.GOOGLE_REDIRECT_URI)
 
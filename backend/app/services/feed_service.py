@@ -0,0 +1,182 @@
+"""
+Feed Service
+
+Per-user queues of active polls the user has not voted on yet, newest first.
+A queue is built lazily by scanning active polls in (created_at, id) order in
+batches, skipping the polls the vote membership index says the user voted on,
+so serving the feed never runs an anti-join against votes and its cost does
+not grow with the user's voting history.
+
+Each queue remembers two scan positions: the newest poll it has seen, used to
+pick up polls created since with one indexed query per request, and the oldest
+one, from where the next bulk refill continues once the queue runs short.
+Votes trim the voter's queue right away. Queues are capped in length and kept
+for the most recently active users only; an evicted user's queue is rebuilt on
+their next request.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import tuple_
+
+from app.databases.database import db
+from app.models.poll import Poll
+
+
+class FeedQueue:
+    """Candidate polls of one user, keyed by poll id and ordered newest first"""
+
+    __slots__ = ('candidates', 'newest', 'oldest', 'exhausted', 'lock')
+
+    def __init__(self):
+        # poll_id -> (created_at, poll_id)
+        self.candidates = OrderedDict()
+        self.newest = None
+        self.oldest = None
+        self.exhausted = False
+        self.lock = threading.Lock()
+
+
+class FeedService:
+    """Serves the unvoted-poll feed from per-user candidate queues"""
+
+    def __init__(self, max_users=10000, batch_size=200, max_candidates=1000, max_scans=10):
+        """
+        Args:
+            max_users: Number of users whose queue is kept in memory
+            batch_size: Polls scanned per refill query
+            max_candidates: Longest a single user's queue may grow
+            max_scans: Refill queries one request may run before returning what it found
+        """
+        # Callable taking a user id and poll ids and returning the subset the user voted on
+        self.voted_among = None
+        self.max_users = max_users
+        self.batch_size = batch_size
+        self.max_candidates = max_candidates
+        self.max_scans = max_scans
+        self._queues = OrderedDict()
+        self._lock = threading.Lock()
+
+    def next_polls(self, user_id, limit, after=None):
+        """
+        Return the keys of the next polls in a user's feed.
+
+        Args:
+            user_id: The user whose feed is read
+            limit: Maximum number of polls to return
+            after: (created_at, id) of the last poll the client has seen, or None for the top
+
+        Returns:
+            tuple: A list of (created_at, poll_id) keys, newest first, and the position
+            to continue after, or None when the feed has nothing more.
+        """
+        queue = self._queue(user_id)
+        scans = 0
+        with queue.lock:
+            self._refill_newer(user_id, queue)
+            while True:
+                keys = [key for key in queue.candidates.values() if after is None or key < after]
+                if len(keys) > limit or queue.exhausted:
+                    return self._page(keys, limit, None)
+                if len(queue.candidates) >= self.max_candidates or scans >= self.max_scans:
+                    break
+                self._refill_older(user_id, queue)
+                scans += 1
+            # Reading past the end of a full queue: continue without growing it
+            position = queue.oldest if after is None or after > queue.oldest else after
+
+        while scans < self.max_scans:
+            batch = self._scan(position, newer=False)
+            scans += 1
+            keys.extend(self._unvoted(user_id, batch))
+            if len(keys) > limit or len(batch) < self.batch_size:
+                return self._page(keys, limit, None)
+            position = batch[-1]
+        # Scan budget spent, e.g. on a long run of polls the user voted on
+        return self._page(keys, limit, position)
+
+    def discard(self, user_id, poll_id):
+        """Drop a poll from a user's queue, e.g. once the user voted on it or it closed"""
+        with self._lock:
+            queue = self._queues.get(user_id)
+        if queue is not None:
+            with queue.lock:
+                queue.candidates.pop(poll_id, None)
+
+    def record_votes(self, votes):
+        """
+        Trim the queues of users who just voted
+
+        Args:
+            votes: (poll_id, user_id, option_id) tuples
+        """
+        for poll_id, user_id, _ in votes:
+            self.discard(user_id, poll_id)
+
+    @staticmethod
+    def _page(keys, limit, position):
+        if len(keys) > limit:
+            return keys[:limit], keys[limit - 1]
+        return keys, position
+
+    def _queue(self, user_id):
+        with self._lock:
+            queue = self._queues.get(user_id)
+            if queue is None:
+                queue = self._queues[user_id] = FeedQueue()
+                while len(self._queues) > self.max_users:
+                    self._queues.popitem(last=False)
+            else:
+                self._queues.move_to_end(user_id)
+            return queue
+
+    def _scan(self, position, newer):
+        query = db.query(Poll.created_at, Poll.id).filter(Poll.is_active.is_(True))
+        if newer:
+            query = query.order_by(Poll.created_at.asc(), Poll.id.asc())
+            if position is not None:
+                query = query.filter(tuple_(Poll.created_at, Poll.id) > tuple_(*position))
+        else:
+            query = query.order_by(Poll.created_at.desc(), Poll.id.desc())
+            if position is not None:
+                query = query.filter(tuple_(Poll.created_at, Poll.id) < tuple_(*position))
+        return [tuple(row) for row in query.limit(self.batch_size).all()]
+
+    def _unvoted(self, user_id, keys):
+        voted = self.voted_among(user_id, [poll_id for _, poll_id in keys])
+        return [key for key in keys if key[1] not in voted]
+
+    def _refill_newer(self, user_id, queue):
+        # Nothing scanned yet: the first older refill starts from the top anyway
+        if queue.newest is None:
+            return
+        keys = self._scan(queue.newest, newer=True)
+        if not keys:
+            return
+        queue.newest = keys[-1]
+        for key in self._unvoted(user_id, keys):
+            queue.candidates[key[1]] = key
+            queue.candidates.move_to_end(key[1], last=False)
+        self._trim(queue)
+
+    def _refill_older(self, user_id, queue):
+        keys = self._scan(queue.oldest, newer=False)
+        if len(keys) < self.batch_size:
+            queue.exhausted = True
+        if not keys:
+            return
+        if queue.newest is None:
+            queue.newest = keys[0]
+        queue.oldest = keys[-1]
+        for key in self._unvoted(user_id, keys):
+            queue.candidates[key[1]] = key
+        self._trim(queue)
+
+    def _trim(self, queue):
+        # Forget the oldest candidates past the cap; the scan resumes from the oldest one kept
+        if len(queue.candidates) <= self.max_candidates:
+            return
+        while len(queue.candidates) > self.max_candidates:
+            queue.candidates.popitem(last=True)
+        queue.oldest = next(reversed(queue.candidates.values()))
+        queue.exhausted = False
@@ -0,0 +1,233 @@
+"""
+Hot Poll Counters
+
+When one poll receives a burst of votes, every vote transaction updates the
+same voting_option row and those updates serialize on its row lock. Polls
+whose vote rate crosses a threshold are switched to hot mode: their votes are
+still inserted one by one, but the counter increments go to in-memory striped
+counters instead. Each thread is given a stripe, with its own lock, round-robin
+the first time it writes, so writers rarely contend, and a flusher thread merges the stripes and writes
+them with one UPDATE per option every flush interval.
+
+Until a delta is flushed it is only visible in this process, which is why
+hot mode is off by default and meant for single-worker deployments. Readers load
+counters through read_with_pending(), which holds the flush lock while reading
+so a delta is never seen both in the database and in memory. Deltas lost in a
+crash are repaired by `flask votes reconcile-counts`.
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+
+from app.models.poll import Poll
+from app.models.voting_option import VotingOption
+
+logger = logging.getLogger(__name__)
+
+
+class _Stripe:
+    __slots__ = ('lock', 'deltas')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deltas = Counter()
+
+
+class HotPollCounters:
+    """Vote-rate detection plus striped, periodically flushed counters for hot polls"""
+
+    def __init__(self, engine, votes_per_second=50, cooldown_s=10, flush_interval_ms=250, stripes=16,
+                 clock=time.monotonic):
+        """
+        Args:
+            engine: Engine the flusher writes the merged counters with
+            votes_per_second: Vote rate at which a poll becomes hot, 0 disables hot mode
+            cooldown_s: How long a poll stays hot after its rate last crossed the threshold
+            flush_interval_ms: Time between two flushes of the striped counters
+            stripes: Number of independent counter stripes
+            clock: Monotonic clock the vote rates and cooldowns are measured with
+        """
+        self.engine = engine
+        self.votes_per_second = votes_per_second
+        self.cooldown = cooldown_s
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.clock = clock
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        # Thread idents are aligned addresses and share their low bits, so stripes are dealt out instead
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+        # poll_id -> [current second, votes seen in it]
+        self._rates = {}
+        # poll_id -> monotonic time until which the poll stays hot
+        self._hot_until = {}
+        self._rate_second = None
+        self._rate_lock = threading.Lock()
+        # Held while a flush moves deltas from memory to the database, and by readers
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # Set by the poll service: called with the ids of the polls a flush wrote to
+        self.on_flush = None
+        self.flushes = 0
+
+    def observe(self, poll_id):
+        """
+        Count a vote attempt on a poll and report whether the poll is hot.
+
+        Returns:
+            bool: True if the counter increment should go through add()
+        """
+        if not self.votes_per_second:
+            return False
+        now = self.clock()
+        second = int(now)
+        with self._rate_lock:
+            if second != self._rate_second:
+                # Forget polls that received no vote in the last second, and polls whose cooldown ended
+                self._rates = {p: r for p, r in self._rates.items() if r[0] >= second - 1}
+                self._hot_until = {p: until for p, until in self._hot_until.items() if until >= now}
+                self._rate_second = second
+            rate = self._rates.get(poll_id)
+            if rate is None or rate[0] != second:
+                rate = self._rates[poll_id] = [second, 0]
+            rate[1] += 1
+            if rate[1] >= self.votes_per_second:
+                self._hot_until[poll_id] = now + self.cooldown
+            hot_until = self._hot_until.get(poll_id)
+            if hot_until is None:
+                return False
+            if hot_until < now:
+                del self._hot_until[poll_id]
+                return False
+            return True
+
+    def is_hot(self, poll_id):
+        with self._rate_lock:
+            return self._hot_until.get(poll_id, 0) >= self.clock()
+
+    def add(self, poll_id, option_id, delta=1):
+        """Record a counter increment for a hot poll, to be written by the next flush"""
+        stripe = self._stripe()
+        with stripe.lock:
+            stripe.deltas[(poll_id, option_id)] += delta
+        self._ensure_flusher()
+
+    def _stripe(self):
+        stripe = getattr(self._local, 'stripe', None)
+        if stripe is None:
+            # count() is atomic under the GIL
+            stripe = self._local.stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+        return stripe
+
+    def pending(self, poll_ids=None):
+        """
+        Return the unflushed deltas.
+
+        Args:
+            poll_ids: Only report these polls, or None for all
+
+        Returns:
+            dict: Mapping of poll_id to {option_id: delta}
+        """
+        wanted = set(poll_ids) if poll_ids is not None else None
+        pending = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                items = list(stripe.deltas.items())
+            for (poll_id, option_id), delta in items:
+                if wanted is None or poll_id in wanted:
+                    options = pending.setdefault(poll_id, {})
+                    options[option_id] = options.get(option_id, 0) + delta
+        return pending
+
+    def read_with_pending(self, poll_ids, read):
+        """
+        Read counters from the database together with the unflushed deltas, without racing a flush.
+
+        Args:
+            poll_ids: Polls being read
+            read: Callable loading the counters from the database
+
+        Returns:
+            tuple: The result of read() and pending(poll_ids); adding the two gives exact counts.
+        """
+        with self._flush_lock:
+            return read(), self.pending(poll_ids)
+
+    def flush(self):
+        """
+        Write all pending deltas with one UPDATE per option, and bump the version of their polls.
+
+        Returns:
+            int: Number of options whose counter was updated.
+        """
+        with self._flush_lock:
+            deltas = Counter()
+            for stripe in self._stripes:
+                with stripe.lock:
+                    taken, stripe.deltas = stripe.deltas, Counter()
+                deltas.update(taken)
+            if not deltas:
+                return 0
+            by_option = Counter()
+            for (_, option_id), delta in deltas.items():
+                by_option[option_id] += delta
+            try:
+                with self.engine.begin() as conn:
+                    VotingOption.increment_vote_counts(conn, by_option)
+                    # One version bump per poll and flush rather than per vote
+                    Poll.touch(conn, {poll_id for poll_id, _ in deltas})
+            except Exception:
+                # Put the deltas back so the next flush retries them
+                stripe = self._stripes[0]
+                with stripe.lock:
+                    stripe.deltas.update(deltas)
+                raise
+            self.flushes += 1
+        if self.on_flush is not None:
+            self.on_flush({poll_id for poll_id, _ in deltas})
+        return len(by_option)
+
+    def close(self):
+        """Flush whatever is still pending"""
+        self.flush()
+
+    def _ensure_flusher(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hot-poll-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush hot poll counters")
+            with self._thread_lock:
+                # Stop once nothing is pending; the next add() starts a new flusher
+                if not any(stripe.deltas for stripe in self._stripes):
+                    self._thread = None
+                    return
+
+
+def create_hot_counters(config, engine):
+    """
+    Build the hot poll counters described by the app config.
+
+    Returns:
+        HotPollCounters: The counters, or None when HOT_POLL_VOTES_PER_SECOND is 0.
+    """
+    votes_per_second = config.get('HOT_POLL_VOTES_PER_SECOND', 0)
+    if not votes_per_second:
+        return None
+    return HotPollCounters(
+        engine,
+        votes_per_second=votes_per_second,
+        cooldown_s=config.get('HOT_POLL_COOLDOWN_S', 10),
+        flush_interval_ms=config.get('HOT_POLL_FLUSH_INTERVAL_MS', 250),
+        stripes=config.get('HOT_POLL_STRIPES', 16)
+    )
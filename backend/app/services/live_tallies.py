@@ -0,0 +1,172 @@
+"""
+Live Tallies
+
+Fans live vote tallies out to Server-Sent Events subscribers. Every watched poll
+has one channel; a single ticker thread reads the counters of all watched polls
+with one query per tick and pushes a tally event to a channel only when its
+counts changed. Votes arriving between two ticks are therefore coalesced into
+one broadcast, and the cost of a tick does not depend on the number of
+subscribers.
+
+Subscribers that stay quiet receive a comment line every heartbeat interval;
+writing it fails once the client has gone away, which closes the stream and
+unsubscribes it. The ticker stops when nobody is watching any poll.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+from app.databases.database import db
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = ': keep-alive\n\n'
+
+
+def format_tally_event(payload):
+    """Render a tally payload as an SSE event"""
+    return f"event: tally\ndata: {json.dumps(payload)}\n\n"
+
+
+def build_tally_payload(poll_id, counts):
+    """
+    Build the tally payload sent to subscribers.
+
+    Args:
+        poll_id (int): The poll the counts belong to.
+        counts (dict): Mapping of option id to vote count.
+    """
+    total_votes = sum(counts.values())
+    return {
+        "poll_id": poll_id,
+        "options": [
+            {
+                "id": option_id,
+                "vote_count": count,
+                "percentage": (count / total_votes) * 100 if total_votes > 0 else 0
+            }
+            for option_id, count in sorted(counts.items())
+        ],
+        "total_votes": total_votes
+    }
+
+
+class TallySubscription:
+    """A single SSE client's bounded event queue"""
+
+    def __init__(self, poll_id, max_pending=16):
+        self.poll_id = poll_id
+        self._events = queue.Queue(maxsize=max_pending)
+
+    def push(self, event):
+        # A slow client only ever needs the newest tally, so drop the oldest one
+        while True:
+            try:
+                self._events.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._events.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def next_event(self, timeout):
+        """Return the next event, or None if nothing arrived within the timeout"""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveTallyHub:
+    """Registry of watched polls and the ticker thread broadcasting their tallies"""
+
+    def __init__(self, interval_ms=1000, heartbeat_s=15):
+        """
+        Args:
+            interval_ms: Minimum time between two broadcasts for the same poll
+            heartbeat_s: Silence after which a subscriber receives a keep-alive comment
+        """
+        # Callable taking a list of poll ids and returning {poll_id: {option_id: count}}
+        self.read_tallies = None
+        self.interval = interval_ms / 1000.0
+        self.heartbeat = heartbeat_s
+        self._channels = {}
+        self._last_payloads = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, poll_id):
+        """Register a subscriber for a poll and make sure the ticker is running"""
+        subscription = TallySubscription(poll_id)
+        with self._lock:
+            self._channels.setdefault(poll_id, set()).add(subscription)
+            last_payload = self._last_payloads.get(poll_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='live-tallies', daemon=True)
+                self._thread.start()
+        if last_payload is not None:
+            subscription.push(format_tally_event(last_payload))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.poll_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.poll_id]
+                self._last_payloads.pop(subscription.poll_id, None)
+
+    def subscriber_count(self, poll_id=None):
+        with self._lock:
+            if poll_id is not None:
+                return len(self._channels.get(poll_id, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def stream(self, poll_id):
+        """Generator of SSE chunks for one client; unsubscribes when the client disconnects"""
+        subscription = self.subscribe(poll_id)
+        try:
+            while True:
+                event = subscription.next_event(self.heartbeat)
+                yield event if event is not None else HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    def tick(self):
+        """Read the tallies of every watched poll once and broadcast the ones that changed"""
+        with self._lock:
+            poll_ids = list(self._channels)
+        if not poll_ids:
+            return
+
+        tallies = self.read_tallies(poll_ids)
+        for poll_id in poll_ids:
+            payload = build_tally_payload(poll_id, tallies.get(poll_id, {}))
+            with self._lock:
+                subscribers = list(self._channels.get(poll_id, ()))
+                if not subscribers or self._last_payloads.get(poll_id) == payload:
+                    continue
+                self._last_payloads[poll_id] = payload
+            event = format_tally_event(payload)
+            for subscription in subscribers:
+                subscription.push(event)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._channels:
+                    self._thread = None
+                    return
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Failed to broadcast live tallies")
+            finally:
+                # Release the ticker thread's session between ticks
+                db.remove()
+            time.sleep(self.interval)
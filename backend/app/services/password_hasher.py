@@ -0,0 +1,134 @@
+"""
+Password Hasher
+
+Runs password hashing and verification, deliberately CPU-heavy work, in a
+bounded process pool so login and registration bursts do not hold the GIL of
+the request threads that serve votes. A pool size of 0 hashes on the calling
+thread instead, which is what the tests use.
+
+At most max_pending hashes may be queued or running at once. Past that,
+calls fail fast with HashingPoolSaturated and the route answers 503, rather
+than queueing logins behind each other until clients time out. A hash that
+takes longer than timeout_s is shed the same way.
+
+The method string carries werkzeug's cost parameters (e.g. 'scrypt:32768:8:1'
+or 'pbkdf2:sha256:600000'). Hashes made with another method are reported by
+needs_rehash, so they can be upgraded the next time their password is known.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when too many hashes are already queued or running, or one did not finish in time"""
+    pass
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Hash and verify passwords in worker processes, with a bound on pending work"""
+
+    def __init__(self, pool_size=2, max_pending=32, method=DEFAULT_METHOD, timeout_s=10):
+        self.pool_size = pool_size
+        self.method = method
+        self.timeout_s = timeout_s
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def method(self):
+        """
+        The method as werkzeug writes it into hashes.
+
+        werkzeug fills in default cost parameters ('scrypt' is stored as 'scrypt:32768:8:1'),
+        so compare against the prefix of a real hash or every login would rehash. That costs a
+        full hash, so it is made on first use rather than in every process at startup.
+        """
+        if self._normalized_method is None:
+            self._normalized_method = generate_password_hash('', method=self._method).split('$', 1)[0]
+        return self._normalized_method
+
+    @method.setter
+    def method(self, method):
+        self._method = method
+        self._normalized_method = None
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        method = self._method
+        password_hash = self._run(_hash, password, method)
+        if self._normalized_method is None and method == self._method:
+            # A real hash shows the normalized method for free
+            self._normalized_method = password_hash.split('$', 1)[0]
+        return password_hash
+
+    def verify(self, password_hash, password):
+        """Check a password against a hash made with any method"""
+        if not password_hash:
+            return False
+        return self._run(_verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a hash was made with another method or other cost parameters"""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingPoolSaturated("Too many password operations in progress")
+        if self.pool_size == 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the worker is done, even if the caller gave up waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout_s)
+        except FutureTimeoutError:
+            # Shed like a saturated pool: the workers are too far behind to answer in time
+            raise HashingPoolSaturated("Timed out waiting for the password hasher")
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: forking a process that runs request threads can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+
+def create_password_hasher(config):
+    """Build the password hasher described by the app config"""
+    return PasswordHasher(
+        pool_size=config.get('PASSWORD_HASH_POOL_SIZE', 2),
+        max_pending=config.get('PASSWORD_HASH_MAX_PENDING', 32),
+        method=config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        timeout_s=config.get('PASSWORD_HASH_TIMEOUT_S', 10)
+    )
@@ -1,13 +1,77 @@
+from collections import Counter
 from urllib.parse import urlparse
+import logging
 import re
 from app.models.poll import Poll
+from app.models.poll_search import PollSearch, SearchUnavailable
 from app.models.media import Media
+from app.models.vote import Vote
+from app.models.voting_option import VotingOption
+from app.services.feed_service import FeedService
+from app.services.hot_counters import HotPollCounters
+from app.services.live_tallies import LiveTallyHub
+from app.services.results_cache import ResultsCache
+from app.services.trending import TrendingRanker
+from app.services.vote_ingestion import QUEUED, VoteIngestionBuffer, VoteQueueFull
+from app.services.vote_log import VoteLog
+from app.services.vote_membership import VoteMembershipIndex
+from app.utils.serialization import PollPayloadCache, add_fields, dumps
 from app import db
+from sqlalchemy.orm import selectinload
 from flask import abort
 
+logger = logging.getLogger(__name__)
+
 class PollService:
     """Service class for handling poll-related operations"""
 
+    def __init__(
+        self,
+        vote_buffer: VoteIngestionBuffer = None,
+        acknowledge_votes: bool = True,
+        ack_timeout: float = 5,
+        results_cache: ResultsCache = None,
+        live_tallies: LiveTallyHub = None,
+        vote_log: VoteLog = None,
+        vote_membership: VoteMembershipIndex = None,
+        hot_counters: HotPollCounters = None,
+        feed: FeedService = None,
+        trending: TrendingRanker = None,
+        payload_cache: PollPayloadCache = None
+    ):
+        """
+        Args:
+            vote_buffer: Optional group-commit buffer; when set, votes are queued instead of committed per request
+            acknowledge_votes: Wait for the buffered vote to be committed before returning
+            ack_timeout: Seconds to wait for that commit before giving up
+            results_cache: Cache of closed poll results, a default sized one is created when omitted
+            live_tallies: Broadcaster of live tallies to SSE subscribers, created with defaults when omitted
+            vote_log: Optional append-only log every committed vote is written to
+            vote_membership: Per-user index of voted polls, created with defaults when omitted
+            hot_counters: Optional striped counters taking the increments of polls above the vote-rate threshold
+            feed: Per-user queues of unvoted polls, created with defaults when omitted
+            trending: Ranking of polls by decayed vote velocity, created with defaults when omitted
+            payload_cache: Cache of encoded poll payloads, created with defaults when omitted
+        """
+        self.vote_buffer = vote_buffer
+        self.acknowledge_votes = acknowledge_votes
+        self.ack_timeout = ack_timeout
+        self.results_cache = results_cache if results_cache is not None else ResultsCache()
+        self.live_tallies = live_tallies if live_tallies is not None else LiveTallyHub()
+        self.vote_log = vote_log
+        self.vote_membership = vote_membership if vote_membership is not None else VoteMembershipIndex()
+        self.vote_membership.load_voted_polls = self._load_voted_poll_ids
+        self.hot_counters = hot_counters
+        if hot_counters is not None:
+            hot_counters.on_flush = self._after_counters_flushed
+        self.feed = feed if feed is not None else FeedService()
+        self.feed.voted_among = self.vote_membership.voted_among
+        self.trending = trending if trending is not None else TrendingRanker()
+        self.payload_cache = payload_cache if payload_cache is not None else PollPayloadCache()
+        self.live_tallies.read_tallies = self.get_vote_tallies
+        if vote_buffer is not None:
+            vote_buffer.on_flush = self._after_votes_recorded
+
     def create_new_poll(
         self,
         question: str,
@@ -117,7 +181,7 @@ class PollService:
             HTTPException: If poll is not found
         """
         try:
-            poll = Poll.get_poll_by_id(poll_id)
+            poll = Poll.get_poll_by_id(poll_id, with_options=True)
             if not poll:
                 abort(404, description="Poll not found")
 
@@ -126,6 +190,226 @@ class PollService:
         except Exception as e:
             return None
 
+    def encode_poll(self, poll: Poll, fields: tuple = None) -> bytes:
+        """
+        Get the JSON encoding of poll.to_dict(), reusing the cached bytes while the poll is unchanged
+
+        Args:
+            poll: The poll, with what the fields need loaded
+            fields: Sparse fieldset; such payloads are small and encoded without the cache
+
+        Returns:
+            bytes: The encoded poll
+        """
+        if fields is not None:
+            return dumps(poll.to_dict(fields))
+        return self.payload_cache.encode(poll)
+
+    def get_poll_payload(self, poll_id: int, fields: tuple = None) -> tuple:
+        """
+        Get the encoded details of a specific poll including voting options
+
+        Args:
+            poll_id: ID of the poll to retrieve
+            fields: Sparse fieldset; only the columns it needs are loaded, and the options only if requested
+
+        Returns:
+            tuple: The encoded poll and its (version, updated_at) validators, or None if it does not exist
+        """
+        poll = Poll.get_poll_by_id(poll_id, with_options=True, fields=fields)
+        if not poll:
+            return None
+        return self.encode_poll(poll, fields), (poll.version, poll.updated_at)
+
+    def get_poll_validators(self, poll_id: int) -> tuple:
+        """
+        Get what a conditional request is checked against, without loading the poll
+
+        Args:
+            poll_id: ID of the poll
+
+        Returns:
+            tuple: (version, updated_at) of the poll, or None if it does not exist
+        """
+        return Poll.get_validators(poll_id)
+
+    def get_feed(self, user_id: int, limit: int, after: tuple = None, encoded: bool = False) -> tuple:
+        """
+        Get the next active polls the user has not voted on, newest first
+
+        Args:
+            user_id: ID of the user reading the feed
+            limit: Maximum number of polls to return
+            after: (created_at, id) of the last poll the client has seen
+            encoded: Return each poll as encoded JSON bytes instead of a dict
+
+        Returns:
+            tuple: The serialized polls and the (created_at, id) to continue after, or None at the end
+        """
+        keys, next_after = self.feed.next_polls(user_id, limit, after)
+        polls = {
+            poll.id: poll for poll in db.query(Poll).options(selectinload(Poll.voting_options)).filter(
+                Poll.id.in_([poll_id for _, poll_id in keys])
+            ).all()
+        } if keys else {}
+
+        feed = []
+        for _, poll_id in keys:
+            poll = polls.get(poll_id)
+            if poll is None or not poll.is_active:
+                # Closed since it was queued
+                self.feed.discard(user_id, poll_id)
+                continue
+            feed.append(self.encode_poll(poll) if encoded else poll.to_dict())
+        return feed, next_after
+
+    def search_polls(self, query: str, limit: int, after: tuple = None, encoded: bool = False) -> tuple:
+        """
+        Full-text search over poll questions and option descriptions, most relevant first
+
+        Args:
+            query: Words to look for; each also matches as a prefix
+            limit: Maximum number of polls to return
+            after: (score, id) of the last poll of the previous page
+            encoded: Return each poll as encoded JSON bytes instead of a dict
+
+        Returns:
+            tuple: The serialized polls, each with its search_score, and the (score, id)
+            to continue after, or None on the last page
+
+        Raises:
+            HTTPException: If search is not available on this database
+        """
+        try:
+            matches = PollSearch.search(query, limit + 1, after)
+        except SearchUnavailable as e:
+            abort(501, description=str(e))
+
+        next_after = None
+        if len(matches) > limit:
+            poll_id, score = matches[limit - 1]
+            next_after = (score, poll_id)
+        matches = matches[:limit]
+        polls = {
+            poll.id: poll for poll in db.query(Poll).options(selectinload(Poll.voting_options)).filter(
+                Poll.id.in_([poll_id for poll_id, _ in matches])
+            ).all()
+        } if matches else {}
+
+        if encoded:
+            results = [
+                add_fields(self.encode_poll(polls[poll_id]), {"search_score": score})
+                for poll_id, score in matches if poll_id in polls
+            ]
+        else:
+            results = [
+                {**polls[poll_id].to_dict(), "search_score": score}
+                for poll_id, score in matches if poll_id in polls
+            ]
+        return results, next_after
+
+    def get_trending_polls(self, limit: int, encoded: bool = False) -> list:
+        """
+        Get the active polls with the highest decayed vote velocity, served from the precomputed ranking
+
+        Args:
+            limit: Maximum number of polls to return
+            encoded: Return each poll as encoded JSON bytes instead of a dict
+
+        Returns:
+            list: Serialized polls, best ranked first, each with its trending_score
+        """
+        ranking = self.trending.top(limit)
+        polls = {
+            poll.id: poll for poll in db.query(Poll).options(selectinload(Poll.voting_options)).filter(
+                Poll.id.in_([poll_id for poll_id, _ in ranking])
+            ).all()
+        } if ranking else {}
+
+        trending = []
+        for poll_id, score in ranking:
+            poll = polls.get(poll_id)
+            if poll is None or not poll.is_active:
+                # Closed by another worker since it was ranked
+                self.trending.discard(poll_id)
+                continue
+            if encoded:
+                trending.append(add_fields(self.encode_poll(poll), {"trending_score": round(score, 3)}))
+            else:
+                trending.append({**poll.to_dict(), "trending_score": round(score, 3)})
+        return trending
+
+    def get_poll_results(self, poll_id: int) -> dict:
+        """
+        Get the per-option results of a closed poll, served from the results cache when possible
+
+        Args:
+            poll_id: ID of the poll
+
+        Returns:
+            dict: Poll id, question, per-option vote counts and percentages, and the total
+
+        Raises:
+            HTTPException: If the poll is not found or is still active
+        """
+        results = self.results_cache.get(poll_id)
+        if results is not None:
+            return results
+
+        poll = Poll.get_poll_by_id(poll_id)
+        if not poll:
+            abort(404, description="Poll not found")
+        if poll.is_active:
+            abort(403, description="Poll results are not available yet")
+
+        options = [
+            {
+                "id": option_id,
+                "text": description,
+                "vote_count": vote_count
+            }
+            for option_id, description, vote_count in self._read_vote_counts(poll)
+        ]
+
+        total_votes = sum([option['vote_count'] for option in options])
+        results = {
+            "id": poll.id,
+            "question": poll.question,
+            "results": [
+                {**option, "percentage": (option["vote_count"] / total_votes) * 100 if total_votes > 0 else 0}
+                for option in options
+            ],
+            "total_votes": total_votes
+        }
+        # Closed polls no longer change, so their results stay cached until evicted
+        self.results_cache.set(poll_id, results)
+        return results
+
+    def get_vote_tallies(self, poll_ids: list) -> dict:
+        """
+        Read the vote counters of several polls with one query
+
+        Args:
+            poll_ids: IDs of the polls to read
+
+        Returns:
+            dict: Mapping of poll_id to {option_id: vote_count}
+        """
+        def read():
+            return db.query(
+                VotingOption.poll_id, VotingOption.id, VotingOption.vote_count
+            ).filter(VotingOption.poll_id.in_(poll_ids)).all()
+
+        if self.hot_counters is None:
+            rows, pending = read(), {}
+        else:
+            rows, pending = self.hot_counters.read_with_pending(poll_ids, read)
+
+        tallies = {}
+        for poll_id, option_id, vote_count in rows:
+            tallies.setdefault(poll_id, {})[option_id] = vote_count + pending.get(poll_id, {}).get(option_id, 0)
+        return tallies
+
     def record_vote(self, poll_id: int, option_id: int, user_id: int) -> bool:
         """
         Record a user's vote on a poll
@@ -136,11 +420,206 @@ class PollService:
             user_id: ID of the user voting
 
         Returns:
-            bool: True if vote was successfully recorded
+            bool|str: True if vote was successfully recorded, or QUEUED if it was
+            accepted into the ingestion buffer without waiting for the flush
 
         Raises:
             HTTPException: If voting fails
         """
+        if self.vote_membership.has_voted(user_id, poll_id):
+            abort(400, description="User has already voted on this poll")
+
+        if self.vote_buffer is not None:
+            return self._queue_vote(poll_id, option_id, user_id)
+
+        # Hot polls skip the contended counter UPDATE and count the vote in memory
+        hot = self.hot_counters is not None and self.hot_counters.observe(poll_id)
+        try:
+            vote_id = Poll.insert_vote(poll_id, user_id, option_id, update_counter=not hot)
+            if vote_id is not None:
+                db.commit()
+            else:
+                db.rollback()
+
+        except Exception as e:
+            db.rollback()
+            abort(500, description=f"Failed to record vote: {str(e)}")
+
+        if vote_id is None:
+            self._abort_rejected_vote(poll_id, option_id, user_id)
+
+        # The vote is committed from here on, so failures below must not turn it into an error
+        if hot:
+            try:
+                self.hot_counters.add(poll_id, option_id)
+            except Exception:
+                logger.exception("Failed to count a hot poll vote, reconcile-counts repairs the counter")
+        self._after_votes_recorded([(poll_id, user_id, option_id)])
+        return True
+
+    def record_votes_batch(self, user_id: int, votes: list) -> list:
+        """
+        Record many votes of one user in a single transaction
+
+        The polls, options and existing votes involved are loaded with one
+        IN query each, then every accepted vote is inserted with one
+        executemany and committed once.
+
+        Args:
+            user_id: ID of the user voting
+            votes: List of dicts with poll_id and option_id keys
+
+        Returns:
+            list: One result per submitted vote, in request order, with the
+            poll_id, option_id, an HTTP-style status and an error when rejected
+
+        Raises:
+            HTTPException: If writing the accepted votes fails
+        """
+        items = []
+        for vote in votes:
+            poll_id = vote.get('poll_id') if isinstance(vote, dict) else None
+            option_id = vote.get('option_id') if isinstance(vote, dict) else None
+            valid = isinstance(poll_id, int) and isinstance(option_id, int)
+            items.append((poll_id, option_id, valid))
+
+        poll_ids = {poll_id for poll_id, _, valid in items if valid}
+        option_ids = {option_id for _, option_id, valid in items if valid}
+        active_by_poll = dict(
+            db.query(Poll.id, Poll.is_active).filter(Poll.id.in_(poll_ids)).all()
+        ) if poll_ids else {}
+        poll_by_option = dict(
+            db.query(VotingOption.id, VotingOption.poll_id).filter(VotingOption.id.in_(option_ids)).all()
+        ) if option_ids else {}
+        voted_polls = self.vote_membership.voted_among(user_id, poll_ids)
+
+        results = []
+        accepted = []
+        for poll_id, option_id, valid in items:
+            result = {"poll_id": poll_id, "option_id": option_id}
+            if not valid:
+                result.update(status=400, error="poll_id and option_id must be integers")
+            elif poll_id not in active_by_poll:
+                result.update(status=404, error="Poll not found")
+            elif not active_by_poll[poll_id]:
+                result.update(status=400, error="Poll is no longer active")
+            elif poll_id in voted_polls:
+                result.update(status=400, error="User has already voted on this poll")
+            elif poll_by_option.get(option_id) != poll_id:
+                result.update(status=400, error="Invalid voting option")
+            else:
+                result.update(status=201)
+                # A later vote on the same poll in this batch is a repeat vote
+                voted_polls.add(poll_id)
+                accepted.append(result)
+            results.append(result)
+
+        if not accepted:
+            return results
+
+        try:
+            conn = db.connection()
+            inserted = set(Vote.insert_many(conn, [
+                {'poll_id': r['poll_id'], 'user_id': user_id, 'option_id': r['option_id']}
+                for r in accepted
+            ]))
+            VotingOption.increment_vote_counts(
+                conn, Counter(option_id for _, _, option_id in inserted)
+            )
+            Poll.touch(conn, {poll_id for poll_id, _, _ in inserted})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            abort(500, description=f"Failed to record votes: {str(e)}")
+
+        self._after_votes_recorded(list(inserted))
+
+        for result in accepted:
+            # Lost a race with a concurrent vote by the same user
+            if (result['poll_id'], user_id, result['option_id']) not in inserted:
+                result.update(status=400, error="User has already voted on this poll")
+        return results
+
+    def _after_votes_recorded(self, votes: list):
+        """
+        Keep derived state in step with newly committed votes
+
+        The votes are already committed, so a failing step is logged and the
+        others still run rather than failing the request that recorded them.
+
+        Args:
+            votes: (poll_id, user_id, option_id) tuples of the committed votes
+        """
+        for poll_id in {poll_id for poll_id, _, _ in votes}:
+            self.results_cache.invalidate(poll_id)
+        recorders = [self.vote_membership.record, self.feed.record_votes, self.trending.record]
+        if self.vote_log is not None:
+            recorders.append(self.vote_log.append)
+        for record in recorders:
+            try:
+                record(votes)
+            except Exception:
+                logger.exception("Failed to update derived vote state for %d committed votes", len(votes))
+
+    def _after_counters_flushed(self, poll_ids: set):
+        """Drop cached results of polls whose counters a hot counter flush changed"""
+        for poll_id in poll_ids:
+            self.results_cache.invalidate(poll_id)
+
+    def _read_vote_counts(self, poll: Poll) -> list:
+        """Return poll.get_vote_counts() rows with the unflushed hot poll deltas added"""
+        if self.hot_counters is None:
+            return poll.get_vote_counts()
+        rows, pending = self.hot_counters.read_with_pending([poll.id], poll.get_vote_counts)
+        deltas = pending.get(poll.id, {})
+        return [
+            (option_id, description, vote_count + deltas.get(option_id, 0))
+            for option_id, description, vote_count in rows
+        ]
+
+    def has_user_voted(self, user_id: int, poll_id: int) -> bool:
+        """Check whether a user has voted on a poll, usually without a database round trip"""
+        return self.vote_membership.has_voted(user_id, poll_id)
+
+    def get_voted_poll_ids(self, user_id: int, poll_ids) -> set:
+        """Return which of the given polls the user has voted on"""
+        return self.vote_membership.voted_among(user_id, poll_ids)
+
+    def _load_voted_poll_ids(self, user_id: int) -> list:
+        """Load the ids of every poll a user has voted on, for the membership index"""
+        rows = db.query(Vote.poll_id).filter(Vote.user_id == user_id).all()
+        return [poll_id for poll_id, in rows]
+
+    def _queue_vote(self, poll_id: int, option_id: int, user_id: int):
+        """Validate a vote and hand it to the group-commit buffer"""
+        if not Poll.can_accept_vote(poll_id, user_id, option_id):
+            self._abort_rejected_vote(poll_id, option_id, user_id)
+
+        try:
+            pending = self.vote_buffer.submit(poll_id, user_id, int(option_id))
+        except VoteQueueFull as e:
+            abort(503, description=str(e))
+
+        if not self.acknowledge_votes:
+            return QUEUED
+
+        try:
+            accepted = pending.wait(self.ack_timeout)
+        except Exception as e:
+            abort(500, description=f"Failed to record vote: {str(e)}")
+
+        if accepted is None:
+            abort(503, description="Timed out waiting for the vote to be recorded")
+        if not accepted:
+            # A duplicate, or the poll was closed before the batch was written
+            self._abort_rejected_vote(poll_id, option_id, user_id)
+        return True
+
+    def _abort_rejected_vote(self, poll_id: int, option_id: int, user_id: int):
+        """
+        Work out why a guarded vote insert affected no rows and abort with the matching error.
+        Only runs on the failure path, so accepted votes never pay for these lookups.
+        """
         poll: Poll|None = Poll.get_poll_by_id(poll_id)
         if not poll:
             abort(404, description="Poll not found")
@@ -151,17 +630,7 @@ class PollService:
         if poll.has_user_voted(user_id):
             abort(400, description="User has already voted on this poll")
 
-        if not poll.is_valid_option(option_id):
-            abort(400, description="Invalid voting option")
-
-        try:
-            poll.record_vote(user_id, option_id)
-            db.commit()
-            return True
-
-        except Exception as e:
-            db.rollback()
-            abort(500, description=f"Failed to record vote: {str(e)}")
+        abort(400, description="Invalid voting option")
 
     def close_poll(self, poll_id: int, user_id: int) -> bool:
         """
@@ -185,8 +654,13 @@ class PollService:
             if poll.user_id != user_id:
                 abort(403, description="Only the poll owner can close the poll")
 
-            poll.is_active = False
+            Poll.close(poll_id)
             db.commit()
+            if self.hot_counters is not None:
+                # Write the increments of votes accepted before the close, so the final counts are in the database
+                self.hot_counters.flush()
+            self.results_cache.invalidate(poll_id)
+            self.trending.discard(poll_id)
             return True
 
         except Exception as e:
@@ -0,0 +1,43 @@
+"""
+Poll Stats Reconciler
+
+Background thread that periodically rebuilds the poll_stats counters from the
+polls table. The counters are kept in step by Poll.create_poll and Poll.close,
+so this only repairs drift, e.g. from polls changed outside those methods.
+"""
+import logging
+import threading
+
+from app.databases.database import db
+from app.models.poll_stats import PollStats
+
+logger = logging.getLogger(__name__)
+
+
+class PollStatsReconciler:
+    """Runs PollStats.reconcile every interval on a daemon thread"""
+
+    def __init__(self, interval_s=300):
+        self.interval = interval_s
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='poll-stats-reconciler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                PollStats.reconcile()
+            except Exception:
+                logger.exception("Failed to reconcile poll stats")
+                db.rollback()
+            finally:
+                db.remove()
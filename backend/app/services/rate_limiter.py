@@ -0,0 +1,246 @@
+"""
+Rate Limiter
+
+Admission control for the endpoints a single client can use to flood the
+database: logins, votes and poll creation. Each scope has a rate such as
+'10/minute', applied per key (the user id, or the client IP for anonymous
+requests). Requests over the rate are refused with a Retry-After before the
+route runs, so they never reach the database.
+
+Limits are token buckets implemented with GCRA (generic cell rate
+algorithm): a key stores a single number, its theoretical arrival time
+(TAT). Each request pushes the TAT one emission interval (period / limit)
+into the future; a request is refused when that would put the TAT more than
+one period ahead of now. A client may burst up to `limit` requests and then
+regains one request per emission interval. A request may cost several units,
+so a batch of votes is charged like that many single votes.
+
+Two backends hold the TATs:
+- MemoryBackend: a bounded in-process LRU, enough for a single worker.
+- SQLiteBackend: a small SQLite file shared by every worker on the host.
+  It is separate from the application database, so rejected traffic never
+  contends for the application's write lock.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+Rate = namedtuple('Rate', ['limit', 'period_s'])
+
+# allowed: whether the request is admitted; retry_after_s: seconds until the next one would be;
+# remaining: requests the key may still make right now
+Decision = namedtuple('Decision', ['allowed', 'retry_after_s', 'remaining', 'limit'])
+
+
+def parse_rate(value):
+    """
+    Parse a rate such as '10/minute' or '100/hour'.
+
+    Raises:
+        ValueError: If the rate is malformed.
+    """
+    try:
+        limit, period = value.split('/')
+        limit = int(limit)
+        period_s = PERIODS[period.strip().rstrip('s')]
+    except (AttributeError, KeyError, ValueError):
+        raise ValueError(f"Invalid rate: {value!r}")
+    if limit <= 0:
+        raise ValueError(f"Invalid rate: {value!r}")
+    return Rate(limit, period_s)
+
+
+def gcra(tat, now, rate, cost=1):
+    """
+    Apply a request costing `cost` units (e.g. the votes of a batch) to a key's theoretical arrival time.
+
+    Returns:
+        tuple: (new_tat, decision); new_tat is None when the request is refused and the TAT stays.
+        A request costing more than the limit is refused with retry_after_s None, as it can never fit.
+    """
+    if cost > rate.limit:
+        return None, Decision(False, None, 0, rate.limit)
+    interval = rate.period_s / rate.limit
+    new_tat = max(tat or now, now) + interval * cost
+    ahead = new_tat - now
+    if ahead > rate.period_s:
+        return None, Decision(False, ahead - rate.period_s, 0, rate.limit)
+    remaining = int((rate.period_s - ahead) / interval + 1e-9)
+    return new_tat, Decision(True, 0.0, remaining, rate.limit)
+
+
+class MemoryBackend:
+    """Thread-safe LRU of key -> TAT, for a single worker process"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._tats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, rate, now, cost=1):
+        with self._lock:
+            new_tat, decision = gcra(self._tats.get(key), now, rate, cost)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                while len(self._tats) > self.max_keys:
+                    # The least recently admitted keys are the ones closest to a full bucket
+                    self._tats.popitem(last=False)
+            return decision
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+    def __len__(self):
+        return len(self._tats)
+
+
+class SQLiteBackend:
+    """
+    TATs in a SQLite file shared by the worker processes of a host.
+
+    Each hit is one short BEGIN IMMEDIATE transaction, which serializes the
+    read-modify-write of a key across processes. Keys whose TAT has passed hold
+    a full bucket and are deleted every prune_every hits.
+    """
+
+    def __init__(self, path, prune_every=1000, busy_timeout_s=1):
+        self.path = path
+        self.prune_every = prune_every
+        self.busy_timeout_s = busy_timeout_s
+        self._local = threading.local()
+        self._hits = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit mode, transactions are opened explicitly
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout_s, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def hit(self, key, rate, now, cost=1):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            new_tat, decision = gcra(row[0] if row else None, now, rate, cost)
+            if new_tat is not None:
+                connection.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat)
+                )
+            self._hits += 1
+            if self.prune_every and self._hits % self.prune_every == 0:
+                connection.execute("DELETE FROM rate_limits WHERE tat < ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return decision
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+class RateLimiter:
+    """Per-scope rates applied to keys through a backend"""
+
+    def __init__(self, backend, rates, clock=time.time):
+        self.backend = backend
+        self.rates = {scope: parse_rate(rate) for scope, rate in rates.items() if rate}
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.allowed = {}
+        self.rejected = {}
+        self.errors = 0
+
+    def hit(self, scope, key, cost=1):
+        """
+        Count a request of `key` against the rate of `scope`, as `cost` requests.
+
+        Scopes without a rate are not limited. A failing shared backend admits the
+        request: the limiter protects the database, it must not take the API down.
+
+        Returns:
+            Decision: Whether the request is admitted, and when to retry if not.
+        """
+        rate = self.rates.get(scope)
+        if rate is None:
+            return Decision(True, 0.0, None, None)
+        try:
+            decision = self.backend.hit(f"{scope}:{key}", rate, self.clock(), cost)
+        except sqlite3.Error:
+            logger.exception("Rate limiter backend failed, admitting the request")
+            with self._lock:
+                self.errors += 1
+            return Decision(True, 0.0, None, rate.limit)
+        with self._lock:
+            counters = self.allowed if decision.allowed else self.rejected
+            counters[scope] = counters.get(scope, 0) + 1
+        return decision
+
+    def stats(self):
+        """Return the admitted and refused request counts per scope"""
+        keys = len(self.backend)
+        with self._lock:
+            return {
+                "keys": keys,
+                "allowed": dict(self.allowed),
+                "rejected": dict(self.rejected),
+                "errors": self.errors
+            }
+
+
+def create_rate_limiter(config):
+    """
+    Build the rate limiter described by the app config.
+
+    Returns:
+        RateLimiter: The limiter, or None when RATE_LIMIT_BACKEND is None.
+
+    Raises:
+        ValueError: If the backend is unknown, or the batch vote limit is below VOTE_BATCH_MAX_ITEMS.
+    """
+    backend = config.get('RATE_LIMIT_BACKEND')
+    if backend is None:
+        return None
+    if backend == 'memory':
+        store = MemoryBackend(config.get('RATE_LIMIT_MAX_KEYS', 100000))
+    elif backend == 'sqlite':
+        store = SQLiteBackend(config.get('RATE_LIMIT_SQLITE_PATH', 'instance/rate_limits.db'))
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+    limiter = RateLimiter(store, config.get('RATE_LIMITS', {}))
+    batch_rate = limiter.rates.get('batch_vote')
+    max_items = config.get('VOTE_BATCH_MAX_ITEMS', 500)
+    if batch_rate is not None and batch_rate.limit < max_items:
+        # A full batch could never fit in the bucket
+        raise ValueError(f"RATE_LIMITS['batch_vote'] must allow at least VOTE_BATCH_MAX_ITEMS ({max_items}) votes")
+    return limiter
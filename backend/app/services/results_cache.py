@@ -0,0 +1,16 @@
+"""
+Results Cache
+
+Bounded in-process LRU of poll results keyed by poll id. Only results of closed
+polls are stored: they can no longer change, so an entry stays valid until it
+is evicted or explicitly invalidated and no TTL is needed. That also keeps the
+cache correct when several worker processes each hold their own copy.
+"""
+from app.utils.lru import LRUCache
+
+
+class ResultsCache(LRUCache):
+    """Thread-safe LRU mapping poll_id to a results payload, with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=1024):
+        super().__init__(max_entries)
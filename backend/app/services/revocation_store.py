@@ -0,0 +1,88 @@
+"""
+Revocation Store
+
+Answers "is this token revoked?" from an in-memory set of revoked JWT ids, so
+the check on every authenticated request costs a set lookup. The set sits in
+front of the revoked_tokens table: revocations are written there first, and
+every refresh_interval_s the set loads the rows other worker processes added
+since the last load, with one indexed query.
+
+Refresh token rotation goes through consume(): the PK insert of the jti is an
+atomic test-and-set, so a refresh token can be exchanged exactly once.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.models.revoked_token import RevokedToken
+
+# Rows committed by other workers just before a load may carry a slightly older revoked_at
+LOAD_OVERLAP = timedelta(seconds=2)
+
+
+class RevocationStore:
+    """Revoked jtis held in memory and persisted in revoked_tokens"""
+
+    def __init__(self, refresh_interval_s=5, clock=time.monotonic):
+        self.refresh_interval_s = refresh_interval_s
+        self.clock = clock
+        # jti -> expires_at
+        self._revoked = {}
+        self._loaded_until = None
+        self._next_refresh = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        """Whether a jti has been revoked or consumed"""
+        self._maybe_refresh()
+        return jti in self._revoked
+
+    def is_revoked_claims(self, claims):
+        """is_revoked for verified claims; tokens without a jti cannot be revoked"""
+        jti = claims.get('jti')
+        return jti is not None and self.is_revoked(jti)
+
+    def consume(self, claims):
+        """
+        Mark a token used, atomically across workers.
+
+        Returns:
+            bool: True for the first caller, False if the token was already consumed or revoked.
+        """
+        jti = claims.get('jti')
+        if jti is None or self.is_revoked(jti):
+            return False
+        expires_at = datetime.utcfromtimestamp(claims['exp'])
+        inserted = RevokedToken.insert(jti, expires_at)
+        with self._lock:
+            self._revoked[jti] = expires_at
+        return inserted
+
+    def revoke(self, claims):
+        """Revoke a token, whether or not it was revoked before"""
+        self.consume(claims)
+
+    def refresh(self):
+        """Load the revocations recorded since the last load and forget expired ones"""
+        with self._lock:
+            since = self._loaded_until
+        started = datetime.utcnow()
+        rows = RevokedToken.revoked_since(since - LOAD_OVERLAP if since is not None else None)
+        now = datetime.utcnow()
+        with self._lock:
+            for jti, expires_at, _ in rows:
+                self._revoked[jti] = expires_at
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+            self._loaded_until = started
+            self._next_refresh = self.clock() + self.refresh_interval_s
+
+    def _maybe_refresh(self):
+        now = self.clock()
+        with self._lock:
+            due = self._next_refresh is None or now >= self._next_refresh
+            if due and self._loaded_until is not None:
+                # Other threads keep using the current set while this one reloads
+                self._next_refresh = now + self.refresh_interval_s
+        if due:
+            self.refresh()
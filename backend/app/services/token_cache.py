@@ -0,0 +1,99 @@
+"""
+Token Cache
+
+Bounded in-process LRU of verified JWTs, keyed by the SHA-256 digest of the
+token, so a session sending the same access token hundreds of times pays for
+the HMAC check and claim parsing once. Only the digest is kept, never the
+token itself.
+
+An entry is dropped when its token expires; a heap ordered by expiry lets
+every insert purge the expired entries first. Hits are refused when the
+is_revoked callable reports the claims as revoked, so revocation takes
+effect immediately even for cached tokens.
+"""
+import hashlib
+import heapq
+import time
+
+from app.utils.lru import LRUCache
+
+
+class TokenCache(LRUCache):
+    """Thread-safe LRU mapping a token digest to its claims until the token's exp"""
+
+    def __init__(self, max_entries=50000, clock=time.time):
+        super().__init__(max_entries)
+        self.clock = clock
+        # Set by the revocation store: called with the claims of a hit, True drops the entry
+        self.is_revoked = None
+        self._expiries = []
+        self.expirations = 0
+        self.revocations = 0
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        """Return the cached claims of a token, or None if it must be verified again"""
+        key = self.digest(token)
+        now = self.clock()
+
+        def unexpired(entry):
+            if entry[0] > now:
+                return True
+            self.expirations += 1
+            return False
+
+        entry = super().get(key, fresh=unexpired)
+        if entry is None:
+            return None
+        claims = entry[1]
+        if self.is_revoked is not None and self.is_revoked(claims):
+            with self._lock:
+                self._entries.pop(key, None)
+                self.revocations += 1
+                # Counted as a hit above, but the token has to be verified again
+                self.hits -= 1
+                self.misses += 1
+            return None
+        return claims
+
+    def put(self, token, claims):
+        """Remember the verified claims of a token until its exp"""
+        exp = claims.get('exp')
+        if exp is None or self.max_entries <= 0:
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._purge_expired()
+            self._store(key, (exp, claims))
+            heapq.heappush(self._expiries, (exp, key))
+            if len(self._expiries) > 2 * self.max_entries:
+                # Drop heap items of evicted or replaced entries
+                self._expiries = [(exp, key) for key, (exp, _) in self._entries.items()]
+                heapq.heapify(self._expiries)
+
+    def discard(self, token):
+        """Forget a token, e.g. once it has been revoked"""
+        self.invalidate(self.digest(token))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiries = []
+
+    def _stats(self):
+        stats = super()._stats()
+        stats.update(expirations=self.expirations, revocations=self.revocations)
+        return stats
+
+    def _purge_expired(self):
+        now = self.clock()
+        while self._expiries and self._expiries[0][0] <= now:
+            exp, key = heapq.heappop(self._expiries)
+            entry = self._entries.get(key)
+            # The key may have been evicted, or cached again with a later exp
+            if entry is not None and entry[0] == exp:
+                del self._entries[key]
+                self.expirations += 1
@@ -0,0 +1,148 @@
+"""
+Trending Polls
+
+Ranks polls by time-decayed vote velocity. Committed votes are counted in
+per-minute buckets per poll; a poll's score is the sum of its buckets inside
+the window, each weighted by 2^(-age / half-life), so recent votes count most.
+
+Scores are kept forward-decayed: a vote in minute m adds 2^((m - epoch) / half-life)
+to its poll's score once, and because every score shares the same decay at
+read time, ordering by the stored value is the same as ordering by the decayed
+one. A refresher thread runs every few seconds; it only has to drop buckets
+that left the window (recomputing those polls from their remaining buckets)
+and take the top K with a heap. Requests read the last ranking and never
+aggregate votes in the database.
+
+The buckets live in process memory and see the votes committed by this
+process, so with several workers each ranks from its own share of the traffic.
+"""
+import heapq
+import logging
+import threading
+import time
+from operator import itemgetter
+
+logger = logging.getLogger(__name__)
+
+# Re-anchor the forward-decayed scores before the weights grow too large for floats
+REANCHOR_HALF_LIVES = 32
+
+
+class TrendingRanker:
+    """Per-minute vote buckets per poll and a periodically refreshed top-K ranking"""
+
+    def __init__(self, top_k=100, window_minutes=60, half_life_minutes=10, refresh_interval_s=5, clock=time.time):
+        """
+        Args:
+            top_k: Number of polls kept in the ranking
+            window_minutes: Votes older than this no longer count
+            half_life_minutes: Age at which a vote counts half as much as a new one
+            refresh_interval_s: Time between two ranking refreshes
+            clock: Returns the current time in seconds, replaceable in tests
+        """
+        self.top_k = top_k
+        self.window = window_minutes
+        self.half_life = half_life_minutes
+        self.refresh_interval = refresh_interval_s
+        self.clock = clock
+        # poll_id -> {minute: votes}
+        self._buckets = {}
+        # poll_id -> forward-decayed score relative to self._epoch
+        self._scores = {}
+        self._epoch = None
+        self._ranking = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, votes):
+        """
+        Count newly committed votes in the current minute's buckets
+
+        Args:
+            votes: (poll_id, user_id, option_id) tuples
+        """
+        minute = self._minute()
+        with self._lock:
+            if self._epoch is None:
+                self._epoch = minute
+            weight = self._weight(minute)
+            for poll_id, _, _ in votes:
+                buckets = self._buckets.setdefault(poll_id, {})
+                buckets[minute] = buckets.get(minute, 0) + 1
+                self._scores[poll_id] = self._scores.get(poll_id, 0.0) + weight
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trending-ranker', daemon=True)
+                self._thread.start()
+
+    def discard(self, poll_id):
+        """Stop ranking a poll, e.g. once it is closed"""
+        with self._lock:
+            self._buckets.pop(poll_id, None)
+            self._scores.pop(poll_id, None)
+            if self._ranking is not None:
+                self._ranking = [entry for entry in self._ranking if entry[0] != poll_id]
+
+    def top(self, limit):
+        """
+        Return the best ranked polls.
+
+        Returns:
+            list: (poll_id, score) pairs, best first; the score is the decayed vote count as of the last refresh.
+        """
+        with self._lock:
+            ranking = self._ranking
+        if ranking is None:
+            ranking = self.refresh()
+        return ranking[:limit]
+
+    def refresh(self):
+        """Expire buckets that left the window and rebuild the top-K ranking"""
+        minute = self._minute()
+        with self._lock:
+            if self._epoch is not None and minute - self._epoch > REANCHOR_HALF_LIVES * self.half_life:
+                self._epoch = minute
+                stale = list(self._buckets)
+            else:
+                stale = []
+            oldest = minute - self.window
+            for poll_id, buckets in self._buckets.items():
+                if any(bucket_minute <= oldest for bucket_minute in buckets):
+                    stale.append(poll_id)
+            for poll_id in stale:
+                self._rescore(poll_id, oldest)
+
+            best = heapq.nlargest(self.top_k, self._scores.items(), key=itemgetter(1))
+            now_weight = self._weight(minute) if self._epoch is not None else 1.0
+            self._ranking = [(poll_id, score / now_weight) for poll_id, score in best]
+            return self._ranking
+
+    def _rescore(self, poll_id, oldest):
+        buckets = self._buckets.get(poll_id)
+        if buckets is None:
+            return
+        for bucket_minute in [m for m in buckets if m <= oldest]:
+            del buckets[bucket_minute]
+        if not buckets:
+            del self._buckets[poll_id]
+            self._scores.pop(poll_id, None)
+            return
+        self._scores[poll_id] = sum(count * self._weight(m) for m, count in buckets.items())
+
+    def _minute(self):
+        return int(self.clock() // 60)
+
+    def _weight(self, minute):
+        return 2.0 ** ((minute - self._epoch) / self.half_life)
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the trending ranking")
+            with self._lock:
+                # Stop once every bucket expired; the next vote starts a new refresher
+                if not self._buckets:
+                    self._thread = None
+                    return
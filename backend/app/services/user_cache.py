@@ -0,0 +1,87 @@
+"""
+User Cache
+
+Bounded in-process LRU of User rows with a TTL, so requests that need the full
+User (not just the id and username carried by the JWT claims) usually skip the
+users query. Entries are detached copies; each request gets its own instance
+merged into its session without a round trip.
+
+Commits that update or delete a user invalidate its entry in every cache of the
+process. Other worker processes keep their copy until the TTL expires, which
+bounds how stale a cached user can be.
+"""
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app.databases.database import SessionLocal, db
+from app.models.user import User
+from app.utils.lru import LRUCache
+
+# Every live cache, so ORM events can invalidate them without knowing the app
+_caches = weakref.WeakSet()
+
+
+class UserCache(LRUCache):
+    """Thread-safe LRU mapping user_id to a detached User, expiring entries after ttl_s"""
+
+    def __init__(self, max_entries=10000, ttl_s=60, clock=time.monotonic):
+        super().__init__(max_entries)
+        self.ttl_s = ttl_s
+        self.clock = clock
+        _caches.add(self)
+
+    def get_user(self, user_id):
+        """
+        Get a user attached to the current session, from the cache when possible.
+
+        Returns:
+            User: The user, or None if it does not exist.
+        """
+        key = db.identity_key(User, user_id)
+        if key in db.identity_map:
+            # Already loaded by this session; reuse it as is
+            return db.identity_map[key]
+
+        now = self.clock()
+        entry = self.get(user_id, fresh=lambda entry: entry[0] > now)
+        if entry is not None:
+            return db.merge(entry[1], load=False)
+
+        user = User.get_user_by_id(user_id)
+        if user is None:
+            return None
+        # Keep a detached copy; commits in any session cannot expire it
+        db.expunge(user)
+        self.set(user_id, (now + self.ttl_s, user))
+        return db.merge(user, load=False)
+
+
+def _invalidate_everywhere(user_ids):
+    for cache in list(_caches):
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, user):
+    # Dropped now, and again at commit in case a concurrent request re-cached the old row meanwhile
+    _invalidate_everywhere([user.id])
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault('changed_user_ids', set()).add(user.id)
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _user_changes_committed(session):
+    changed = session.info.pop('changed_user_ids', None)
+    if changed:
+        _invalidate_everywhere(changed)
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _user_changes_rolled_back(session):
+    session.info.pop('changed_user_ids', None)
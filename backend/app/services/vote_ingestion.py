@@ -0,0 +1,212 @@
+"""
+Vote Ingestion Buffer
+
+Group-commit path for votes. Request threads validate a vote and hand it to an
+in-process queue; a single writer thread drains the queue and writes the votes
+in batches, one transaction per batch, so a burst of votes costs one commit
+(and one fsync) instead of one per request.
+
+Batches are flushed every VOTE_INGESTION_FLUSH_INTERVAL_MS or as soon as
+VOTE_INGESTION_BATCH_SIZE votes are waiting, whichever comes first. Duplicate
+votes are skipped by the votes (poll_id, user_id) unique constraint, votes on
+polls closed after they were queued are skipped by the insert itself, and every
+queued vote learns whether it was written once its batch commits.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from app.models.poll import Poll
+from app.models.vote import Vote
+from app.models.voting_option import VotingOption
+
+logger = logging.getLogger(__name__)
+
+# Returned by PollService.record_vote when a vote was queued but not yet written
+QUEUED = 'queued'
+
+INGESTION_MODES = ('sync', 'buffered', 'acknowledged')
+
+
+class VoteQueueFull(Exception):
+    """Raised when the ingestion queue is at its maximum depth or shutting down"""
+    pass
+
+
+class PendingVote:
+    """A queued vote; wait() blocks until the batch holding it has been committed"""
+
+    __slots__ = ('poll_id', 'user_id', 'option_id', 'accepted', 'error', '_done')
+
+    def __init__(self, poll_id, user_id, option_id):
+        self.poll_id = poll_id
+        self.user_id = user_id
+        self.option_id = option_id
+        self.accepted = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the vote to be flushed.
+
+        Returns:
+            bool: True if the vote was written, False if it was a duplicate or
+            its poll was closed before the flush, or None if the timeout expired first.
+
+        Raises:
+            Exception: The error that made the flush of this vote's batch fail.
+        """
+        if not self._done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.accepted
+
+    def _resolve(self, accepted=None, error=None):
+        self.accepted = accepted
+        self.error = error
+        self._done.set()
+
+
+class VoteIngestionBuffer:
+    """Bounded vote queue drained by a writer thread in group commits"""
+
+    def __init__(self, engine, flush_interval_ms=5, batch_size=500, max_queue=10000):
+        self._engine = engine
+        # Called from the writer thread with the (poll_id, user_id, option_id) rows of each committed batch
+        self.on_flush = None
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closing = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='vote-ingestion', daemon=True)
+            self._thread.start()
+
+    def submit(self, poll_id, user_id, option_id):
+        """
+        Queue an already validated vote for the next group commit.
+
+        Returns:
+            PendingVote: Handle the caller can wait on for the flush result.
+
+        Raises:
+            VoteQueueFull: If the queue is full or the buffer is shutting down.
+        """
+        if self._closing.is_set():
+            raise VoteQueueFull("Vote ingestion is shutting down")
+        pending = PendingVote(poll_id, user_id, option_id)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            raise VoteQueueFull("Vote queue is full")
+        return pending
+
+    def depth(self):
+        """Number of votes waiting to be flushed"""
+        return self._queue.qsize()
+
+    def close(self, timeout=None):
+        """Stop accepting votes, flush everything still queued and stop the writer thread"""
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        else:
+            self.flush()
+
+    def flush(self):
+        """Write everything currently queued from the calling thread"""
+        while True:
+            batch = self._take(self._batch_size)
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _take(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._closing.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        try:
+            with self._engine.begin() as conn:
+                # Votes were validated when queued; a poll closed since then must not take them
+                inserted = Vote.insert_many(conn, [
+                    {'poll_id': p.poll_id, 'user_id': p.user_id, 'option_id': p.option_id}
+                    for p in batch
+                ], active_only=True)
+                VotingOption.increment_vote_counts(
+                    conn, Counter(option_id for _, _, option_id in inserted)
+                )
+                Poll.touch(conn, {poll_id for poll_id, _, _ in inserted})
+        except Exception as e:
+            logger.exception("Failed to flush %d queued votes", len(batch))
+            for pending in batch:
+                pending._resolve(error=e)
+            return
+
+        written = set(inserted)
+        for pending in batch:
+            key = (pending.poll_id, pending.user_id, pending.option_id)
+            pending._resolve(accepted=key in written)
+            # A duplicate within the same batch must not be reported as written too
+            written.discard(key)
+
+        if self.on_flush is not None and inserted:
+            try:
+                self.on_flush(inserted)
+            except Exception:
+                logger.exception("Vote flush callback failed")
+
+
+def create_vote_buffer(config, engine):
+    """
+    Build and start the ingestion buffer described by the app config.
+
+    Returns:
+        VoteIngestionBuffer: The running buffer, or None in 'sync' mode.
+    """
+    mode = config.get('VOTE_INGESTION_MODE', 'sync')
+    if mode not in INGESTION_MODES:
+        raise ValueError(f"Invalid VOTE_INGESTION_MODE '{mode}'. Must be one of {', '.join(INGESTION_MODES)}")
+    if mode == 'sync':
+        return None
+
+    buffer = VoteIngestionBuffer(
+        engine,
+        flush_interval_ms=config.get('VOTE_INGESTION_FLUSH_INTERVAL_MS', 5),
+        batch_size=config.get('VOTE_INGESTION_BATCH_SIZE', 500),
+        max_queue=config.get('VOTE_INGESTION_MAX_QUEUE', 10000)
+    )
+    buffer.start()
+    return buffer
@@ -0,0 +1,350 @@
+"""
+Vote Log
+
+Append-only binary log of accepted votes on local disk. Every record is a fixed
+32 bytes (poll_id, option_id, user_id, timestamp in ms, little endian), so the
+log can be scanned with struct.iter_unpack far faster than rows can be loaded
+through the ORM. It is used to rebuild tallies, to restore a damaged votes
+table, and by analytical jobs that should not query the live database.
+
+The log is split into numbered segment files. Records are written straight to
+the active segment and a background thread fsyncs it every fsync interval, so
+many votes share one fsync. Once the active segment reaches its size limit it
+is sealed and a new one is started. compact() folds the sealed segments into
+one, dropping duplicate votes and packing the records of closed polls together
+by poll id, since those polls can no longer receive votes.
+
+Every worker process appends to its own writer directory (writer-0, writer-1,
+...) under the log directory, claimed with an exclusive flock held for as long
+as the log is open. A process therefore never rotates, truncates or compacts
+into a segment another live process is appending to, and a restarted worker
+reuses the first free directory. Scans read every writer directory; records
+are in order within a writer, not across writers.
+"""
+import fcntl
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import bindparam, func, select, update
+
+from app.models.vote import Vote
+from app.models.voting_option import VotingOption
+
+logger = logging.getLogger(__name__)
+
+RECORD = struct.Struct('<QQQq')
+SEGMENT_NAME = re.compile(r'^votes-(\d{8})\.log$')
+WRITER_DIR_NAME = re.compile(r'^writer-(\d+)$')
+WRITER_LOCK_NAME = 'writer.lock'
+
+VoteRecord = namedtuple('VoteRecord', ['poll_id', 'option_id', 'user_id', 'timestamp_ms'])
+
+
+def _segment_name(sequence):
+    return f"votes-{sequence:08d}.log"
+
+
+class VoteLogIncomplete(Exception):
+    """Raised when the log is missing votes the votes table has, e.g. because it was enabled later"""
+    pass
+
+
+class VoteLog:
+    """Segmented, fsync-batched append-only log of votes"""
+
+    def __init__(self, directory, segment_max_bytes=64 * 1024 * 1024, fsync_interval_ms=50, read_only=False):
+        """
+        Args:
+            directory: Directory holding the writer directories, created if missing
+            segment_max_bytes: Size after which the active segment is sealed
+            fsync_interval_ms: How often the active segment is fsynced while votes arrive
+            read_only: Open for scanning and compaction only, e.g. from a CLI command
+                while the app keeps appending
+        """
+        self.root = directory
+        # Writer directory this process appends to, None when read-only
+        self.directory = None
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._fd = None
+        self._lock_fd = None
+        self._thread = None
+
+        os.makedirs(directory, exist_ok=True)
+        if read_only:
+            self._closed.set()
+            return
+
+        self.directory, self._lock_fd = self._claim_writer_directory()
+        sequences = self._sequences(self.directory)
+        self._sequence = sequences[-1] if sequences else 1
+        self._fd = self._open_segment(self._sequence)
+        # Drop a partial record left by a crash mid-write so later records stay aligned
+        size = os.fstat(self._fd).st_size
+        if size % RECORD.size:
+            os.ftruncate(self._fd, size - size % RECORD.size)
+
+        self._thread = threading.Thread(target=self._sync_loop, name='vote-log-fsync', daemon=True)
+        self._thread.start()
+
+    def append(self, votes, timestamp_ms=None):
+        """
+        Append votes to the active segment.
+
+        Args:
+            votes (list): (poll_id, user_id, option_id) tuples, as passed around by PollService.
+            timestamp_ms (int): Time to record for the votes, defaults to now.
+        """
+        if not votes:
+            return
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        data = b''.join(
+            RECORD.pack(poll_id, option_id, user_id, timestamp_ms)
+            for poll_id, user_id, option_id in votes
+        )
+        with self._lock:
+            if self._closed.is_set():
+                raise ValueError("Vote log is closed")
+            os.write(self._fd, data)
+            self._dirty = True
+            if os.fstat(self._fd).st_size >= self.segment_max_bytes:
+                self._rotate()
+
+    def sync(self):
+        """fsync the active segment if anything was written since the last sync"""
+        with self._lock:
+            if self._dirty and not self._closed.is_set():
+                os.fsync(self._fd)
+                self._dirty = False
+
+    def close(self):
+        """Sync and close the active segment and stop the fsync thread"""
+        self.sync()
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            os.close(self._fd)
+            # Releases the writer directory
+            os.close(self._lock_fd)
+        self._thread.join()
+
+    def segments(self):
+        """Paths of all segments, writer by writer and oldest first; a writer's last one is its active segment"""
+        return [path for directory in self._writer_directories() for path in self._segments(directory)]
+
+    def scan(self, poll_ids=None, chunk_records=4096):
+        """
+        Stream the records of every segment in order.
+
+        Args:
+            poll_ids (set): Only yield records of these polls, or None for all.
+            chunk_records (int): Number of records read per disk read.
+
+        Yields:
+            VoteRecord: One record per logged vote.
+        """
+        self.sync()
+        for path in self.segments():
+            yield from self._scan_segment(path, poll_ids, chunk_records)
+
+    def compact(self, closed_poll_ids):
+        """
+        Fold the sealed segments of each writer into one.
+
+        Duplicate (poll_id, user_id) records are dropped, keeping the first one,
+        and records of closed polls are grouped by poll id ahead of the rest.
+        A writer's last segment is never touched, as its owner may be appending.
+
+        Args:
+            closed_poll_ids (set): IDs of polls that are closed.
+
+        Returns:
+            int: Number of records in the compacted segments.
+        """
+        return sum(
+            self._compact_segments(self._segments(directory)[:-1], closed_poll_ids)
+            for directory in self._writer_directories()
+        )
+
+    def _compact_segments(self, sealed, closed_poll_ids):
+        if not sealed:
+            return 0
+
+        seen = set()
+        closed, still_open = [], []
+        for path in sealed:
+            for record in self._scan_segment(path):
+                key = (record.poll_id, record.user_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                (closed if record.poll_id in closed_poll_ids else still_open).append(record)
+        closed.sort(key=lambda record: (record.poll_id, record.timestamp_ms))
+
+        target = sealed[0]
+        tmp_path = f"{target}.compacting"
+        with open(tmp_path, 'wb') as f:
+            for record in closed + still_open:
+                f.write(RECORD.pack(*record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+        for path in sealed[1:]:
+            os.remove(path)
+        return len(closed) + len(still_open)
+
+    def _scan_segment(self, path, poll_ids=None, chunk_records=4096):
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(RECORD.size * chunk_records)
+                # A torn write at the tail of the active segment leaves a partial record
+                usable = len(chunk) - len(chunk) % RECORD.size
+                if not usable:
+                    return
+                for fields in RECORD.iter_unpack(chunk[:usable]):
+                    if poll_ids is None or fields[0] in poll_ids:
+                        yield VoteRecord(*fields)
+
+    def _writer_directories(self):
+        numbers = []
+        for name in os.listdir(self.root):
+            match = WRITER_DIR_NAME.match(name)
+            if match and os.path.isdir(os.path.join(self.root, name)):
+                numbers.append(int(match.group(1)))
+        return [os.path.join(self.root, f"writer-{number}") for number in sorted(numbers)]
+
+    def _claim_writer_directory(self):
+        """Lock the first writer directory no live process holds, creating one if all are taken"""
+        number = 0
+        while True:
+            directory = os.path.join(self.root, f"writer-{number}")
+            os.makedirs(directory, exist_ok=True)
+            lock_fd = os.open(os.path.join(directory, WRITER_LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return directory, lock_fd
+            except BlockingIOError:
+                os.close(lock_fd)
+                number += 1
+
+    def _segments(self, directory):
+        return [os.path.join(directory, _segment_name(sequence)) for sequence in self._sequences(directory)]
+
+    @staticmethod
+    def _sequences(directory):
+        sequences = []
+        for name in os.listdir(directory):
+            match = SEGMENT_NAME.match(name)
+            if match:
+                sequences.append(int(match.group(1)))
+        return sorted(sequences)
+
+    def _open_segment(self, sequence):
+        path = os.path.join(self.directory, _segment_name(sequence))
+        return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _rotate(self):
+        # Called with the lock held
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._dirty = False
+        self._sequence += 1
+        self._fd = self._open_segment(self._sequence)
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Failed to fsync the vote log")
+
+
+def replay_tallies(vote_log, conn):
+    """
+    Overwrite the vote counters of every option found in the log with the logged totals.
+
+    The totals are only right if the log holds every vote, so replay is refused
+    when the votes table has more votes for an option than the log, e.g. because
+    the log was enabled after voting started.
+
+    Raises:
+        VoteLogIncomplete: If the log is missing votes the votes table has.
+
+    Returns:
+        int: Number of voting options whose counter was rewritten.
+    """
+    voters = {}
+    for record in vote_log.scan():
+        voters.setdefault(record.option_id, set()).add((record.poll_id, record.user_id))
+    counts = {option_id: len(users) for option_id, users in voters.items()}
+    if counts:
+        stored = conn.execute(
+            select(Vote.option_id, func.count()).where(Vote.option_id.in_(counts)).group_by(Vote.option_id)
+        ).all()
+        missing = sorted(option_id for option_id, count in stored if count > counts[option_id])
+        if missing:
+            raise VoteLogIncomplete(
+                f"The votes table has votes missing from the log for {len(missing)} voting options; "
+                f"rebuild the counters from the votes table instead"
+            )
+        conn.execute(
+            update(VotingOption)
+            .where(VotingOption.id == bindparam('b_option_id'))
+            .values(vote_count=bindparam('b_count')),
+            [{'b_option_id': option_id, 'b_count': count} for option_id, count in counts.items()]
+        )
+    return len(counts)
+
+
+def restore_votes(vote_log, conn, batch_size=5000):
+    """
+    Re-insert logged votes missing from the votes table.
+
+    Counters are left alone, since they may or may not have survived whatever
+    lost the votes; rebuild them afterwards with Poll.reconcile_vote_counts.
+
+    Returns:
+        int: Number of votes inserted.
+    """
+    restored = 0
+    batch = []
+
+    def flush():
+        inserted = Vote.insert_many(conn, batch)
+        batch.clear()
+        return len(inserted)
+
+    for record in vote_log.scan():
+        batch.append({'poll_id': record.poll_id, 'user_id': record.user_id, 'option_id': record.option_id})
+        if len(batch) >= batch_size:
+            restored += flush()
+    if batch:
+        restored += flush()
+    return restored
+
+
+def create_vote_log(config):
+    """
+    Open the vote log described by the app config.
+
+    Returns:
+        VoteLog: The open log, or None when VOTE_LOG_DIR is not set.
+    """
+    directory = config.get('VOTE_LOG_DIR')
+    if not directory:
+        return None
+    return VoteLog(
+        directory,
+        segment_max_bytes=config.get('VOTE_LOG_SEGMENT_MAX_BYTES', 64 * 1024 * 1024),
+        fsync_interval_ms=config.get('VOTE_LOG_FSYNC_INTERVAL_MS', 50)
+    )
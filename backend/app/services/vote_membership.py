@@ -0,0 +1,124 @@
+"""
+Vote Membership
+
+Per-user index of the polls a user has voted on, so "has U voted on P" and
+"which of these polls has U voted on" are answered from memory instead of a
+votes query per poll. A user's poll ids are loaded with one query the first
+time they are needed and kept as a sorted array of integers (8 bytes per vote
+instead of a set entry's ~60), searched with bisect. Committed votes are added
+as they happen and the least recently used users are evicted past max_users.
+
+Positive answers are authoritative, since votes are never removed. A negative
+answer can be stale when another worker process accepted the vote, so writes
+still rely on the database's one-vote-per-user constraint.
+"""
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+
+class VotedPolls:
+    """Sorted, compact set of poll ids"""
+
+    def __init__(self, poll_ids=()):
+        self._ids = array('q', sorted(set(poll_ids)))
+
+    def __contains__(self, poll_id):
+        i = bisect_left(self._ids, poll_id)
+        return i < len(self._ids) and self._ids[i] == poll_id
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, poll_id):
+        if poll_id not in self:
+            insort(self._ids, poll_id)
+
+
+class VoteMembershipIndex:
+    """Thread-safe LRU mapping user_id to the VotedPolls of that user"""
+
+    def __init__(self, max_users=10000):
+        # Callable taking a user id and returning the ids of the polls that user voted on
+        self.load_voted_polls = None
+        self.max_users = max_users
+        self._users = OrderedDict()
+        # Votes committed while a user's polls are being loaded, merged once the load finishes
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def has_voted(self, user_id, poll_id):
+        """Return True if the user has voted on the poll"""
+        return poll_id in self._voted_polls(user_id)
+
+    def voted_among(self, user_id, poll_ids):
+        """Return the subset of poll_ids the user has voted on"""
+        voted = self._voted_polls(user_id)
+        return {poll_id for poll_id in poll_ids if poll_id in voted}
+
+    def record(self, votes):
+        """
+        Add newly committed votes to the users already held in memory
+
+        Args:
+            votes: (poll_id, user_id, option_id) tuples
+        """
+        with self._lock:
+            for poll_id, user_id, _ in votes:
+                voted = self._users.get(user_id)
+                if voted is not None:
+                    voted.add(poll_id)
+                elif user_id in self._loading:
+                    self._loading[user_id].append(poll_id)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def stats(self):
+        """Return the index counters and current size"""
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "max_users": self.max_users,
+                "votes": sum(len(voted) for voted in self._users.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _voted_polls(self, user_id):
+        with self._lock:
+            voted = self._users.get(user_id)
+            if voted is not None:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return voted
+            self.misses += 1
+            self._loading.setdefault(user_id, [])
+
+        try:
+            voted = VotedPolls(self.load_voted_polls(user_id))
+        except Exception:
+            with self._lock:
+                self._loading.pop(user_id, None)
+            raise
+
+        with self._lock:
+            for poll_id in self._loading.pop(user_id, ()):
+                voted.add(poll_id)
+            # Another thread may have loaded the same user meanwhile; keep whichever is there
+            voted = self._users.setdefault(user_id, voted)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+            return voted
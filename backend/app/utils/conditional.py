@@ -0,0 +1,54 @@
+# Helpers for conditional GETs (ETag / If-None-Match, Last-Modified / If-Modified-Since)
+
+import hashlib
+
+from flask import Response
+
+
+def poll_etag(kind, poll_id, version, fields=None):
+    """Strong ETag of one representation (e.g. 'poll', 'results', optionally sparse) of a poll at a version"""
+    if fields is not None:
+        kind = '.'.join((kind,) + tuple(fields))
+    return f"{kind}-{poll_id}-{version}"
+
+
+def digest_etag(*parts):
+    """Strong ETag summarizing several values, e.g. the (id, version) pairs of a page"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def is_conditional(request):
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    Decide whether the client's copy is still current.
+
+    If-None-Match wins over If-Modified-Since when both are sent, as RFC 9110 requires.
+
+    Args:
+        etag (str): Current ETag, unquoted.
+        last_modified (datetime): Current modification time in naive UTC, or None when
+            the resource has no meaningful one.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def add_validators(response, etag, last_modified=None):
+    """Attach the validators and ask clients to revalidate before reusing the response"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(microsecond=0)
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """A bodiless 304 response carrying the current validators"""
+    return add_validators(Response(status=304), etag, last_modified)
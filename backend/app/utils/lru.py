@@ -0,0 +1,82 @@
+# Bounded in-process LRU shared by the app's caches
+#
+# The results, poll payload, user and token caches all keep an OrderedDict behind a lock,
+# evict the least recently used entry past max_entries and report the same counters.
+# They subclass LRUCache and only add what their entries mean.
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU mapping keys to values, with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, fresh=None):
+        """
+        Return the cached value of a key, or None on a miss.
+
+        Args:
+            key: Key of the entry.
+            fresh (callable): Called with the value under the cache lock; False drops the entry as a miss.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None and fresh is not None and not fresh(value):
+                del self._entries[key]
+                value = None
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key):
+        """Drop the cached value of a key"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return the cache counters and current size"""
+        with self._lock:
+            return self._stats()
+
+    def _store(self, key, value):
+        # Called with the lock held
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _stats(self):
+        # Called with the lock held; subclasses add their own counters
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,73 @@
+# Helpers for keyset (cursor) pagination
+
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) position as an opaque, URL-safe cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_score_cursor(score, row_id):
+    """Encode a (relevance score, id) position as an opaque, URL-safe cursor"""
+    raw = f"{score!r}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_score_cursor(cursor):
+    """
+    Decode a cursor produced by encode_score_cursor.
+
+    Returns:
+        tuple: (score, id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        score, row_id = raw.split('|')
+        return float(score), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(query, created_at_column, id_column, order, cursor=None):
+    """
+    Order a query by (created_at, id) and, given a cursor, keep only the rows after it.
+
+    The row-value comparison lets the database seek straight to the cursor in the
+    (created_at) index, so every page costs the same however deep it is.
+    """
+    if order == 'asc':
+        query = query.order_by(created_at_column.asc(), id_column.asc())
+    else:
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+    if cursor is not None:
+        position = tuple_(created_at_column, id_column)
+        after = tuple_(*decode_cursor(cursor))
+        query = query.filter(position > after if order == 'asc' else position < after)
+    return query
@@ -0,0 +1,57 @@
+from functools import wraps
+import math
+
+from flask import current_app, jsonify, request
+
+from app.utils.security import AuthorizationHeaderMissing, JWTDecodingError, JWTTokenExpired, get_request_user
+
+def client_ip():
+    """Key of anonymous requests; behind a proxy, wrap the app in werkzeug's ProxyFix"""
+    return f"ip:{request.remote_addr}"
+
+def user_or_ip():
+    """
+    Key requests by the user of their bearer token, falling back to the client IP.
+
+    The claims come from the token cache, so keying costs no database query. Requests
+    with a bad token are keyed by IP and still answered 401 by the route.
+    """
+    try:
+        return f"user:{get_request_user().id}"
+    except (AuthorizationHeaderMissing, JWTTokenExpired, JWTDecodingError):
+        return client_ip()
+
+def rate_limited(decision):
+    """429 answered to requests over their rate"""
+    if decision.retry_after_s is None:
+        # Costs more than the whole limit, retrying cannot help
+        response = jsonify({'error': f'Request exceeds the rate limit of {decision.limit}, split it up'})
+        response.headers['X-RateLimit-Limit'] = str(decision.limit)
+        return response, 429
+    retry_after = max(1, math.ceil(decision.retry_after_s))
+    response = jsonify({'error': 'Too many requests, try again later', 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    response.headers['X-RateLimit-Limit'] = str(decision.limit)
+    response.headers['X-RateLimit-Remaining'] = '0'
+    return response, 429
+
+def rate_limit(scope, key=user_or_ip, cost=None):
+    """
+    Admit a route's requests through the app's rate limiter, under the rate
+    configured for `scope` in RATE_LIMITS. `cost`, if given, is called to charge
+    a request as several, e.g. a vote batch as the number of votes it carries.
+
+    Refused requests are answered 429 before the route runs. Without a limiter
+    (RATE_LIMIT_BACKEND = None) the route is called directly.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            limiter = getattr(current_app, 'rate_limiter', None)
+            if limiter is not None:
+                decision = limiter.hit(scope, key(), cost() if cost is not None else 1)
+                if not decision.allowed:
+                    return rate_limited(decision)
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
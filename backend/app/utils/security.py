@@ -1,11 +1,9 @@
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask import jsonify, request
+from flask import current_app, g, jsonify, request
 from app.models.user import User
 from app import db
 import jwt
 from app.config import settings
-from datetime import datetime
 
 class AuthorizationHeaderMissing(Exception):
     """Raised when Authorization header is missing or invalid"""
@@ -38,14 +36,73 @@ def handle_auth_errors(f):
     return wrapper
 
 def hash_password(password):
-    return generate_password_hash(password)
+    return User.hash_password(password)
 
 def verify_password(password, password_hash):
-    return check_password_hash(password_hash, password)
+    return User.verify_password(password_hash, password)
 
-def get_current_user():
+class RequestUser:
     """
-    Retrieves the currently logged-in user based on the JWT token.
+    The authenticated user of a request, built from the JWT claims.
+
+    id and username come straight from the token. The full User is only loaded,
+    through the app's user cache, when a route reads `user`.
+    """
+
+    def __init__(self, claims):
+        self.claims = claims
+        self.id = claims['user_id']
+        self.username = claims.get('username')
+        self._user = None
+
+    @property
+    def user(self):
+        """The full User, loaded on first access; None if it no longer exists"""
+        if self._user is None:
+            user_cache = getattr(current_app, 'user_cache', None)
+            if user_cache is not None:
+                self._user = user_cache.get_user(self.id)
+            else:
+                self._user = db.query(User).filter_by(id=self.id).first()
+        return self._user
+
+def decode_token(token):
+    """
+    Verify a JWT and return its claims, from the app's token cache when it was verified before.
+
+    Every authentication path goes through here, so they all share the cache.
+
+    Raises:
+        JWTTokenExpired: If JWT token is expired
+        JWTDecodingError: If JWT decoding fails
+    """
+    token_cache = getattr(current_app, 'token_cache', None)
+    if token_cache is not None:
+        # Hits are checked against the revocation store by the cache itself
+        claims = token_cache.get(token)
+        if claims is not None:
+            return claims
+
+    try:
+        # Checks the signature and exp
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=['HS256'], options={'require': ['exp']})
+    except jwt.ExpiredSignatureError:
+        raise JWTTokenExpired("JWT token is expired")
+    except jwt.PyJWTError:
+        raise JWTDecodingError("JWT decoding failed")
+    if 'user_id' not in payload:
+        raise JWTDecodingError("JWT decoding failed")
+    revocation_store = getattr(current_app, 'revocation_store', None)
+    if revocation_store is not None and revocation_store.is_revoked_claims(payload):
+        raise JWTDecodingError("JWT token has been revoked")
+
+    if token_cache is not None:
+        token_cache.put(token, payload)
+    return payload
+
+def get_request_user():
+    """
+    Retrieves the authenticated user of the current request from the JWT claims, without a database query.
 
     Raises:
         AuthorizationHeaderMissing: If Authorization header is missing or invalid
@@ -53,19 +110,37 @@ def get_current_user():
         JWTDecodingError: If JWT decoding fails
 
     Returns:
-        User: The current user object
+        RequestUser: The claims-based user context, decoded once per request
     """
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
         raise AuthorizationHeaderMissing("Authorization header is missing or invalid")
     
     token = auth_header.split(' ')[1]
-    
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=['HS256'])
-        if datetime.utcnow() > datetime.fromtimestamp(payload['exp']):
-            raise JWTTokenExpired("JWT token is expired")
-            
-        return db.query(User).filter_by(id=payload['user_id']).first()
-    except jwt.PyJWTError:
-        raise JWTDecodingError("JWT decoding failed")
+
+    # g can outlive a request (e.g. under a pushed app context), so the context is tied to its token
+    cached = g.get('request_user')
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    claims = decode_token(token)
+    if claims.get('type') == 'refresh':
+        raise JWTDecodingError("Refresh tokens cannot authorize requests")
+    request_user = RequestUser(claims)
+    g.request_user = (token, request_user)
+    return request_user
+
+def get_current_user():
+    """
+    Retrieves the currently logged-in user based on the JWT token.
+
+    Routes that only need the user's id should use get_request_user() instead.
+
+    Raises:
+        AuthorizationHeaderMissing: If Authorization header is missing or invalid
+        JWTTokenExpired: If JWT token is expired
+        JWTDecodingError: If JWT decoding fails
+
+    Returns:
+        User: The current user object, served from the user cache when possible
+    """
+    return get_request_user().user
@@ -0,0 +1,74 @@
+# Fast JSON encoding for poll payloads
+#
+# Polls are encoded with orjson when it is installed and with the stdlib json module otherwise.
+# The encoded bytes of each poll are cached until the poll is edited or closed, so list pages
+# splice cached bytes together instead of rebuilding and re-encoding every poll dict.
+
+import json
+
+from flask import Response
+
+from app.utils.lru import LRUCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+
+def dumps(obj):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def json_response(body, status=200):
+    """Wrap already encoded JSON bytes in a response"""
+    return Response(body, status=status, mimetype='application/json')
+
+
+def add_fields(payload, fields):
+    """Append fields to an encoded JSON object without decoding it"""
+    if not fields:
+        return payload
+    extra = dumps(fields)
+    if payload == b'{}':
+        return extra
+    return payload[:-1] + b',' + extra[1:]
+
+
+def splice_object(key, items, fields=None):
+    """
+    Build {key: [items...], **fields} from already encoded items.
+
+    Args:
+        key (str): Name of the list member.
+        items (list): Encoded JSON values of the list.
+        fields (dict): Other members, encoded here.
+    """
+    body = b'{' + dumps(key) + b':[' + b','.join(items) + b']}'
+    return add_fields(body, fields)
+
+
+class PollPayloadCache(LRUCache):
+    """
+    Thread-safe LRU mapping poll_id to the encoded Poll.to_dict() payload, with hit/miss/eviction counters.
+
+    Each entry remembers the (content_version, is_active) it was encoded from; a poll that was
+    edited or closed since then is re-encoded and its entry replaced.
+    """
+
+    def __init__(self, max_entries=4096):
+        super().__init__(max_entries)
+
+    def encode(self, poll):
+        """Return the encoded payload of a poll, from the cache when the poll is unchanged"""
+        version = (poll.content_version, bool(poll.is_active))
+        entry = self.get(poll.id, fresh=lambda entry: entry[0] == version)
+        if entry is not None:
+            return entry[1]
+
+        payload = dumps(poll.to_dict())
+        self.set(poll.id, (version, payload))
+        return payload
@@ -6,6 +6,26 @@ def validate_poll_input(question, option_one, option_two):
     # Logic to validate poll input
     pass
 
+def parse_fields(value, allowed):
+    """
+    Parse a comma separated `fields=` parameter.
+
+    Returns:
+        tuple: The requested fields in the order of `allowed`, or None when the parameter is absent.
+
+    Raises:
+        ValueError: If a field is unknown or none is given.
+    """
+    if value is None:
+        return None
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return tuple(field for field in allowed if field in requested)
+
 def check_file_extension(filename, allowed_extensions):
     _, ext = splitext(filename)
     return ext.lower() in allowed_extensions
@@ -0,0 +1,125 @@
+"""
+Hot poll vote throughput
+
+Measures how many votes per second a single poll absorbs through
+PollService.record_vote with 32 concurrent writers, once with every vote
+updating the option counter row and once with hot poll striping enabled.
+Each run uses a fresh database so both start from the same state.
+
+Usage (from the backend directory):
+    python -m benchmarks.hot_poll_votes [--writers 32] [--votes-per-writer 200]
+        [--database-url postgresql://...]
+
+Without --database-url a temporary SQLite file is used. SQLite serializes
+every writer on the database lock, so the difference there comes from the
+shorter transactions; a server database also shows the removed row lock wait.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from app.databases.database import db
+from app.models import Base
+from app.models.poll import Poll
+from app.models.user import User
+from app.models.voting_option import VotingOption
+from app.services.hot_counters import HotPollCounters
+from app.services.poll_service import PollService
+
+
+def setup_poll(writers, votes_per_writer):
+    """Create one active poll with two options and a user per vote"""
+    owner = User(username='bench-owner', email='bench-owner@example.com')
+    db.add(owner)
+    db.flush()
+    poll = Poll(question='Benchmark poll?', user_id=owner.id)
+    db.add(poll)
+    db.flush()
+    options = [
+        VotingOption('image', f'/uploads/{text}.png', description=text, poll_id=poll.id)
+        for text in ('A', 'B')
+    ]
+    db.add_all(options)
+    voters = [
+        User(username=f'bench-{i}', email=f'bench-{i}@example.com')
+        for i in range(writers * votes_per_writer)
+    ]
+    db.add_all(voters)
+    db.commit()
+    return poll.id, [option.id for option in options], [voter.id for voter in voters]
+
+
+def run(database_url, writers, votes_per_writer, hot):
+    engine = create_engine(database_url, pool_size=writers, max_overflow=0, connect_args=(
+        {'timeout': 60, 'check_same_thread': False} if database_url.startswith('sqlite') else {}
+    ))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db.remove()
+    db.configure(bind=engine)
+
+    poll_id, option_ids, voter_ids = setup_poll(writers, votes_per_writer)
+    counters = HotPollCounters(engine, votes_per_second=1) if hot else None
+    poll_service = PollService(hot_counters=counters)
+    barrier = threading.Barrier(writers + 1)
+    errors = []
+
+    def writer(index):
+        barrier.wait()
+        try:
+            for n, user_id in enumerate(voter_ids[index::writers]):
+                poll_service.record_vote(poll_id, option_ids[n % 2], user_id)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.remove()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    if counters is not None:
+        counters.flush()
+    elapsed = time.perf_counter() - started
+
+    total = sum(poll_service.get_vote_tallies([poll_id])[poll_id].values())
+    db.remove()
+    engine.dispose()
+    if errors:
+        raise errors[0]
+    assert total == len(voter_ids), f"expected {len(voter_ids)} votes, counted {total}"
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--votes-per-writer', type=int, default=200)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmp_dir = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    try:
+        for label, hot in (('row counter', False), ('striped', True)):
+            rate = run(database_url, args.writers, args.votes_per_writer, hot)
+            print(f"{label:>12}: {rate:8.0f} votes/s  ({args.writers} writers, one poll)")
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Login throughput
+
+Measures how many POST /login requests per second the app answers with
+16 concurrent clients, once hashing on the request threads and once in
+the password hashing pool. While the logins run, a probe thread keeps
+requesting GET /polls/trending, a cheap endpoint standing in for votes,
+and reports its latency: inline hashing holds the GIL and delays it.
+
+Usage (from the backend directory):
+    python -m benchmarks.login_throughput [--clients 16] [--logins-per-client 10]
+        [--pool-size 4] [--method scrypt:32768:8:1]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from app import create_app
+from app.config import Config
+from app.databases.database import db
+from app.models import Base
+from app.models.user import User
+
+
+def run(database_url, clients, logins_per_client, pool_size, method):
+    class BenchConfig(Config):
+        PASSWORD_HASH_POOL_SIZE = pool_size
+        PASSWORD_HASH_MAX_PENDING = clients * 2
+        PASSWORD_HASH_METHOD = method
+        TRENDING_REFRESH_INTERVAL_S = 3600
+
+    app = create_app(BenchConfig)
+    engine = create_engine(database_url, connect_args={'check_same_thread': False})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db.remove()
+    db.configure(bind=engine)
+
+    with app.app_context():
+        db.add(User(username='bench', email='bench@example.com', password='bench-password'))
+        db.commit()
+        # Start the pool workers before timing
+        app.password_hasher.verify(app.password_hasher.hash('warm-up'), 'warm-up')
+        db.remove()
+
+    barrier = threading.Barrier(clients + 1)
+    done = threading.Event()
+    errors = []
+    probe_latencies = []
+
+    def client():
+        barrier.wait()
+        test_client = app.test_client()
+        try:
+            for _ in range(logins_per_client):
+                response = test_client.post('/login', json={'username': 'bench', 'password': 'bench-password'})
+                if response.status_code != 200:
+                    raise RuntimeError(f"login answered {response.status_code}")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.remove()
+
+    def probe():
+        test_client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            test_client.get('/polls/trending')
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(0.005)
+        db.remove()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    probe_thread = threading.Thread(target=probe)
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    probe_thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    probe_thread.join()
+
+    app.password_hasher.close()
+    db.remove()
+    engine.dispose()
+    if errors:
+        raise errors[0]
+    latencies = sorted(probe_latencies)
+    return (
+        clients * logins_per_client / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95)] * 1000
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins-per-client', type=int, default=10)
+    parser.add_argument('--pool-size', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    try:
+        for label, pool_size in (('inline', 0), (f'pool of {args.pool_size}', args.pool_size)):
+            rate, p50, p95 = run(database_url, args.clients, args.logins_per_client, pool_size, args.method)
+            print(f"{label:>12}: {rate:6.1f} logins/s, probe p50 {p50:6.1f} ms, p95 {p95:6.1f} ms")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
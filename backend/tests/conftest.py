@@ -29,6 +29,9 @@ def clean_db(app):
         
         # Truncate each table in reverse order to respect foreign key constraints
         for table in reversed(Base.metadata.sorted_tables):
+            # FTS5 shadow tables are maintained through their virtual table
+            if table.name.startswith('poll_search_'):
+                continue
             db.execute(text(f"DELETE FROM {table.name}"))
                 
         db.commit()
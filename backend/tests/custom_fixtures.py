@@ -3,6 +3,17 @@ from app.models.user import User
 from app.services.auth_service import generate_tokens
 from app.databases.database import db
 
+class FakeClock:
+    """Stand-in for time.time or time.monotonic, moved by hand"""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
 @pytest.fixture
 def test_image_data():
     return {
@@ -0,0 +1,80 @@
+from app.models.poll import Poll
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def vote(authenticated_client, poll_id):
+    with authenticated_client.application.app_context():
+        option_id = Poll.get_poll_by_id(poll_id).voting_options[0].id
+    return authenticated_client.post(
+        f'/polls/{poll_id}/vote',
+        json={'option_id': option_id},
+        headers={'Authorization': f'Bearer {authenticated_client.tokens["access_token"]}'}
+    )
+
+def test_poll_detail_revalidation(app, client, authenticated_client, poll_fixture, test_image_data):
+    """Test that an unchanged poll answers 304 after one statement, and a vote changes its ETag"""
+    poll_id = poll_fixture(test_image_data).id
+
+    first = client.get(f'/polls/{poll_id}')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert first.headers['Last-Modified']
+
+    cached = client.get(f'/polls/{poll_id}', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+    assert cached.headers['X-SQL-Statements'] == '1'
+
+    assert vote(authenticated_client, poll_id).status_code == 201
+    changed = client.get(f'/polls/{poll_id}', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+def test_poll_detail_if_modified_since(app, client, poll_fixture, test_image_data):
+    """Test that If-Modified-Since is honoured and an edit makes the poll modified again"""
+    poll_id = poll_fixture(test_image_data).id
+    last_modified = client.get(f'/polls/{poll_id}').headers['Last-Modified']
+
+    assert client.get(f'/polls/{poll_id}', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(
+        f'/polls/{poll_id}', headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}
+    ).status_code == 200
+
+    with app.app_context():
+        poll = Poll.get_poll_by_id(poll_id)
+        version = poll.version
+        poll.update_poll(question="Edited?")
+        assert Poll.get_validators(poll_id)[0] == version + 1
+
+def test_results_revalidation(app, client, authenticated_client, poll_fixture, test_image_data):
+    """Test that closed poll results are validated by the version bumped on close"""
+    test_poll = poll_fixture(test_image_data)
+    before_close = client.get(f'/polls/{test_poll.id}').headers['ETag']
+
+    with app.app_context():
+        app.poll_service.close_poll(test_poll.id, test_poll.user_id)
+
+    first = client.get(f'/polls/{test_poll.id}/results')
+    assert first.status_code == 200
+    assert client.get(f'/polls/{test_poll.id}').headers['ETag'] != before_close
+
+    cached = client.get(f'/polls/{test_poll.id}/results', headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.headers['X-SQL-Statements'] == '1'
+
+def test_poll_list_revalidation(app, client, poll_fixture, test_image_data):
+    """Test that a list page answers 304 from its keys only, until a poll joins the page"""
+    poll_fixture(test_image_data)
+
+    first = client.get('/polls?cursor=')
+    etag = first.headers['ETag']
+
+    cached = client.get('/polls?cursor=', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['X-SQL-Statements'] == '1'
+    # The ETag depends on the query too
+    assert client.get('/polls?cursor=&order=asc', headers={'If-None-Match': etag}).status_code == 200
+
+    poll_fixture(test_image_data)
+    assert client.get('/polls?cursor=', headers={'If-None-Match': etag}).status_code == 200
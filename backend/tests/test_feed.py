@@ -0,0 +1,68 @@
+from app.services.feed_service import FeedService
+from app.services.poll_service import PollService
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def get_feed(authenticated_client, query=''):
+    access_token = authenticated_client.tokens['access_token']
+    return authenticated_client.get(
+        f'/feed{query}',
+        headers={'Authorization': f'Bearer {access_token}'}
+    )
+
+def test_feed_skips_voted_and_closed_polls(clean_db, app, authenticated_client, poll_fixture, test_image_data):
+    """Test that the feed lists unvoted active polls newest first and drops voted and closed ones"""
+    with app.app_context():
+        polls = [poll_fixture(test_image_data) for _ in range(4)]
+        poll_ids = [poll.id for poll in polls]
+        user_id = authenticated_client.user.id
+
+    response = get_feed(authenticated_client)
+    assert response.status_code == 200
+    assert [p['id'] for p in response.get_json()['polls']] == poll_ids[::-1]
+
+    with app.app_context():
+        app.poll_service.record_vote(poll_ids[3], polls[3].voting_options[0].id, user_id)
+        app.poll_service.close_poll(poll_ids[1], polls[1].user_id)
+        new_poll_id = poll_fixture(test_image_data).id
+
+    data = get_feed(authenticated_client).get_json()
+    assert [p['id'] for p in data['polls']] == [new_poll_id, poll_ids[2], poll_ids[0]]
+    assert data['next_cursor'] is None
+
+def test_feed_cursor_pages_through_queue(clean_db, app, authenticated_client, poll_fixture, test_image_data):
+    """Test that next_cursor continues the feed where the previous page stopped"""
+    with app.app_context():
+        poll_ids = [poll_fixture(test_image_data).id for _ in range(5)]
+
+    seen = []
+    query = '?limit=2'
+    while True:
+        data = get_feed(authenticated_client, query).get_json()
+        seen.extend(p['id'] for p in data['polls'])
+        if data['next_cursor'] is None:
+            break
+        query = f"?limit=2&cursor={data['next_cursor']}"
+
+    assert seen == poll_ids[::-1]
+
+def test_feed_reads_past_a_full_queue(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that refills are bulk scans and the feed keeps going past the queue cap"""
+    with app.app_context():
+        poll_ids = [poll_fixture(test_image_data).id for _ in range(7)]
+        user_id = authenticated_client.user.id
+        poll_service = PollService(feed=FeedService(batch_size=2, max_candidates=3))
+        poll_service.record_vote(poll_ids[5], poll_service.get_poll_details(poll_ids[5])['options'][0]['id'], user_id)
+
+        first, after = poll_service.get_feed(user_id, 3)
+        second, after = poll_service.get_feed(user_id, 3, after)
+        assert len(poll_service.feed._queue(user_id).candidates) <= 3
+
+    returned = [p['id'] for p in first + second]
+    expected = [poll_id for poll_id in poll_ids[::-1] if poll_id != poll_ids[5]]
+    assert returned == expected[:6]
+
+def test_feed_requires_auth(client):
+    """Test that the feed is only served to authenticated users"""
+    response = client.get('/feed')
+    assert response.status_code == 401
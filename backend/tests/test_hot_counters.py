@@ -0,0 +1,97 @@
+import threading
+
+from app.databases.database import db, engine
+from app.services.hot_counters import HotPollCounters
+from app.services.poll_service import PollService
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+def test_poll_becomes_hot_above_threshold():
+    """Test that a poll is only hot once its vote rate reaches the threshold"""
+    counters = HotPollCounters(engine, votes_per_second=3)
+
+    assert [counters.observe(1) for _ in range(4)] == [False, False, True, True]
+    assert counters.is_hot(1)
+    assert not counters.observe(2)
+    assert not HotPollCounters(engine, votes_per_second=0).observe(1)
+
+def test_cooled_down_polls_are_forgotten():
+    """Test that polls whose cooldown ended are pruned instead of accumulating"""
+    clock = FakeClock()
+    counters = HotPollCounters(engine, votes_per_second=1, cooldown_s=10, clock=clock)
+    for poll_id in range(100):
+        assert counters.observe(poll_id)
+    assert len(counters._hot_until) == 100
+
+    clock.advance(11)
+    assert counters.observe(1000)
+    assert not counters.is_hot(0)
+    assert list(counters._hot_until) == [1000]
+
+def test_striped_counters_merge_all_threads():
+    """Test that increments from many threads are spread over the stripes and merged per option"""
+    counters = HotPollCounters(engine, stripes=4, flush_interval_ms=60000)
+    start = threading.Barrier(8)
+
+    def vote():
+        start.wait()
+        for _ in range(100):
+            counters.add(1, 10)
+            counters.add(2, 20)
+
+    threads = [threading.Thread(target=vote) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(1 for stripe in counters._stripes if stripe.deltas) == 4
+    assert counters.pending() == {1: {10: 800}, 2: {20: 800}}
+    assert counters.pending([2]) == {2: {20: 800}}
+
+def test_hot_poll_reads_stay_exact(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that tallies include unflushed increments and the flush writes them to the database"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        poll_id = test_poll.id
+        option_id = test_poll.voting_options[0].id
+        counters = HotPollCounters(engine, votes_per_second=1, flush_interval_ms=60000)
+        poll_service = PollService(hot_counters=counters)
+
+        poll_service.record_vote(poll_id, option_id, user_id)
+
+        assert counters.pending() == {poll_id: {option_id: 1}}
+        assert {row[0]: row[2] for row in test_poll.get_vote_counts()}[option_id] == 0
+        assert poll_service.get_vote_tallies([poll_id])[poll_id][option_id] == 1
+
+        assert counters.flush() == 1
+        assert counters.pending() == {}
+        assert {row[0]: row[2] for row in test_poll.get_vote_counts()}[option_id] == 1
+        assert poll_service.get_vote_tallies([poll_id])[poll_id][option_id] == 1
+
+def test_closing_a_hot_poll_flushes_its_counters(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that closing flushes pending increments and a later flush invalidates cached results"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        poll_id = test_poll.id
+        option_id = test_poll.voting_options[0].id
+        counters = HotPollCounters(engine, votes_per_second=1, flush_interval_ms=60000)
+        poll_service = PollService(hot_counters=counters)
+        test_poll.user_id = user_id
+        db.commit()
+
+        poll_service.record_vote(poll_id, option_id, user_id)
+        assert poll_service.close_poll(poll_id, user_id)
+        assert counters.pending() == {}
+        assert {row[0]: row[2] for row in test_poll.get_vote_counts()}[option_id] == 1
+        assert poll_service.get_poll_results(poll_id)['total_votes'] == 1
+
+        # A straggling increment, e.g. from a vote racing the close
+        counters.add(poll_id, option_id)
+        counters.flush()
+        assert poll_service.results_cache.get(poll_id) is None
+        assert poll_service.get_poll_results(poll_id)['total_votes'] == 2
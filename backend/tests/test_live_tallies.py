@@ -0,0 +1,56 @@
+import json
+
+from app.services.live_tallies import HEARTBEAT
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def read_tally(chunks):
+    event = next(chunks)
+    event = event.decode() if isinstance(event, bytes) else event
+    assert event.startswith("event: tally\n")
+    return json.loads(event.split("data: ", 1)[1])
+
+def test_stream_pushes_changed_tallies(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that the stream sends the current tally and a new one after a vote"""
+    test_poll = poll_fixture(test_image_data)
+    hub = app.poll_service.live_tallies
+    hub.interval = 0.01
+
+    response = app.test_client().get(f'/polls/{test_poll.id}/results/stream', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+
+    assert read_tally(chunks)["total_votes"] == 0
+    assert hub.subscriber_count(test_poll.id) == 1
+
+    with app.app_context():
+        option_id = test_poll.voting_options[0].id
+        app.poll_service.record_vote(test_poll.id, option_id, authenticated_client.user.id)
+
+    tally = read_tally(chunks)
+    assert tally["total_votes"] == 1
+    assert {"id": option_id, "vote_count": 1, "percentage": 100.0} in tally["options"]
+
+    response.close()
+    assert hub.subscriber_count() == 0
+
+def test_stream_sends_heartbeats(app, poll_fixture, test_image_data):
+    """Test that a quiet stream receives keep-alive comments"""
+    test_poll = poll_fixture(test_image_data)
+    hub = app.poll_service.live_tallies
+    hub.interval = 0.01
+    hub.heartbeat = 0.05
+
+    response = app.test_client().get(f'/polls/{test_poll.id}/results/stream', buffered=False)
+    chunks = iter(response.response)
+    read_tally(chunks)
+
+    heartbeat = next(chunks)
+    assert (heartbeat.decode() if isinstance(heartbeat, bytes) else heartbeat) == HEARTBEAT
+    response.close()
+
+def test_stream_unknown_poll(client):
+    """Test that streaming a missing poll answers 404"""
+    response = client.get('/polls/999999/results/stream')
+    assert response.status_code == 404
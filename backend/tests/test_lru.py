@@ -0,0 +1,15 @@
+from app.utils.lru import LRUCache
+
+def test_stale_entries_are_dropped_as_misses():
+    """Test that an entry the freshness check rejects is removed and counted as a miss"""
+    cache = LRUCache(max_entries=2)
+    cache.set('a', (1, 'old'))
+
+    assert cache.get('a', fresh=lambda entry: entry[0] == 1) == (1, 'old')
+    assert cache.get('a', fresh=lambda entry: entry[0] == 2) is None
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
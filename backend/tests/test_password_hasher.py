@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from app import db
+from app.models.user import User
+from app.services import password_hasher
+from app.services.password_hasher import HashingPoolSaturated, PasswordHasher
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_inline_hash_verify_and_rehash_detection():
+    """Test that hashes carry the configured method and older methods are flagged"""
+    hasher = PasswordHasher(pool_size=0, method='pbkdf2:sha256:1000')
+    password_hash = hasher.hash('secret')
+
+    assert password_hash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.verify(password_hash, 'secret')
+    assert not hasher.verify(password_hash, 'wrong')
+    assert not hasher.verify(None, 'secret')
+    assert not hasher.needs_rehash(password_hash)
+    assert PasswordHasher(pool_size=0, method='pbkdf2:sha256:2000').needs_rehash(password_hash)
+
+def test_rehash_detection_normalizes_default_parameters():
+    """Test that a method given without cost parameters matches the hashes it produces"""
+    hasher = PasswordHasher(pool_size=0, method='pbkdf2')
+
+    assert hasher.method.startswith('pbkdf2:sha256:')
+    assert not hasher.needs_rehash(hasher.hash('secret'))
+
+def test_method_is_normalized_lazily(monkeypatch):
+    """Test that building a hasher hashes nothing, and the first hash also normalizes the method"""
+    calls = []
+    real_hash = password_hasher.generate_password_hash
+
+    def counted_hash(password, method):
+        calls.append(method)
+        return real_hash(password, method=method)
+    monkeypatch.setattr(password_hasher, 'generate_password_hash', counted_hash)
+
+    hasher = PasswordHasher(pool_size=0, method='pbkdf2')
+    assert calls == []
+
+    password_hash = hasher.hash('secret')
+    assert not hasher.needs_rehash(password_hash)
+    assert len(calls) == 1
+
+def test_pool_timeout_is_shed_like_saturation():
+    """Test that a hash not done within the timeout raises HashingPoolSaturated, which routes answer with 503"""
+    hasher = PasswordHasher(pool_size=1, method='pbkdf2:sha256:1000', timeout_s=0.01)
+    try:
+        with pytest.raises(HashingPoolSaturated):
+            hasher._run(time.sleep, 1)
+    finally:
+        hasher.close()
+
+def test_pool_hashes_in_worker_processes():
+    """Test that the process pool produces hashes the request thread can verify"""
+    hasher = PasswordHasher(pool_size=1, method='pbkdf2:sha256:1000')
+    try:
+        password_hash = hasher.hash('secret')
+        assert hasher.verify(password_hash, 'secret')
+        assert not hasher.verify(password_hash, 'wrong')
+    finally:
+        hasher.close()
+
+def test_saturated_hasher_rejects_fast():
+    """Test that calls beyond max_pending fail immediately instead of queueing"""
+    hasher = PasswordHasher(pool_size=0, max_pending=1, method='pbkdf2:sha256:1000')
+    started, release = threading.Event(), threading.Event()
+
+    def slow(*_):
+        started.set()
+        release.wait(5)
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(HashingPoolSaturated):
+            hasher.hash('secret')
+        assert hasher.rejected == 1
+    finally:
+        release.set()
+        worker.join()
+    assert hasher.verify(hasher.hash('secret'), 'secret')
+
+def test_login_rehashes_when_cost_changes(app, client, authenticated_client):
+    """Test that a successful login upgrades a hash made with another method"""
+    old_method = app.password_hasher.method
+    app.password_hasher.method = 'pbkdf2:sha256:1500'
+    try:
+        response = client.post('/login', json={'username': 'test_user', 'password': 'test_password'})
+        assert response.status_code == 200
+        with app.app_context():
+            assert User.get_user_by_username('test_user').password_hash.startswith('pbkdf2:sha256:1500$')
+    finally:
+        app.password_hasher.method = old_method
+
+def test_login_succeeds_when_rehash_is_shed(app, client, authenticated_client):
+    """Test that a verified login still succeeds when the hasher has no room left for the rehash"""
+    hasher = app.password_hasher
+    old_method = hasher.method
+    hasher.method = 'pbkdf2:sha256:1700'
+    with app.app_context():
+        stored_hash = User.get_user_by_username('test_user').password_hash
+
+    def saturated(password):
+        raise HashingPoolSaturated("Too many password operations in progress")
+    hasher.hash = saturated
+    try:
+        response = client.post('/login', json={'username': 'test_user', 'password': 'test_password'})
+        assert response.status_code == 200
+        with app.app_context():
+            assert User.get_user_by_username('test_user').password_hash == stored_hash
+    finally:
+        del hasher.hash
+        hasher.method = old_method
+
+def test_login_answers_503_when_saturated(app, client, authenticated_client):
+    """Test that logins are shed with 503 and Retry-After while the hasher is saturated"""
+    slots = app.password_hasher._slots
+    app.password_hasher._slots = threading.BoundedSemaphore(1)
+    app.password_hasher._slots.acquire()
+    try:
+        response = client.post('/login', json={'username': 'test_user', 'password': 'test_password'})
+    finally:
+        app.password_hasher._slots = slots
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -1,7 +1,10 @@
 import pytest
+from sqlalchemy import event
 from werkzeug.exceptions import BadRequest
 from app.models.poll import Poll
+from app.models.poll_stats import PollStats
 from app import db
+from app.databases.database import engine
 
 from app.services.poll_service import PollService
 
@@ -190,3 +193,182 @@ def test_get_polls(clean_db, app, authenticated_client, poll_fixture, test_image
     assert len(data["polls"]) >= 2
     assert any(p['id'] == poll1.id for p in data["polls"])
     assert any(p['id'] == poll2.id for p in data["polls"])
+
+@pytest.mark.parametrize('filter_type', ['all', 'active', 'closed'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_get_polls_cursor_pagination(clean_db, app, client, poll_fixture, test_image_data, filter_type, order):
+    """Test that walking the cursor visits every matching poll once, in order, and stops without an empty last page"""
+    app.config['PAGINATION_PER_PAGE'] = 2
+    with app.app_context():
+        # 6 polls, 3 closed: 'all' is an exact multiple of the page size
+        polls = [poll_fixture(test_image_data) for _ in range(6)]
+        for poll in polls[::2]:
+            app.poll_service.close_poll(poll.id, poll.user_id)
+        expected = [
+            poll.id for poll in polls
+            if filter_type == 'all' or (filter_type == 'closed') == (poll.id in {p.id for p in polls[::2]})
+        ]
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/polls?filter={filter_type}&order={order}&cursor={cursor}')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'total_pages' not in data
+        assert data['polls']
+        seen.extend(p['id'] for p in data['polls'])
+        cursor = data['next_cursor']
+
+    assert seen == (expected if order == 'asc' else expected[::-1])
+
+    # Page mode only offers a next page when there is one
+    pages = -(-len(expected) // 2)
+    data = client.get(f'/polls?filter={filter_type}&order={order}&page={pages}').get_json()
+    assert data['polls']
+    assert data['next_cursor'] is None
+    assert client.get(f'/polls?filter={filter_type}&order={order}&page=1').get_json()['next_cursor'] is not None
+
+def test_get_polls_cursor_total_is_opt_in(clean_db, app, client, poll_fixture, test_image_data):
+    """Test that cursor mode only counts the polls when asked to"""
+    app.config['PAGINATION_PER_PAGE'] = 2
+    with app.app_context():
+        for _ in range(3):
+            poll_fixture(test_image_data)
+
+    data = client.get('/polls?cursor=&include_total=true').get_json()
+    assert data['total_count'] == 3
+    assert data['total_pages'] == 2
+    assert data['next_cursor'] is not None
+
+def test_get_polls_invalid_cursor(client):
+    """Test that a malformed cursor is rejected"""
+    response = client.get('/polls?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "Invalid cursor"
+
+def test_get_polls_statement_count_is_constant(clean_db, app, client, poll_fixture, test_image_data):
+    """Test that a page of polls costs the same number of queries however many polls it holds"""
+    with app.app_context():
+        poll_fixture(test_image_data)
+    # The first read after clean_db rebuilds poll_stats
+    client.get('/polls')
+    small_page = client.get('/polls')
+    cursor_small_page = client.get('/polls?cursor=')
+
+    with app.app_context():
+        for _ in range(5):
+            poll_fixture(test_image_data)
+    full_page = client.get('/polls')
+    cursor_full_page = client.get('/polls?cursor=')
+
+    assert len(full_page.get_json()['polls']) == 6
+    # Page, options of the page, and the poll_stats counters
+    assert full_page.headers['X-SQL-Statements'] == small_page.headers['X-SQL-Statements'] == '3'
+    assert cursor_full_page.headers['X-SQL-Statements'] == cursor_small_page.headers['X-SQL-Statements'] == '2'
+
+def test_get_poll_loads_options_in_one_query(client, poll_fixture, test_image_data):
+    """Test that a poll and its options are read with a single query"""
+    test_poll = poll_fixture(test_image_data)
+
+    response = client.get(f'/polls/{test_poll.id}')
+    assert response.status_code == 200
+    assert len(response.get_json()['options']) == 2
+    assert response.headers['X-SQL-Statements'] == '1'
+
+def test_get_polls_sparse_fields_skip_options(clean_db, app, client, poll_fixture, test_image_data):
+    """Test that fields= trims the payload and the loaded columns, and skips the options query"""
+    with app.app_context():
+        poll_fixture(test_image_data)
+        poll_fixture(test_image_data)
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/polls?cursor=&fields=is_active,id')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert [sorted(p) for p in response.get_json()['polls']] == [['id', 'is_active']] * 2
+    assert response.headers['X-SQL-Statements'] == '1'
+    assert 'polls.question' not in statements[0]
+    assert 'voting_option' not in statements[0]
+
+    with_options = client.get('/polls?cursor=&fields=id,options').get_json()['polls']
+    assert [sorted(p) for p in with_options] == [['id', 'options']] * 2
+    assert len(with_options[0]['options']) == 2
+
+def test_get_poll_sparse_fields(client, poll_fixture, test_image_data):
+    """Test that fields= applies to a single poll and changes its ETag"""
+    test_poll = poll_fixture(test_image_data)
+
+    full = client.get(f'/polls/{test_poll.id}')
+    sparse = client.get(f'/polls/{test_poll.id}?fields=question')
+    assert sparse.get_json() == {"question": test_poll.question}
+    assert sparse.headers['X-SQL-Statements'] == '1'
+    assert sparse.headers['ETag'] != full.headers['ETag']
+
+def test_get_polls_rejects_unknown_fields(client):
+    """Test that unknown or empty fieldsets are refused"""
+    assert client.get('/polls?fields=id,password').status_code == 400
+    assert client.get('/polls?fields=,').status_code == 400
+    assert client.get('/polls/1?fields=votes').status_code == 400
+
+def test_poll_stats_follow_create_and_close(clean_db, app, client, poll_fixture, test_image_data):
+    """Test that listing totals come from the maintained counters, without counting polls"""
+    app.config['PAGINATION_PER_PAGE'] = 2
+    with app.app_context():
+        # Emptied table: the first read rebuilds the counters
+        assert PollStats.get_counts() == {'all': 0, 'active': 0, 'closed': 0}
+        polls = [poll_fixture(test_image_data) for _ in range(3)]
+        app.poll_service.close_poll(polls[0].id, polls[0].user_id)
+        # Closing twice must not move the counters again
+        app.poll_service.close_poll(polls[0].id, polls[0].user_id)
+        assert PollStats.get_counts() == {'all': 3, 'active': 2, 'closed': 1}
+
+    for filter_type, total in (('all', 3), ('active', 2), ('closed', 1)):
+        response = client.get(f'/polls?filter={filter_type}')
+        assert response.get_json()['total_count'] == total
+        assert response.get_json()['total_pages'] == (total + 1) // 2
+
+def test_reconcile_poll_stats_command(clean_db, app, poll_fixture, test_image_data):
+    """Test that the reconcile command repairs drifted poll counters"""
+    with app.app_context():
+        poll_fixture(test_image_data)
+        db.query(PollStats).update({PollStats.count: 42})
+        db.commit()
+
+    result = app.test_cli_runner().invoke(args=['polls', 'reconcile-stats'])
+    assert result.exit_code == 0
+
+    with app.app_context():
+        assert PollStats.get_counts() == {'all': 1, 'active': 1, 'closed': 0}
+
+def test_get_polls_by_ids(clean_db, app, client, poll_fixture, test_image_data):
+    """Test that ids= returns the polls in request order with two queries and reports missing ids"""
+    with app.app_context():
+        poll_ids = [poll_fixture(test_image_data).id for _ in range(3)]
+    requested = [poll_ids[2], 999999, poll_ids[0], poll_ids[2], poll_ids[1]]
+
+    response = client.get(f"/polls?ids={','.join(map(str, requested))}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['id'] for p in data['polls']] == [poll_ids[2], poll_ids[0], poll_ids[1]]
+    assert data['missing'] == [999999]
+    assert len(data['polls'][0]['options']) == 2
+    # Polls, then the options of all of them
+    assert response.headers['X-SQL-Statements'] == '2'
+
+    sparse = client.get(f"/polls?ids={poll_ids[0]}&fields=id")
+    assert sparse.get_json() == {"polls": [{"id": poll_ids[0]}], "missing": []}
+    assert sparse.headers['X-SQL-Statements'] == '1'
+
+def test_get_polls_by_ids_validation(app, client):
+    """Test that malformed and oversized id lists are refused"""
+    max_ids = app.config['POLLS_MAX_IDS']
+    assert client.get('/polls?ids=1,abc').status_code == 400
+    assert client.get('/polls?ids=').status_code == 400
+    assert client.get(f"/polls?ids={','.join(str(i) for i in range(1, max_ids + 2))}").status_code == 400
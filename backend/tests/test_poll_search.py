@@ -0,0 +1,83 @@
+from sqlalchemy import text
+
+from app import db
+from app.models.poll import Poll
+from app.models.poll_search import PollSearch
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def make_poll(poll_fixture, question, first='Blue', second='Red'):
+    return poll_fixture({
+        "question": question,
+        "option1": {"media_type": "image", "media_url": "https://example.com/image1.jpg", "description": first},
+        "option2": {"media_type": "image", "media_url": "https://example.com/image2.jpg", "description": second}
+    })
+
+def search_ids(client, query):
+    response = client.get(f'/polls/search?{query}')
+    assert response.status_code == 200
+    return [p['id'] for p in response.get_json()['polls']]
+
+def test_build_match_quotes_every_word_as_prefix():
+    """Test that user input cannot inject FTS5 syntax"""
+    assert PollSearch.build_match('best pizz') == '"best"* "pizz"*'
+    assert PollSearch.build_match('a" OR NEAR(b') == '"a"* "OR"* "NEAR"* "b"*'
+    assert PollSearch.build_match('  !!  ') is None
+
+def test_search_matches_question_and_options_by_prefix(clean_db, app, client, poll_fixture):
+    """Test that search covers questions and option descriptions, and ranks question hits first"""
+    with app.app_context():
+        pizza = make_poll(poll_fixture, "Best pizza topping?", "Pineapple", "Mushroom").id
+        drink = make_poll(poll_fixture, "Favourite drink?", "Pizza smoothie", "Water").id
+        other = make_poll(poll_fixture, "Cats or dogs?").id
+
+    assert search_ids(client, 'q=pizz') == [pizza, drink]
+    assert search_ids(client, 'q=mush') == [pizza]
+    assert search_ids(client, 'q=pizza+water') == [drink]
+    assert search_ids(client, 'q=dog') == [other]
+    assert search_ids(client, 'q=elephant') == []
+
+def test_search_follows_poll_updates(clean_db, app, client, poll_fixture):
+    """Test that update_poll re-indexes the poll"""
+    with app.app_context():
+        poll_id = make_poll(poll_fixture, "Morning coffee?").id
+        poll = Poll.get_poll_by_id(poll_id)
+        poll.update_poll(question="Evening tea?")
+
+    assert search_ids(client, 'q=coffee') == []
+    assert search_ids(client, 'q=tea') == [poll_id]
+
+def test_search_keyset_pagination(clean_db, app, client, poll_fixture):
+    """Test that next_cursor walks every match exactly once"""
+    with app.app_context():
+        poll_ids = {make_poll(poll_fixture, f"Weekend plan number {i}?").id for i in range(5)}
+
+    seen = []
+    query = 'q=weekend&limit=2'
+    while True:
+        data = client.get(f'/polls/search?{query}').get_json()
+        seen.extend(p['id'] for p in data['polls'])
+        if data['next_cursor'] is None:
+            break
+        query = f"q=weekend&limit=2&cursor={data['next_cursor']}"
+
+    assert sorted(seen) == sorted(poll_ids)
+
+def test_search_requires_query(client):
+    """Test that an empty query is rejected"""
+    assert client.get('/polls/search?q=').status_code == 400
+
+def test_rebuild_search_command(clean_db, app, poll_fixture):
+    """Test that the rebuild command restores a wiped index"""
+    with app.app_context():
+        poll_id = make_poll(poll_fixture, "Summer holiday destination?").id
+        db.execute(text("DELETE FROM poll_search"))
+        db.commit()
+        assert PollSearch.search('holiday', 10) == []
+
+    result = app.test_cli_runner().invoke(args=['polls', 'rebuild-search'])
+    assert result.exit_code == 0
+    assert "Indexed 1 polls" in result.output
+
+    with app.app_context():
+        assert [match[0] for match in PollSearch.search('holiday', 10)] == [poll_id]
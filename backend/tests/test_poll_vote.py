@@ -1,3 +1,7 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.poll import Poll
 from app.models.vote import Vote
 from app import db
 
@@ -187,4 +191,132 @@ def test_vote_invalid_option(app, authenticated_client, poll_fixture, test_image
         )
     
     assert response.status_code == 400
-    assert response.get_json()['error'] == "Invalid voting option"
\ No newline at end of file
+    assert response.get_json()['error'] == "Invalid voting option"
+
+def test_vote_increments_option_counter(authenticated_client, poll_fixture, test_image_data):
+    """Test that a vote bumps the option's maintained vote counter"""
+    test_poll = poll_fixture(test_image_data)
+
+    with authenticated_client.application.app_context():
+      access_token = authenticated_client.tokens['access_token']
+      option_id = test_poll.voting_options[0].id
+
+      response = authenticated_client.post(
+          f'/polls/{test_poll.id}/vote',
+          json={
+              'option_id': option_id
+          },
+          headers={
+              'Authorization': f'Bearer {access_token}'
+          }
+      )
+      assert response.status_code == 201
+
+      counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+      assert counts[option_id] == 1
+      assert sum(counts.values()) == 1
+
+def test_reconcile_vote_counts_command(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that the reconcile command rebuilds drifted counters from the votes table"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+      option_id = test_poll.voting_options[0].id
+      db.add(Vote(poll_id=test_poll.id, option_id=option_id, user_id=authenticated_client.user.id))
+      db.commit()
+
+      counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+      assert counts[option_id] == 0
+
+    result = app.test_cli_runner().invoke(args=['votes', 'reconcile-counts', '--poll-id', str(test_poll.id)])
+    assert result.exit_code == 0
+    assert "2 voting options" in result.output
+
+    with app.app_context():
+      counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+      assert counts[option_id] == 1
+
+def test_insert_vote_rejects_duplicate(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that the guarded insert skips a second vote by the same user"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+      user_id = authenticated_client.user.id
+      option_id = test_poll.voting_options[0].id
+
+      assert Poll.insert_vote(test_poll.id, user_id, option_id) is not None
+      db.commit()
+      assert Poll.insert_vote(test_poll.id, user_id, test_poll.voting_options[1].id) is None
+      db.rollback()
+
+      counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+      assert counts == {option_id: 1, test_poll.voting_options[1].id: 0}
+
+def test_vote_unique_constraint(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that the database refuses a duplicate (poll_id, user_id) pair"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+      user_id = authenticated_client.user.id
+      option_id = test_poll.voting_options[0].id
+      db.add(Vote(poll_id=test_poll.id, option_id=option_id, user_id=user_id))
+      db.commit()
+
+      db.add(Vote(poll_id=test_poll.id, option_id=option_id, user_id=user_id))
+      with pytest.raises(IntegrityError):
+          db.commit()
+      db.rollback()
+
+def test_batch_vote(authenticated_client, poll_fixture, test_image_data):
+    """Test recording several votes in one request with per-item statuses"""
+    first_poll = poll_fixture(test_image_data)
+    second_poll = poll_fixture(test_image_data)
+
+    with authenticated_client.application.app_context():
+      access_token = authenticated_client.tokens['access_token']
+      first_option = first_poll.voting_options[0].id
+      second_option = second_poll.voting_options[1].id
+
+      response = authenticated_client.post(
+          '/polls/votes:batch',
+          json={
+              'votes': [
+                  {'poll_id': first_poll.id, 'option_id': first_option},
+                  {'poll_id': second_poll.id, 'option_id': second_option},
+                  {'poll_id': first_poll.id, 'option_id': first_option},
+                  {'poll_id': second_poll.id, 'option_id': first_option},
+                  {'poll_id': 999999, 'option_id': first_option},
+                  {'poll_id': 'x', 'option_id': first_option}
+              ]
+          },
+          headers={
+              'Authorization': f'Bearer {access_token}'
+          }
+      )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['recorded'] == 2
+    assert [result['status'] for result in data['results']] == [201, 201, 400, 400, 404, 400]
+    assert data['results'][2]['error'] == "User has already voted on this poll"
+
+    with authenticated_client.application.app_context():
+      user_id = authenticated_client.user.id
+      assert db.query(Vote).filter_by(poll_id=first_poll.id, user_id=user_id).count() == 1
+      assert db.query(Vote).filter_by(poll_id=second_poll.id, option_id=second_option).count() == 1
+
+def test_batch_vote_too_large(app, authenticated_client):
+    """Test that oversized batches are refused before touching the database"""
+    access_token = authenticated_client.tokens['access_token']
+    max_items = app.config['VOTE_BATCH_MAX_ITEMS']
+
+    with app.app_context():
+        response = authenticated_client.post(
+            '/polls/votes:batch',
+            json={'votes': [{'poll_id': 1, 'option_id': 1}] * (max_items + 1)},
+            headers={
+                'Authorization': f'Bearer {access_token}'
+            }
+        )
+
+    assert response.status_code == 400
@@ -0,0 +1,127 @@
+# Query plan regression checks: every statement issued by the hot poll/vote paths
+# is run through EXPLAIN QUERY PLAN and must not fall back to a full table scan.
+import re
+from datetime import datetime
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.databases.database import engine
+from app.models.poll import Poll
+from app.services.poll_service import PollService
+from app.utils.pagination import encode_cursor
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+# Tables that grow with usage; a SCAN over them without an index is a regression
+LARGE_TABLES = {'polls', 'votes', 'voting_option', 'media'}
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+@pytest.fixture(autouse=True)
+def sqlite_only():
+    if engine.dialect.name != 'sqlite':
+        pytest.skip("EXPLAIN QUERY PLAN checks are written for SQLite")
+
+@contextmanager
+def capture_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            parameters = parameters[0]
+        statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+def full_scans(statements):
+    """Return (statement, plan detail) pairs that scan a large table without an index"""
+    offenders = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+                continue
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)):
+                match = FULL_SCAN.match(row[-1])
+                if match and match.group(1) in LARGE_TABLES:
+                    offenders.append((statement, row[-1]))
+    return offenders
+
+def test_poll_model_query_plans(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that Poll model queries are served by indexes"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        with capture_statements() as statements:
+            poll = Poll.get_poll_by_id(test_poll.id)
+            option_id = poll.voting_options[0].id
+            poll.to_dict()
+            poll.has_user_voted(user_id)
+            poll.is_valid_option(option_id)
+            poll.get_votes_for_option(option_id)
+            poll.get_vote_counts()
+            Poll.can_accept_vote(poll.id, user_id, option_id)
+            Poll.insert_vote(poll.id, user_id, option_id)
+            db.rollback()
+            Poll.reconcile_vote_counts(poll.id)
+
+    assert statements
+    assert full_scans(statements) == []
+
+def test_poll_service_query_plans(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that PollService voting and closing queries are served by indexes"""
+    test_poll = poll_fixture(test_image_data)
+    other_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        option_id = test_poll.voting_options[0].id
+        poll_service = PollService()
+        with capture_statements() as statements:
+            poll_service.get_poll_details(test_poll.id)
+            poll_service.record_vote(test_poll.id, option_id, user_id)
+            with pytest.raises(Exception):
+                poll_service.record_vote(test_poll.id, option_id, user_id)
+            poll_service.record_votes_batch(user_id, [
+                {'poll_id': other_poll.id, 'option_id': other_poll.voting_options[0].id},
+                {'poll_id': test_poll.id, 'option_id': option_id}
+            ])
+            poll_service.close_poll(test_poll.id, test_poll.user_id)
+
+    assert statements
+    assert full_scans(statements) == []
+
+@pytest.mark.parametrize('filter_type', ['all', 'active', 'closed'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_get_polls_query_plans(client, poll_fixture, test_image_data, filter_type, order):
+    """Test that every listing variant pages through an index"""
+    poll_fixture(test_image_data)
+
+    with capture_statements() as statements:
+        response = client.get(f'/polls?filter={filter_type}&order={order}&page=2')
+        assert response.status_code == 200
+        cursor = encode_cursor(datetime.utcnow(), 1 << 30)
+        response = client.get(f'/polls?filter={filter_type}&order={order}&cursor={cursor}')
+        assert response.status_code == 200
+
+    assert statements
+    assert full_scans(statements) == []
+
+def test_feed_query_plans(authenticated_client, poll_fixture, test_image_data):
+    """Test that building and reading the feed pages through indexes"""
+    poll_fixture(test_image_data)
+    access_token = authenticated_client.tokens['access_token']
+
+    with capture_statements() as statements:
+        for _ in range(2):
+            response = authenticated_client.get('/feed', headers={'Authorization': f'Bearer {access_token}'})
+            assert response.status_code == 200
+
+    assert statements
+    assert full_scans(statements) == []
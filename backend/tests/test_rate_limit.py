@@ -0,0 +1,204 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import TestConfig
+from app.databases.database import db, engine
+from app.models.user import User
+from app.services.rate_limiter import (
+    MemoryBackend,
+    RateLimiter,
+    SQLiteBackend,
+    parse_rate
+)
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+class RateLimitedConfig(TestConfig):
+    RATE_LIMIT_BACKEND = 'memory'
+    RATE_LIMITS = {
+        'login': '2/minute',
+        'vote': '3/minute',
+        'batch_vote': '6/minute',
+        'create_poll': '1/hour'
+    }
+    VOTE_BATCH_MAX_ITEMS = 6
+
+@pytest.fixture
+def limited_app():
+    return create_app(RateLimitedConfig)
+
+def test_parse_rate():
+    """Test that rates parse into a limit and a period in seconds"""
+    assert parse_rate('10/minute') == (10, 60)
+    assert parse_rate('100/hours') == (100, 3600)
+    for value in ('10', 'ten/minute', '10/fortnight', '0/second'):
+        with pytest.raises(ValueError):
+            parse_rate(value)
+
+def test_bucket_allows_a_burst_then_refills():
+    """Test that a key bursts up to the limit, is refused with a retry delay, then regains one request per interval"""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), {'vote': '3/minute'}, clock=clock)
+
+    decisions = [limiter.hit('vote', 'user:1') for _ in range(3)]
+    assert all(decision.allowed for decision in decisions)
+    assert [decision.remaining for decision in decisions] == [2, 1, 0]
+
+    refused = limiter.hit('vote', 'user:1')
+    assert not refused.allowed
+    assert refused.retry_after_s == pytest.approx(20)
+    # Other keys and unconfigured scopes are not affected
+    assert limiter.hit('vote', 'user:2').allowed
+    assert limiter.hit('search', 'user:1').allowed
+
+    clock.now += 20
+    assert limiter.hit('vote', 'user:1').allowed
+    assert not limiter.hit('vote', 'user:1').allowed
+    assert limiter.stats()['rejected'] == {'vote': 2}
+
+def test_costly_requests_use_several_units():
+    """Test that a request costing n units takes n from the bucket, and one above the limit never fits"""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), {'vote': '3/minute'}, clock=clock)
+
+    assert limiter.hit('vote', 'user:1', cost=2).remaining == 1
+    refused = limiter.hit('vote', 'user:1', cost=2)
+    assert not refused.allowed
+    assert refused.retry_after_s == pytest.approx(20)
+    assert limiter.hit('vote', 'user:1').allowed
+
+    too_large = limiter.hit('vote', 'user:2', cost=4)
+    assert not too_large.allowed
+    assert too_large.retry_after_s is None
+
+def test_sqlite_backend_is_shared(tmp_path):
+    """Test that limiters of different workers sharing a SQLite file draw from the same bucket"""
+    clock = FakeClock()
+    path = str(tmp_path / 'rate_limits.db')
+    first = RateLimiter(SQLiteBackend(path), {'login': '2/minute'}, clock=clock)
+    second = RateLimiter(SQLiteBackend(path), {'login': '2/minute'}, clock=clock)
+
+    assert first.hit('login', 'ip:1.2.3.4').allowed
+    assert second.hit('login', 'ip:1.2.3.4').allowed
+    refused = first.hit('login', 'ip:1.2.3.4')
+    assert not refused.allowed
+    assert refused.retry_after_s == pytest.approx(30)
+    assert second.stats()['keys'] == 1
+
+def test_login_is_limited_per_ip(limited_app):
+    """Test that logins over the rate get 429 with Retry-After, without querying the database"""
+    client = limited_app.test_client()
+    credentials = {'username': 'nobody', 'password': 'wrong'}
+    assert client.post('/login', json=credentials).status_code == 401
+    assert client.post('/login', json=credentials).status_code == 401
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        response = client.post('/login', json=credentials)
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '30'
+    assert response.headers['X-RateLimit-Limit'] == '2'
+    assert response.get_json()['retry_after'] == 30
+    assert statements == []
+
+    other_client = limited_app.test_client()
+    response = other_client.post('/login', json=credentials, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert response.status_code == 401
+
+def test_votes_are_limited_per_user(limited_app, test_db, test_image_data):
+    """Test that the vote rate applies per user, and batches are charged per vote under their own scope"""
+    with limited_app.app_context():
+        names = [f'limited_{uuid.uuid4().hex[:12]}' for _ in range(2)]
+        users = [User(username=name, email=f'{name}@example.com', password='password') for name in names]
+        db.add_all(users)
+        db.commit()
+        tokens = [
+            limited_app.test_client().post(
+                '/login',
+                json={'username': user.username, 'password': 'password'},
+                environ_base={'REMOTE_ADDR': f'10.0.1.{i}'}
+            ).get_json()['access_token']
+            for i, user in enumerate(users)
+        ]
+        poll = limited_app.poll_service.create_new_poll(
+            question=test_image_data['question'],
+            option_one=test_image_data['option1'],
+            option_two=test_image_data['option2'],
+            user_id=users[0].id
+        )
+        poll_id, option_id = poll.id, poll.voting_options[0].id
+
+    client = limited_app.test_client()
+    headers = {'Authorization': f'Bearer {tokens[0]}'}
+    assert client.post(f'/polls/{poll_id}/vote', json={'option_id': option_id}, headers=headers).status_code == 201
+    # Duplicate votes count against the rate too
+    assert client.post(f'/polls/{poll_id}/vote', json={'option_id': option_id}, headers=headers).status_code == 400
+    assert client.post(f'/polls/{poll_id}/vote', json={'option_id': option_id}, headers=headers).status_code == 400
+
+    response = client.post(f'/polls/{poll_id}/vote', json={'option_id': option_id}, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    other_headers = {'Authorization': f'Bearer {tokens[1]}'}
+    response = client.post(f'/polls/{poll_id}/vote', json={'option_id': option_id}, headers=other_headers)
+    assert response.status_code == 201
+
+    # Larger than the single vote limit, within the batch limit
+    batch = {'votes': [{'poll_id': poll_id, 'option_id': option_id}] * 4}
+    assert client.post('/polls/votes:batch', json=batch, headers=other_headers).status_code == 200
+    response = client.post('/polls/votes:batch', json=batch, headers=other_headers)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+def test_oversized_batch_is_refused_by_the_route(limited_app, test_db):
+    """Test that a batch above VOTE_BATCH_MAX_ITEMS gets the route's 400, not a 429 it could never pass"""
+    name = f'limited_{uuid.uuid4().hex[:12]}'
+    with limited_app.app_context():
+        db.add(User(username=name, email=f'{name}@example.com', password='password'))
+        db.commit()
+        token = limited_app.test_client().post(
+            '/login', json={'username': name, 'password': 'password'}
+        ).get_json()['access_token']
+
+    batch = {'votes': [{'poll_id': 1, 'option_id': 1}] * 7}
+    response = limited_app.test_client().post(
+        '/polls/votes:batch', json=batch, headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == 400
+
+def test_batch_limit_below_max_items_is_rejected():
+    """Test that a batch vote limit no full batch fits in is refused at startup"""
+    class MisconfiguredConfig(RateLimitedConfig):
+        VOTE_BATCH_MAX_ITEMS = 7
+
+    with pytest.raises(ValueError):
+        create_app(MisconfiguredConfig)
+
+def test_poll_creation_is_limited(limited_app, test_db):
+    """Test that poll creation over the rate gets 429 and creates nothing"""
+    name = f'limited_{uuid.uuid4().hex[:12]}'
+    with limited_app.app_context():
+        db.add(User(username=name, email=f'{name}@example.com', password='password'))
+        db.commit()
+        token = limited_app.test_client().post(
+            '/login', json={'username': name, 'password': 'password'}
+        ).get_json()['access_token']
+    poll_data = {
+        'question': 'Tea or coffee?',
+        'option1': {'media_type': 'text', 'description': 'Tea'},
+        'option2': {'media_type': 'text', 'description': 'Coffee'}
+    }
+
+    client = limited_app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.post('/polls', json=poll_data, headers=headers).status_code == 201
+    response = client.post('/polls', json=poll_data, headers=headers)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3600'
@@ -0,0 +1,59 @@
+from app import db
+from app.services.poll_service import PollService
+from app.services.results_cache import ResultsCache
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_results_cache_lru_eviction():
+    """Test that the cache is bounded and tracks hits, misses and evictions"""
+    cache = ResultsCache(max_entries=2)
+    cache.set(1, {"id": 1})
+    cache.set(2, {"id": 2})
+    assert cache.get(1) == {"id": 1}
+
+    cache.set(3, {"id": 3})
+    assert cache.get(2) is None
+    assert cache.get(1) == {"id": 1}
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_closed_poll_results_are_cached(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that repeated results requests for a closed poll are served from the cache"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        app.poll_service.close_poll(test_poll.id, test_poll.user_id)
+
+    client = app.test_client()
+    first = client.get(f'/polls/{test_poll.id}/results')
+    second = client.get(f'/polls/{test_poll.id}/results')
+
+    assert first.status_code == 200
+    assert second.get_json() == first.get_json()
+    stats = app.poll_service.results_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+def test_active_poll_results_are_not_cached(app, poll_fixture, test_image_data):
+    """Test that active polls are refused and never enter the cache"""
+    test_poll = poll_fixture(test_image_data)
+
+    response = app.test_client().get(f'/polls/{test_poll.id}/results')
+
+    assert response.status_code == 403
+    assert app.poll_service.results_cache.stats()["size"] == 0
+
+def test_close_poll_invalidates_results(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that closing a poll drops any cached results for it"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        poll_service = PollService()
+        poll_service.results_cache.set(test_poll.id, {"stale": True})
+        poll_service.close_poll(test_poll.id, test_poll.user_id)
+
+        assert poll_service.get_poll_results(test_poll.id)["total_votes"] == 0
@@ -0,0 +1,65 @@
+import json
+
+from app.models.poll import Poll
+from app.utils import serialization
+from app.utils.serialization import PollPayloadCache, add_fields, dumps, splice_object
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    """Test that both encoders produce the same compact UTF-8 JSON"""
+    value = {"question": "Café or thé?", "options": [{"id": 1, "description": None}], "is_active": True}
+    encoded = dumps(value)
+    monkeypatch.setattr(serialization, 'orjson', None)
+    assert dumps(value) == encoded
+    assert json.loads(encoded) == value
+
+def test_splice_object_builds_valid_json():
+    """Test that spliced bodies decode to the same object as a plain encode"""
+    items = [dumps({"id": 1}), add_fields(dumps({"id": 2}), {"score": 0.5})]
+    body = splice_object("polls", items, {"next_cursor": None, "total_count": 2})
+    assert json.loads(body) == {
+        "polls": [{"id": 1}, {"id": 2, "score": 0.5}],
+        "next_cursor": None,
+        "total_count": 2
+    }
+    assert json.loads(splice_object("polls", [])) == {"polls": []}
+
+def test_payload_cache_follows_poll_edits(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that cached payloads are reused until the poll is edited or closed"""
+    with app.app_context():
+        poll_id = poll_fixture(test_image_data).id
+        cache = PollPayloadCache(max_entries=10)
+
+        poll = Poll.get_poll_by_id(poll_id, with_options=True)
+        first = cache.encode(poll)
+        assert json.loads(first) == poll.to_dict()
+        assert cache.encode(poll) is first
+
+        poll.update_poll(question="Edited question?")
+        edited = cache.encode(poll)
+        assert json.loads(edited)["question"] == "Edited question?"
+
+        app.poll_service.close_poll(poll_id, poll.user_id)
+        poll = Poll.get_poll_by_id(poll_id, with_options=True)
+        assert json.loads(cache.encode(poll))["is_active"] is False
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+        assert stats["size"] == 1
+
+def test_list_and_detail_responses_match_to_dict(app, client, poll_fixture, test_image_data):
+    """Test that responses built from cached bytes carry the poll dicts unchanged"""
+    with app.app_context():
+        poll_id = poll_fixture(test_image_data).id
+        expected = Poll.get_poll_by_id(poll_id, with_options=True).to_dict()
+
+    detail = client.get(f'/polls/{poll_id}')
+    assert detail.status_code == 200
+    assert detail.mimetype == 'application/json'
+    assert detail.get_json() == expected
+
+    listed = client.get('/polls?cursor=').get_json()
+    assert expected in listed['polls']
+    assert 'next_cursor' in listed
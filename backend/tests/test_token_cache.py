@@ -0,0 +1,80 @@
+import datetime
+
+import jwt
+import pytest
+from flask import g
+
+from app.config import settings
+from app.services.token_cache import TokenCache
+from app.utils.security import JWTTokenExpired, decode_token, get_request_user
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+def make_token(user_id=1, seconds=900):
+    exp = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+    return jwt.encode({'user_id': user_id, 'exp': exp}, settings.JWT_SECRET_KEY, algorithm='HS256')
+
+def test_entries_expire_with_their_token():
+    """Test that entries are refused at exp and purged by later inserts"""
+    clock = FakeClock()
+    cache = TokenCache(max_entries=10, clock=clock)
+    cache.put('a', {'user_id': 1, 'exp': 1010})
+    cache.put('b', {'user_id': 2, 'exp': 1100})
+    assert cache.get('a') == {'user_id': 1, 'exp': 1010}
+
+    clock.now = 1010
+    assert cache.get('a') is None
+    clock.now = 1100
+    cache.put('c', {'user_id': 3, 'exp': 2000})
+
+    stats = cache.stats()
+    assert stats['size'] == 1
+    assert stats['expirations'] == 2
+    assert stats['hits'] == 1
+
+def test_cache_is_bounded_and_keeps_only_digests():
+    """Test LRU eviction, and that tokens themselves are not stored"""
+    cache = TokenCache(max_entries=2, clock=FakeClock())
+    for token in ('a', 'b', 'c'):
+        cache.put(token, {'user_id': 1, 'exp': 5000})
+
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 1
+    assert 'b' not in cache._entries
+    assert TokenCache.digest('b') in cache._entries
+
+def test_revoked_claims_are_not_served():
+    """Test that the revocation check runs on every hit"""
+    cache = TokenCache(clock=FakeClock())
+    cache.put('a', {'user_id': 1, 'exp': 5000, 'jti': 'x'})
+    revoked = set()
+    cache.is_revoked = lambda claims: claims.get('jti') in revoked
+
+    assert cache.get('a') is not None
+    revoked.add('x')
+    assert cache.get('a') is None
+    assert cache.stats()['revocations'] == 1
+
+def test_decode_token_verifies_once(app):
+    """Test that a repeated token skips verification and expired tokens are reported as such"""
+    token = make_token()
+    with app.app_context():
+        assert decode_token(token)['user_id'] == 1
+        assert decode_token(token)['user_id'] == 1
+        stats = app.token_cache.stats()
+        assert (stats['misses'], stats['hits']) == (1, 1)
+
+        with pytest.raises(JWTTokenExpired):
+            decode_token(make_token(seconds=-10))
+
+def test_request_user_shares_the_cache(app, authenticated_client):
+    """Test that separate requests with the same token verify it once"""
+    headers = {'Authorization': f'Bearer {authenticated_client.tokens["access_token"]}'}
+    for _ in range(3):
+        with app.test_request_context(headers=headers):
+            # Fixtures may leave an app context pushed, whose g would carry the decoded user over
+            g.pop('request_user', None)
+            assert get_request_user().id == authenticated_client.user.id
+
+    stats = app.token_cache.stats()
+    assert (stats['misses'], stats['hits']) == (1, 2)
@@ -0,0 +1,72 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.services.revocation_store import RevocationStore
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+def claims(seconds=600):
+    return {'user_id': 1, 'type': 'refresh', 'jti': uuid.uuid4().hex, 'exp': int(time.time()) + seconds}
+
+def refresh(client, token):
+    return client.post('/auth/refresh', json={'refresh_token': token})
+
+def test_refresh_rotates_tokens(app, client, authenticated_client):
+    """Test that a refresh token yields a new pair once and its successor keeps working"""
+    old_refresh = authenticated_client.tokens['refresh_token']
+
+    response = refresh(client, old_refresh)
+    assert response.status_code == 200
+    tokens = response.get_json()
+    assert tokens['refresh_token'] != old_refresh
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+    assert client.get('/feed', headers=headers).status_code == 200
+
+    assert refresh(client, old_refresh).status_code == 401
+    assert refresh(client, tokens['refresh_token']).status_code == 200
+
+def test_token_types_are_not_interchangeable(client, authenticated_client):
+    """Test that access tokens cannot be refreshed and refresh tokens cannot authorize requests"""
+    tokens = authenticated_client.tokens
+    assert refresh(client, tokens['access_token']).status_code == 401
+    assert client.get('/feed', headers={'Authorization': f'Bearer {tokens["refresh_token"]}'}).status_code == 401
+    assert client.post('/auth/refresh', json={}).status_code == 400
+
+def test_consume_is_atomic_across_workers(app):
+    """Test that two workers exchanging the same refresh token cannot both succeed"""
+    with app.app_context():
+        first, second = RevocationStore(), RevocationStore()
+        token = claims()
+        assert first.consume(token) is True
+        assert second.consume(token) is False
+
+def test_workers_load_each_others_revocations(app):
+    """Test that the in-memory set picks up revocations recorded by another worker after a refresh interval"""
+    clock = FakeClock(0.0)
+    with app.app_context():
+        local = RevocationStore(refresh_interval_s=5, clock=clock)
+        token = claims()
+        assert not local.is_revoked(token['jti'])
+
+        RevocationStore().revoke(token)
+        assert not local.is_revoked(token['jti'])
+        clock.now = 5
+        assert local.is_revoked_claims(token)
+
+def test_purge_revoked_command(app):
+    """Test that expired revocations are purged and live ones kept"""
+    with app.app_context():
+        db.query(RevokedToken).delete()
+        db.commit()
+        RevokedToken.insert('expired-jti', datetime.utcnow() - timedelta(minutes=1))
+        RevokedToken.insert('live-jti', datetime.utcnow() + timedelta(minutes=10))
+
+    result = app.test_cli_runner().invoke(args=['tokens', 'purge-revoked'])
+    assert result.exit_code == 0
+    assert "Purged 1 expired revocations" in result.output
+
+    with app.app_context():
+        assert [row.jti for row in db.query(RevokedToken).all()] == ['live-jti']
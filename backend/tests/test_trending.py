@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.trending import TrendingRanker
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+def votes(poll_id, count):
+    return [(poll_id, user_id, 1) for user_id in range(count)]
+
+def test_recent_votes_outrank_older_ones():
+    """Test that scores decay with age, so fewer recent votes can beat more old ones"""
+    clock = FakeClock(1000 * 60.0)
+    ranker = TrendingRanker(half_life_minutes=10, clock=clock)
+    ranker.record(votes(1, 10))
+    clock.advance(30 * 60)
+    ranker.record(votes(2, 4))
+
+    ranking = ranker.refresh()
+    assert [poll_id for poll_id, _ in ranking] == [2, 1]
+    assert ranking[0][1] == pytest.approx(4)
+    assert ranking[1][1] == pytest.approx(10 / 8)
+
+def test_votes_leave_the_window():
+    """Test that polls whose votes are all older than the window drop out of the ranking"""
+    clock = FakeClock(1000 * 60.0)
+    ranker = TrendingRanker(window_minutes=60, clock=clock)
+    ranker.record(votes(1, 5))
+    clock.advance(30 * 60)
+    ranker.record(votes(2, 1))
+    clock.advance(31 * 60)
+
+    assert [poll_id for poll_id, _ in ranker.refresh()] == [2]
+
+def test_ranking_keeps_top_k_and_survives_reanchoring():
+    """Test that only the top K polls are kept and long uptimes do not distort scores"""
+    clock = FakeClock(1000 * 60.0)
+    ranker = TrendingRanker(top_k=3, window_minutes=10000, half_life_minutes=1, clock=clock)
+    for poll_id in range(1, 6):
+        ranker.record(votes(poll_id, poll_id))
+    clock.advance(100 * 60)
+    ranker.record(votes(9, 1))
+
+    ranking = ranker.refresh()
+    assert [poll_id for poll_id, _ in ranking] == [9, 5, 4]
+    assert ranking[0][1] == pytest.approx(1)
+
+def test_trending_endpoint(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that GET /polls/trending serves active polls in ranking order"""
+    with app.app_context():
+        polls = [poll_fixture(test_image_data) for _ in range(3)]
+        poll_ids = [poll.id for poll in polls]
+        trending = app.poll_service.trending
+        trending.record(votes(poll_ids[0], 2) + votes(poll_ids[1], 5) + votes(poll_ids[2], 9))
+        trending.refresh()
+        app.poll_service.close_poll(poll_ids[2], polls[2].user_id)
+
+    response = app.test_client().get('/polls/trending?limit=5')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['id'] for p in data['polls']] == [poll_ids[1], poll_ids[0]]
+    # Exactly 5 unless a minute boundary passed between recording and refreshing
+    assert 4 < data['polls'][0]['trending_score'] <= 5
+    assert 'options' in data['polls'][0]
+
+def test_trending_endpoint_rejects_bad_limit(client):
+    """Test that the limit is bounded"""
+    assert client.get('/polls/trending?limit=0').status_code == 400
@@ -0,0 +1,85 @@
+from sqlalchemy import event
+
+from app import db
+from app.databases.database import engine
+from app.models.poll import Poll
+from app.models.user import User
+from app.services.user_cache import UserCache
+from app.utils.security import get_current_user, get_request_user
+
+from tests.custom_fixtures import FakeClock, client, poll_fixture, test_image_data, authenticated_client
+
+def auth_headers(authenticated_client):
+    return {'Authorization': f'Bearer {authenticated_client.tokens["access_token"]}'}
+
+def test_vote_does_not_query_users(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that voting identifies the user from the token claims alone"""
+    test_poll = poll_fixture(test_image_data)
+    with app.app_context():
+        option_id = Poll.get_poll_by_id(test_poll.id).voting_options[0].id
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = authenticated_client.post(
+            f'/polls/{test_poll.id}/vote', json={'option_id': option_id}, headers=auth_headers(authenticated_client)
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 201
+    assert not any('FROM users' in statement for statement in statements)
+
+def test_request_user_carries_claims(app, authenticated_client):
+    """Test that the request user exposes the claims and loads the full user only on demand"""
+    with app.test_request_context(headers=auth_headers(authenticated_client)):
+        request_user = get_request_user()
+        assert request_user.id == authenticated_client.user.id
+        assert request_user.username == 'test_user'
+        assert get_request_user() is request_user
+        assert get_current_user().email == 'test@example.com'
+
+def test_user_cache_serves_copies_until_invalidated(app, authenticated_client):
+    """Test that cached users skip the query, and that updating a user drops its entry"""
+    user_id = authenticated_client.user.id
+    cache = UserCache(max_entries=10, ttl_s=60)
+    with app.app_context():
+        db.remove()
+        assert cache.get_user(user_id).username == 'test_user'
+        db.remove()
+        user = cache.get_user(user_id)
+        assert cache.stats()['hits'] == 1
+
+        user.email = 'changed@example.com'
+        db.commit()
+        assert cache.stats()['size'] == 0
+        db.remove()
+        assert cache.get_user(user_id).email == 'changed@example.com'
+
+        db.query(User).filter_by(id=user_id).update({User.email: 'test@example.com'})
+        db.commit()
+
+def test_user_cache_entries_expire(app, authenticated_client):
+    """Test that entries older than the TTL are reloaded and the cache stays bounded"""
+    clock = FakeClock(0.0)
+    cache = UserCache(max_entries=1, ttl_s=30, clock=clock)
+    with app.app_context():
+        db.remove()
+        cache.get_user(authenticated_client.user.id)
+        clock.now = 31
+        db.remove()
+        cache.get_user(authenticated_client.user.id)
+        assert cache.stats()['misses'] == 2
+
+        other = User(username='other_user', email='other@example.com', password='secret')
+        db.add(other)
+        db.commit()
+        other_id = other.id
+        db.remove()
+        cache.get_user(other_id)
+        assert cache.stats()['size'] == 1
+        assert cache.stats()['evictions'] == 1
+        db.delete(db.get(User, other_id))
+        db.commit()
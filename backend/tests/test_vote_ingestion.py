@@ -0,0 +1,105 @@
+import pytest
+
+from app import db
+from app.databases.database import engine
+from app.models.poll import Poll
+from app.models.vote import Vote
+from app.services.poll_service import PollService
+from app.services.vote_ingestion import VoteIngestionBuffer, VoteQueueFull
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_buffer_group_commit(app, poll_fixture, test_image_data):
+    """Test that queued votes are written in one batch and duplicates are reported"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        option_one, option_two = [option.id for option in test_poll.voting_options]
+        buffer = VoteIngestionBuffer(engine, batch_size=10, max_queue=10)
+
+        first = buffer.submit(test_poll.id, 9001, option_one)
+        second = buffer.submit(test_poll.id, 9002, option_two)
+        duplicate = buffer.submit(test_poll.id, 9001, option_two)
+        buffer.flush()
+
+        assert first.wait(0) is True
+        assert second.wait(0) is True
+        assert duplicate.wait(0) is False
+        assert db.query(Vote).filter_by(poll_id=test_poll.id).count() == 2
+
+        counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+        assert counts == {option_one: 1, option_two: 1}
+
+def test_buffer_skips_votes_on_polls_closed_before_the_flush(app, poll_fixture, test_image_data):
+    """Test that votes queued before a poll was closed are rejected by the flush and leave the counters alone"""
+    test_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        option_one = test_poll.voting_options[0].id
+        buffer = VoteIngestionBuffer(engine, batch_size=10, max_queue=10)
+
+        queued = buffer.submit(test_poll.id, 9101, option_one)
+        Poll.close(test_poll.id)
+        db.commit()
+        buffer.flush()
+
+        assert queued.wait(0) is False
+        assert db.query(Vote).filter_by(poll_id=test_poll.id).count() == 0
+        assert {option_id: count for option_id, _, count in test_poll.get_vote_counts()}[option_one] == 0
+
+def test_buffer_max_queue_depth(app):
+    """Test that a full queue rejects new votes instead of growing"""
+    buffer = VoteIngestionBuffer(engine, max_queue=1)
+    buffer.submit(1, 1, 1)
+
+    with pytest.raises(VoteQueueFull):
+        buffer.submit(1, 2, 1)
+
+    buffer._take(1)
+    buffer.close()
+    with pytest.raises(VoteQueueFull):
+        buffer.submit(1, 3, 1)
+
+def test_buffered_vote_returns_202(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that buffered mode accepts the vote and writes it on shutdown flush"""
+    test_poll = poll_fixture(test_image_data)
+    buffer = VoteIngestionBuffer(engine, flush_interval_ms=1000)
+    buffer.start()
+    app.poll_service = PollService(vote_buffer=buffer, acknowledge_votes=False)
+
+    with app.app_context():
+        access_token = authenticated_client.tokens['access_token']
+        option_id = test_poll.voting_options[0].id
+
+        response = authenticated_client.post(
+            f'/polls/{test_poll.id}/vote',
+            json={'option_id': option_id},
+            headers={'Authorization': f'Bearer {access_token}'}
+        )
+        assert response.status_code == 202
+        assert response.get_json()['result'] == "queued"
+
+        buffer.close()
+        assert db.query(Vote).filter_by(poll_id=test_poll.id, option_id=option_id).count() == 1
+
+def test_acknowledged_vote_waits_for_flush(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that acknowledged mode answers 201 after the flush and 400 for a repeat vote"""
+    test_poll = poll_fixture(test_image_data)
+    buffer = VoteIngestionBuffer(engine)
+    buffer.start()
+    app.poll_service = PollService(vote_buffer=buffer, acknowledge_votes=True)
+
+    with app.app_context():
+        access_token = authenticated_client.tokens['access_token']
+        option_id = test_poll.voting_options[0].id
+
+        for expected_status in (201, 400):
+            response = authenticated_client.post(
+                f'/polls/{test_poll.id}/vote',
+                json={'option_id': option_id},
+                headers={'Authorization': f'Bearer {access_token}'}
+            )
+            assert response.status_code == expected_status
+
+        assert response.get_json()['error'] == "User has already voted on this poll"
+        buffer.close()
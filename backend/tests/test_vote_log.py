@@ -0,0 +1,180 @@
+import os
+
+from app import db
+from app.models.vote import Vote
+from app.models.voting_option import VotingOption
+from app.services.poll_service import PollService
+from app.services.vote_log import RECORD, VoteLog, VoteRecord
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_vote_log_append_and_scan(tmp_path):
+    """Test that appended votes are scanned back in order and can be filtered by poll"""
+    vote_log = VoteLog(str(tmp_path))
+    try:
+        vote_log.append([(1, 10, 100), (2, 10, 200)], timestamp_ms=1000)
+        vote_log.append([(1, 11, 101)], timestamp_ms=2000)
+
+        assert list(vote_log.scan()) == [
+            VoteRecord(1, 100, 10, 1000),
+            VoteRecord(2, 200, 10, 1000),
+            VoteRecord(1, 101, 11, 2000)
+        ]
+        assert [record.user_id for record in vote_log.scan(poll_ids={1})] == [10, 11]
+    finally:
+        vote_log.close()
+
+def test_vote_log_rotates_segments(tmp_path):
+    """Test that a full segment is sealed and records keep flowing into a new one"""
+    vote_log = VoteLog(str(tmp_path), segment_max_bytes=RECORD.size * 2)
+    try:
+        for user_id in range(5):
+            vote_log.append([(1, user_id, 100)])
+
+        assert len(vote_log.segments()) == 3
+        assert [record.user_id for record in vote_log.scan()] == [0, 1, 2, 3, 4]
+    finally:
+        vote_log.close()
+
+def test_vote_log_drops_torn_record_on_reopen(tmp_path):
+    """Test that a partial record left by a crash does not misalign later appends"""
+    vote_log = VoteLog(str(tmp_path))
+    vote_log.append([(1, 10, 100)])
+    vote_log.close()
+    with open(vote_log.segments()[-1], 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    vote_log = VoteLog(str(tmp_path))
+    try:
+        vote_log.append([(1, 11, 101)])
+        assert [record.user_id for record in vote_log.scan()] == [10, 11]
+    finally:
+        vote_log.close()
+
+def test_vote_log_compaction(tmp_path):
+    """Test that compaction folds sealed segments, drops duplicates and groups closed polls"""
+    vote_log = VoteLog(str(tmp_path), segment_max_bytes=RECORD.size * 2)
+    try:
+        vote_log.append([(2, 10, 200)], timestamp_ms=1)
+        vote_log.append([(1, 10, 100)], timestamp_ms=2)
+        vote_log.append([(2, 11, 201)], timestamp_ms=3)
+        vote_log.append([(1, 10, 100)], timestamp_ms=4)
+        vote_log.append([(3, 10, 300)], timestamp_ms=5)
+        assert len(vote_log.segments()) == 3
+
+        assert vote_log.compact(closed_poll_ids={2}) == 3
+        assert len(vote_log.segments()) == 2
+        assert [(record.poll_id, record.user_id) for record in vote_log.scan()] == [
+            (2, 10), (2, 11), (1, 10), (3, 10)
+        ]
+        assert not [name for name in os.listdir(tmp_path) if name.endswith('.compacting')]
+    finally:
+        vote_log.close()
+
+def test_recorded_votes_reach_the_log(app, authenticated_client, poll_fixture, test_image_data, tmp_path):
+    """Test that committed votes are appended to the vote log"""
+    test_poll = poll_fixture(test_image_data)
+    vote_log = VoteLog(str(tmp_path))
+
+    with app.app_context():
+        try:
+            user_id = authenticated_client.user.id
+            option_id = test_poll.voting_options[0].id
+            PollService(vote_log=vote_log).record_vote(test_poll.id, option_id, user_id)
+
+            assert [(record.poll_id, record.option_id, record.user_id) for record in vote_log.scan()] == [
+                (test_poll.id, option_id, user_id)
+            ]
+        finally:
+            vote_log.close()
+
+def test_replay_log_commands(app, authenticated_client, poll_fixture, test_image_data, tmp_path):
+    """Test that replaying the log restores lost votes and their counters"""
+    test_poll = poll_fixture(test_image_data)
+    app.config['VOTE_LOG_DIR'] = str(tmp_path)
+    vote_log = VoteLog(str(tmp_path))
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        option_id = test_poll.voting_options[0].id
+        PollService(vote_log=vote_log).record_vote(test_poll.id, option_id, user_id)
+        vote_log.close()
+
+        db.query(Vote).filter(Vote.poll_id == test_poll.id).delete()
+        db.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['votes', 'replay-log', '--target', 'votes'])
+    assert result.exit_code == 0
+    assert "Restored 1 votes" in result.output
+
+    with app.app_context():
+        assert test_poll.has_user_voted(user_id)
+        db.query(VotingOption).filter(VotingOption.id == option_id).update({'vote_count': 5})
+        db.commit()
+
+    result = runner.invoke(args=['votes', 'replay-log'])
+    assert result.exit_code == 0
+
+    with app.app_context():
+        counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+        assert counts[option_id] == 1
+
+def test_vote_log_gives_each_writer_its_own_directory(tmp_path):
+    """Test that concurrent writers never share a segment and scans read them all"""
+    first = VoteLog(str(tmp_path))
+    second = VoteLog(str(tmp_path))
+    try:
+        assert first.directory != second.directory
+        first.append([(1, 10, 100)])
+        second.append([(1, 11, 100)])
+        assert sorted(record.user_id for record in VoteLog(str(tmp_path), read_only=True).scan()) == [10, 11]
+    finally:
+        first.close()
+        second.close()
+
+    reopened = VoteLog(str(tmp_path))
+    try:
+        # The first free writer directory is reused
+        assert reopened.directory == first.directory
+    finally:
+        reopened.close()
+
+def test_replay_refuses_a_log_missing_votes(app, authenticated_client, poll_fixture, test_image_data, tmp_path):
+    """Test that tallies are not replayed from a log enabled after votes already existed"""
+    test_poll = poll_fixture(test_image_data)
+    app.config['VOTE_LOG_DIR'] = str(tmp_path)
+    vote_log = VoteLog(str(tmp_path))
+
+    with app.app_context():
+        option_id = test_poll.voting_options[0].id
+        PollService().record_vote(test_poll.id, option_id, 9201)
+        PollService(vote_log=vote_log).record_vote(test_poll.id, option_id, authenticated_client.user.id)
+        vote_log.close()
+
+    result = app.test_cli_runner().invoke(args=['votes', 'replay-log'])
+    assert result.exit_code != 0
+    assert "missing from the log" in result.output
+
+    with app.app_context():
+        counts = {option_id: count for option_id, _, count in test_poll.get_vote_counts()}
+        assert counts[option_id] == 2
+
+def test_vote_log_failure_does_not_fail_the_vote(app, authenticated_client, poll_fixture, test_image_data, tmp_path):
+    """Test that a vote committed before the log append failed is still answered as recorded"""
+    test_poll = poll_fixture(test_image_data)
+    vote_log = VoteLog(str(tmp_path))
+    vote_log.close()
+    # Appending to a closed log raises
+    app.poll_service = PollService(vote_log=vote_log)
+
+    with app.app_context():
+        option_id = test_poll.voting_options[0].id
+        response = authenticated_client.post(
+            f'/polls/{test_poll.id}/vote',
+            json={'option_id': option_id},
+            headers={'Authorization': f'Bearer {authenticated_client.tokens["access_token"]}'}
+        )
+
+        assert response.status_code == 201
+        assert test_poll.has_user_voted(authenticated_client.user.id)
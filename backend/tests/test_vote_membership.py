@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+
+from app.databases.database import engine
+from app.services.poll_service import PollService
+from app.services.vote_membership import VoteMembershipIndex, VotedPolls
+
+from tests.custom_fixtures import client, poll_fixture, test_image_data, authenticated_client
+
+def test_voted_polls_membership():
+    """Test that the compact poll id set answers membership and ignores repeats"""
+    voted = VotedPolls([5, 1, 3, 3])
+    voted.add(2)
+    voted.add(5)
+
+    assert len(voted) == 4
+    assert all(poll_id in voted for poll_id in (1, 2, 3, 5))
+    assert 4 not in voted
+    assert 6 not in voted
+
+def test_membership_loads_lazily_and_evicts():
+    """Test that users are loaded once, updated on vote and evicted least recently used first"""
+    loads = []
+    index = VoteMembershipIndex(max_users=2)
+    index.load_voted_polls = lambda user_id: loads.append(user_id) or [user_id * 10]
+
+    assert index.has_voted(1, 10)
+    assert not index.has_voted(1, 11)
+    index.record([(11, 1, 100), (99, 3, 100)])
+    assert index.voted_among(1, [10, 11, 12]) == {10, 11}
+    assert loads == [1]
+
+    index.has_voted(2, 20)
+    index.has_voted(1, 10)
+    index.has_voted(3, 30)
+    assert not index.has_voted(3, 99)
+
+    index.has_voted(2, 20)
+    assert loads == [1, 2, 3, 2]
+    stats = index.stats()
+    assert stats["users"] == 2
+    assert stats["evictions"] == 2
+
+def test_membership_keeps_votes_committed_during_load():
+    """Test that a vote committed while the user's polls are loading is not lost"""
+    index = VoteMembershipIndex()
+
+    def load(user_id):
+        index.record([(7, user_id, 70)])
+        return [1]
+
+    index.load_voted_polls = load
+    assert index.voted_among(1, [1, 7, 8]) == {1, 7}
+
+def test_repeat_vote_rejected_from_memory(app, authenticated_client, poll_fixture, test_image_data):
+    """Test that a second vote by the same user is refused without querying the votes table"""
+    test_poll = poll_fixture(test_image_data)
+    other_poll = poll_fixture(test_image_data)
+
+    with app.app_context():
+        user_id = authenticated_client.user.id
+        poll_id, other_poll_id = test_poll.id, other_poll.id
+        option_id, other_option_id = [option.id for option in test_poll.voting_options]
+        poll_service = PollService()
+        poll_service.record_vote(poll_id, option_id, user_id)
+
+        statements = []
+        capture = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                poll_service.record_vote(poll_id, other_option_id, user_id)
+            voted = poll_service.get_voted_poll_ids(user_id, [poll_id, other_poll_id])
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+        assert exc_info.value.code == 400
+        assert exc_info.value.description == "User has already voted on this poll"
+        assert voted == {poll_id}
+        assert statements == []